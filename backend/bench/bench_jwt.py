@@ -0,0 +1,47 @@
+"""
+JWT signing and verification microbenchmarks
+
+Compares access token sign and verify throughput of the algorithms
+KeyRing supports (HS256 shared secret; ES256 and RS256 key pairs), using
+the same claims create_access_token issues. Verification dominates in
+practice: every authenticated request verifies, only logins and refreshes
+sign.
+
+Usage (from backend/):
+    python -m pytest bench/bench_jwt.py
+    python -m pytest bench/bench_jwt.py --benchmark-group-by=func --benchmark-sort=mean
+"""
+import time
+
+import pytest
+
+from src.core.jwt_keys import KeyRing
+from src.tools.jwt_keys import generate_private_key
+
+ALGORITHMS = ["HS256", "ES256", "ES384", "RS256"]
+ROUNDS = 500
+
+
+@pytest.fixture(scope="module", params=ALGORITHMS)
+def key_ring(request):
+    algorithm = request.param
+    if algorithm.startswith("HS"):
+        return KeyRing(algorithm, "x" * 64)
+    return KeyRing(algorithm, generate_private_key(algorithm))
+
+
+def claims():
+    now = int(time.time())
+    return {"sub": "65f0c0ffee0000000000beef", "exp": now + 3600, "iat": now}
+
+
+@pytest.mark.benchmark(group="jwt_sign")
+def bench_sign(benchmark, key_ring):
+    payload = claims()
+    benchmark.pedantic(key_ring.sign, args=(payload,), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="jwt_verify")
+def bench_verify(benchmark, key_ring):
+    token = key_ring.sign(claims())
+    benchmark.pedantic(key_ring.verify, args=(token,), rounds=ROUNDS)
@@ -0,0 +1,148 @@
+"""
+Model conversion microbenchmarks
+
+Measures the per-request conversion chain of the task list endpoint
+(document -> dict -> TaskInDB -> TaskResponse -> JSON bytes) for 1, 100
+and 10,000 tasks, plus label and user conversion.
+
+Usage (from backend/):
+    python -m pytest bench/                                   # run
+    python -m pytest bench/ --benchmark-save=baseline         # store a JSON baseline
+    python -m pytest bench/ --benchmark-compare               # fail on >15% mean regression
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pytest
+from bson import ObjectId
+
+from src.core.memory_database import MemoryClient
+from src.models.task import PRIORITY_RANK, TaskInDB, TaskResponse
+from src.models.user import UserInDB
+from src.repositories.label_repository import LabelRepository
+from src.repositories.task_repository import TaskRepository
+from src.services.task_service import _task_list_json
+
+SIZES = [1, 100, 10_000]
+# Fewer rounds for the large batches keeps the whole suite under a minute
+ROUNDS = {1: 2000, 100: 200, 10_000: 10}
+
+
+def task_documents(count: int, seed: int = 1) -> List[Dict]:
+    """Task documents shaped as TaskRepository stores them"""
+    rng = random.Random(seed)
+    owner_id = ObjectId()
+    label_ids = [ObjectId() for _ in range(5)]
+    now = datetime(2025, 1, 1)
+    docs = []
+    for index in range(count):
+        priority = rng.choice(list(PRIORITY_RANK))
+        doc = {
+            '_id': ObjectId(),
+            'title': f"Task {index}",
+            'priority': priority,
+            'priority_rank': PRIORITY_RANK[priority],
+            'deadline': now + timedelta(days=rng.randint(-30, 120)),
+            'status': rng.choice(['open', 'done']),
+            'label_ids': [str(label_id) for label_id in rng.sample(label_ids, k=rng.randint(0, 3))],
+            'owner_id': owner_id,
+            'created_at': now,
+            'updated_at': now,
+        }
+        if rng.random() < 0.6:
+            doc['description'] = "Benchmark task " + "x" * rng.randint(0, 400)
+        docs.append(doc)
+    return docs
+
+
+def label_documents(count: int) -> List[Dict]:
+    owner_id = ObjectId()
+    now = datetime(2025, 1, 1)
+    return [{'_id': ObjectId(), 'name': f"label-{index}", 'owner_id': owner_id, 'created_at': now}
+            for index in range(count)]
+
+
+def copies(docs: List[Dict]) -> tuple:
+    """Fresh pedantic() arguments; _doc_to_dict mutates its input"""
+    return ([dict(doc) for doc in docs],), {}
+
+
+@pytest.fixture(scope="module")
+def memory_db():
+    return MemoryClient()["todox_bench"]
+
+
+@pytest.fixture(scope="module")
+def task_dicts(memory_db) -> Dict[int, List[Dict]]:
+    repo = TaskRepository(memory_db)
+    return {size: [repo._doc_to_dict(doc) for doc in task_documents(size)] for size in SIZES}
+
+
+@pytest.mark.benchmark(group="task_doc_to_dict")
+@pytest.mark.parametrize("size", SIZES)
+def bench_task_doc_to_dict(benchmark, memory_db, size):
+    repo = TaskRepository(memory_db)
+    docs = task_documents(size)
+
+    def convert(batch):
+        return [repo._doc_to_dict(doc) for doc in batch]
+
+    benchmark.pedantic(convert, setup=lambda: copies(docs), rounds=ROUNDS[size])
+
+
+@pytest.mark.benchmark(group="task_in_db")
+@pytest.mark.parametrize("size", SIZES)
+def bench_task_in_db(benchmark, task_dicts, size):
+    dicts = task_dicts[size]
+    benchmark.pedantic(lambda: [TaskInDB(**data) for data in dicts], rounds=ROUNDS[size])
+
+
+@pytest.mark.benchmark(group="task_response")
+@pytest.mark.parametrize("size", SIZES)
+def bench_task_response(benchmark, task_dicts, size):
+    """TaskService's conversion: TaskResponse(**task.model_dump())"""
+    tasks = [TaskInDB(**data) for data in task_dicts[size]]
+    benchmark.pedantic(lambda: [TaskResponse(**task.model_dump()) for task in tasks], rounds=ROUNDS[size])
+
+
+@pytest.mark.benchmark(group="task_model_dump")
+@pytest.mark.parametrize("size", SIZES)
+def bench_task_model_dump(benchmark, task_dicts, size):
+    tasks = [TaskInDB(**data) for data in task_dicts[size]]
+    benchmark.pedantic(lambda: [task.model_dump() for task in tasks], rounds=ROUNDS[size])
+
+
+@pytest.mark.benchmark(group="task_response_encoding")
+@pytest.mark.parametrize("size", SIZES)
+def bench_task_list_response_encoding(benchmark, task_dicts, size):
+    """GET /tasks/ body: TaskService encodes the repository's TaskInDB list with its TypeAdapter"""
+    tasks = [TaskInDB(**data) for data in task_dicts[size]]
+    body = benchmark.pedantic(lambda: _task_list_json.dump_json(tasks), rounds=ROUNDS[size])
+    assert body.startswith(b"[")
+
+
+@pytest.mark.benchmark(group="label_doc_to_dict")
+@pytest.mark.parametrize("size", SIZES)
+def bench_label_doc_to_dict(benchmark, memory_db, size):
+    repo = LabelRepository(memory_db)
+    docs = label_documents(size)
+
+    def convert(batch):
+        return [repo._doc_to_dict(doc) for doc in batch]
+
+    benchmark.pedantic(convert, setup=lambda: copies(docs), rounds=ROUNDS[size])
+
+
+@pytest.mark.benchmark(group="user_in_db")
+def bench_user_in_db(benchmark):
+    """UserInDB construction as on every authenticated request"""
+    now = datetime(2025, 1, 1)
+    data = {
+        'id': str(ObjectId()),
+        'email': "bench@example.com",
+        'hashed_password': "$2b$12$" + "x" * 53,
+        'created_at': now,
+        'updated_at': now,
+    }
+    benchmark(lambda: UserInDB(**data))
@@ -0,0 +1,46 @@
+"""
+Microbenchmark configuration (pytest-benchmark)
+
+Collects bench_*.py files when pytest is pointed at bench/ (a plain
+test run leaves them alone), stores saved runs as JSON under
+bench/baselines (wherever pytest is started from) and, when comparing
+against a baseline, fails the run when the fastest round of a benchmark
+regresses by more than REGRESSION_THRESHOLD unless --benchmark-compare-fail is given.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("DATABASE_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINES = BENCH_DIR / "baselines"
+DEFAULT_STORAGE = "file://./.benchmarks"
+REGRESSION_THRESHOLD = "min:15%"
+
+
+def _targets_benchmarks(config) -> bool:
+    for arg in config.args:
+        path = (config.invocation_params.dir / arg.split("::")[0]).resolve()
+        if path == BENCH_DIR or BENCH_DIR in path.parents:
+            return True
+    return False
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if not _targets_benchmarks(config):
+        return
+    config.addinivalue_line("python_files", "bench_*.py")
+    config.addinivalue_line("python_functions", "bench_*")
+    if not config.pluginmanager.hasplugin("benchmark"):
+        raise pytest.UsageError("Microbenchmarks need pytest-benchmark: pip install pytest-benchmark")
+
+    from pytest_benchmark.utils import parse_compare_fail
+
+    if config.getoption("benchmark_storage") == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINES}"
+    if config.getoption("benchmark_compare") and not config.getoption("benchmark_compare_fail"):
+        config.option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
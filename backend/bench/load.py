@@ -0,0 +1,182 @@
+"""
+End-to-end load test
+
+Registers users, seeds labels and tasks through the API, then drives a
+weighted mix of task and label requests at a target rate and reports
+throughput and latency percentiles per operation.
+
+Usage (from backend/):
+    # In process against the ASGI app (uses MONGODB_URI, database todox_bench)
+    python -m bench.load --users 50 --rate 200 --duration 30
+
+    # Against a running deployment (start it with RATE_LIMIT_ENABLED=false)
+    python -m bench.load --url http://localhost:8000 --rate 200 --concurrency 64
+
+    # Save results, then compare a later run against them
+    python -m bench.load --output before.json
+    python -m bench.load --compare before.json
+
+With --rate, requests are scheduled open-loop and latency is measured from
+each request's scheduled start, so time spent queued behind a saturated
+server counts (no coordinated omission). Without --rate, --concurrency
+workers send requests back to back (closed loop, maximum throughput).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .stats import Recorder, format_summary, load_summary
+from .workload import OPERATIONS, VirtualUser, parse_mix, seed
+
+
+@asynccontextmanager
+async def open_client(url: Optional[str], database: str, keep: bool) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    HTTP client for a live URL, or for the in-process app with its own database
+
+    The in-process database is dropped afterwards unless keep is set.
+    """
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+            yield client
+        return
+
+    from src.core import database as db_module
+    from src.core.config import settings
+    from src.main import app
+
+    settings.DATABASE_NAME = database
+    # Every virtual user shares one client address in process
+    settings.RATE_LIMIT_ENABLED = False
+    await db_module.connect_to_database()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            yield client
+    finally:
+        if not keep:
+            await db_module.client.drop_database(database)
+        await db_module.close_database_connection()
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    users: List[VirtualUser],
+    mix: Dict[str, int],
+    rng: random.Random,
+    duration: float,
+    rate: Optional[float],
+    concurrency: int
+) -> tuple:
+    """
+    Send the request mix for `duration` seconds
+
+    Returns:
+        (Recorder, elapsed seconds)
+    """
+    recorder = Recorder()
+    names, weights = zip(*mix.items())
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(scheduled: float) -> None:
+        name = rng.choices(names, weights)[0]
+        async with semaphore:
+            try:
+                _, ok = await OPERATIONS[name](client, rng, rng.choice(users))
+            except httpx.HTTPError:
+                ok = False
+        recorder.record(name, time.perf_counter() - scheduled, ok)
+
+    start = time.perf_counter()
+    end = start + duration
+
+    if rate:
+        # Open loop: one request every 1/rate seconds regardless of responses
+        pending = set()
+        interval = 1 / rate
+        sent = 0
+        while True:
+            scheduled = start + sent * interval
+            if scheduled >= end:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(one(scheduled))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            sent += 1
+        if pending:
+            await asyncio.wait(pending)
+    else:
+        async def worker() -> None:
+            while time.perf_counter() < end:
+                await one(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return recorder, time.perf_counter() - start
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.load",
+        description="End-to-end load test for the Todox API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--url", help="base URL of a running API (default: in-process ASGI app)")
+    parser.add_argument("--database", default="todox_bench", help="database for in-process runs")
+    parser.add_argument("--keep", action="store_true", help="keep the in-process database afterwards")
+    parser.add_argument("--users", type=int, default=20, help="users to register")
+    parser.add_argument("--tasks", type=int, default=30, help="mean tasks per user (heavy-tailed)")
+    parser.add_argument("--labels", type=int, default=5, help="mean labels per user")
+    parser.add_argument("--rate", type=float, help="target requests per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=32, help="maximum requests in flight")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load after seeding")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unrecorded load first")
+    parser.add_argument("--mix", help="operation weights, e.g. list_tasks=60,create_task=40")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    rng = random.Random(args.seed)
+
+    async with open_client(args.url, args.database, args.keep) as client:
+        seed_start = time.perf_counter()
+        users = await seed(client, rng, args.users, args.tasks, args.labels, args.concurrency)
+        tasks = sum(len(user.task_ids) for user in users)
+        print(f"Seeded {len(users)} users, {tasks} tasks in {time.perf_counter() - seed_start:.1f}s")
+
+        if args.warmup:
+            await drive(client, users, mix, rng, args.warmup, args.rate, args.concurrency)
+        recorder, elapsed = await drive(client, users, mix, rng, args.duration, args.rate, args.concurrency)
+
+    summary = recorder.summary(elapsed)
+    baseline = load_summary(args.compare) if args.compare else None
+    mode = f"open loop at {args.rate:g} req/s" if args.rate else "closed loop"
+    print(f"\n{mode}, concurrency {args.concurrency}, {elapsed:.1f}s\n")
+    print(format_summary(summary, baseline))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"config": vars(args), "summary": summary}, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 1 if summary.get('total', {}).get('errors') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
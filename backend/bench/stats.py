@@ -0,0 +1,108 @@
+"""
+Benchmark statistics
+Latency recording, percentile reports and baseline comparison
+"""
+import json
+import math
+from typing import Dict, List, Optional, Sequence
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an ascending sequence
+
+    Args:
+        sorted_values: Values sorted ascending (non-empty)
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The smallest value with at least pct% of values at or below it
+    """
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Collects per-operation latencies (seconds) and error counts"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, operation: str, latency: float, ok: bool) -> None:
+        """Record one completed request"""
+        self.latencies.setdefault(operation, []).append(latency)
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        """
+        Throughput and latency percentiles per operation and in total
+
+        Args:
+            elapsed: Wall-clock duration of the run in seconds
+
+        Returns:
+            {operation: {"count", "errors", "rps", "p50_ms", ..., "max_ms"}}
+        """
+        result = {}
+        everything: List[float] = []
+        for operation in sorted(self.latencies):
+            values = self.latencies[operation]
+            everything.extend(values)
+            result[operation] = self._stats(values, self.errors.get(operation, 0), elapsed)
+        if everything:
+            result['total'] = self._stats(everything, sum(self.errors.values()), elapsed)
+        return result
+
+    @staticmethod
+    def _stats(values: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+        ordered = sorted(values)
+        stats = {
+            'count': len(ordered),
+            'errors': errors,
+            'rps': round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        for pct in PERCENTILES:
+            stats[f'p{pct}_ms'] = round(percentile(ordered, pct) * 1000, 3)
+        stats['max_ms'] = round(ordered[-1] * 1000, 3)
+        return stats
+
+
+def format_summary(summary: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None) -> str:
+    """
+    Render a summary as a text table
+
+    Args:
+        summary: Output of Recorder.summary
+        baseline: Earlier summary; adds percentage change columns for rps and p99
+
+    Returns:
+        Table text
+    """
+    columns = ['count', 'errors', 'rps'] + [f'p{pct}_ms' for pct in PERCENTILES] + ['max_ms']
+    header = f"{'operation':<16}" + ''.join(f"{column:>11}" for column in columns)
+    if baseline:
+        header += f"{'Δrps':>9}{'Δp99':>9}"
+    lines = [header, '-' * len(header)]
+    for operation, stats in summary.items():
+        line = f"{operation:<16}" + ''.join(f"{stats[column]:>11}" for column in columns)
+        if baseline and operation in baseline:
+            line += f"{_change(baseline[operation]['rps'], stats['rps']):>9}"
+            line += f"{_change(baseline[operation]['p99_ms'], stats['p99_ms']):>9}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return 'n/a'
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def load_summary(path: str) -> Dict:
+    """Read the summary section of a results file written by the harness"""
+    with open(path) as handle:
+        return json.load(handle)['summary']
@@ -0,0 +1,214 @@
+"""
+Benchmark workload
+Seeds users, labels and tasks and defines the request mix
+"""
+import asyncio
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+PASSWORD = "bench-password-123"
+
+# Default request mix (relative weights); reads dominate, as in real use
+DEFAULT_MIX = {
+    'list_tasks': 45,
+    'list_labels': 15,
+    'create_task': 15,
+    'update_task': 15,
+    'delete_task': 5,
+    'create_label': 3,
+    'update_label': 1,
+    'delete_label': 1,
+}
+
+PRIORITY_WEIGHTS = {'High': 2, 'Medium': 5, 'Low': 3}
+SORTS = ['created_at', 'deadline', 'priority', 'updated_at']
+
+
+@dataclass
+class VirtualUser:
+    """A registered user and the ids it owns"""
+    email: str
+    token: str
+    label_ids: List[str] = field(default_factory=list)
+    task_ids: List[str] = field(default_factory=list)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse "list_tasks=50,create_task=20" into weights
+
+    Raises:
+        ValueError: Unknown operation or malformed weight
+    """
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return mix
+
+
+def task_payload(rng: random.Random, user: VirtualUser) -> Dict:
+    """A task with a realistic spread of priorities, deadlines and labels"""
+    priorities, weights = zip(*PRIORITY_WEIGHTS.items())
+    payload = {
+        "title": f"Task {uuid.uuid4().hex[:8]}",
+        "priority": rng.choices(priorities, weights)[0],
+        # Mostly upcoming deadlines, some overdue
+        "deadline": (date.today() + timedelta(days=int(rng.triangular(-30, 120, 7)))).isoformat(),
+    }
+    if rng.random() < 0.6:
+        payload["description"] = "Benchmark task " + "x" * rng.randint(0, 400)
+    if user.label_ids:
+        payload["label_ids"] = rng.sample(user.label_ids, k=min(len(user.label_ids), rng.choice([0, 0, 1, 1, 2, 3])))
+    if rng.random() < 0.05:
+        payload["recurrence"] = rng.choice(["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,TH", "FREQ=MONTHLY"])
+    return payload
+
+
+def tasks_per_user(rng: random.Random, mean: int) -> int:
+    """Heavy-tailed task count: most users have a few tasks, some have many"""
+    return min(int(rng.paretovariate(1.5) * mean / 3), mean * 20)
+
+
+async def seed(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    users: int,
+    tasks_mean: int,
+    labels_mean: int,
+    concurrency: int
+) -> List[VirtualUser]:
+    """
+    Register users and create their labels and tasks through the API
+
+    Args:
+        client: HTTP client (in-process or live)
+        rng: Random source
+        users: Number of users
+        tasks_mean: Mean tasks per user (heavy-tailed)
+        labels_mean: Mean labels per user
+        concurrency: Parallel seeding requests
+
+    Returns:
+        Virtual users with their label and task ids
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    run_id = uuid.uuid4().hex[:8]
+
+    async def request(method: str, url: str, **kwargs) -> httpx.Response:
+        async with semaphore:
+            response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def seed_user(index: int) -> VirtualUser:
+        email = f"bench-{run_id}-{index}@example.com"
+        await request("POST", "/auth/register", json={"email": email, "password": PASSWORD})
+        login = await request("POST", "/auth/login", json={"email": email, "password": PASSWORD})
+        user = VirtualUser(email=email, token=login.json()["access_token"])
+
+        for number in range(rng.randint(0, 2 * labels_mean)):
+            label = await request("POST", "/labels/", json={"name": f"label-{number}"}, headers=user.headers)
+            user.label_ids.append(label.json()["id"])
+
+        created = await asyncio.gather(*(
+            request("POST", "/tasks/", json=task_payload(rng, user), headers=user.headers)
+            for _ in range(tasks_per_user(rng, tasks_mean))
+        ))
+        user.task_ids.extend(response.json()["id"] for response in created)
+        return user
+
+    return list(await asyncio.gather(*(seed_user(index) for index in range(users))))
+
+
+Operation = Callable[[httpx.AsyncClient, random.Random, VirtualUser], Awaitable[Tuple[int, bool]]]
+
+
+async def list_tasks(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    response = await client.get("/tasks/", params={"sort": rng.choice(SORTS)}, headers=user.headers)
+    return response.status_code, response.status_code == 200
+
+
+async def list_labels(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    response = await client.get("/labels/", headers=user.headers)
+    return response.status_code, response.status_code == 200
+
+
+async def create_task(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    response = await client.post("/tasks/", json=task_payload(rng, user), headers=user.headers)
+    if response.status_code == 201:
+        user.task_ids.append(response.json()["id"])
+    return response.status_code, response.status_code == 201
+
+
+async def update_task(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    if not user.task_ids:
+        return await create_task(client, rng, user)
+    task_id = rng.choice(user.task_ids)
+    change = rng.choice([
+        {"status": rng.choice(["open", "done"])},
+        {"priority": rng.choice(list(PRIORITY_WEIGHTS))},
+        {"title": f"Renamed {uuid.uuid4().hex[:6]}"},
+    ])
+    response = await client.patch(f"/tasks/{task_id}", json=change, headers=user.headers)
+    # A concurrent delete of the same task is not a server error
+    return response.status_code, response.status_code in (200, 404)
+
+
+async def delete_task(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    if not user.task_ids:
+        return await create_task(client, rng, user)
+    task_id = user.task_ids.pop(rng.randrange(len(user.task_ids)))
+    response = await client.delete(f"/tasks/{task_id}", headers=user.headers)
+    return response.status_code, response.status_code in (204, 404)
+
+
+async def create_label(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    response = await client.post("/labels/", json={"name": f"label-{uuid.uuid4().hex[:8]}"}, headers=user.headers)
+    if response.status_code == 201:
+        user.label_ids.append(response.json()["id"])
+    return response.status_code, response.status_code == 201
+
+
+async def update_label(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    if not user.label_ids:
+        return await create_label(client, rng, user)
+    label_id = rng.choice(user.label_ids)
+    response = await client.patch(
+        f"/labels/{label_id}", json={"name": f"label-{uuid.uuid4().hex[:8]}"}, headers=user.headers
+    )
+    return response.status_code, response.status_code in (200, 404)
+
+
+async def delete_label(client: httpx.AsyncClient, rng: random.Random, user: VirtualUser) -> Tuple[int, bool]:
+    if not user.label_ids:
+        return await create_label(client, rng, user)
+    label_id = user.label_ids.pop(rng.randrange(len(user.label_ids)))
+    response = await client.delete(f"/labels/{label_id}", headers=user.headers)
+    return response.status_code, response.status_code in (204, 404)
+
+
+OPERATIONS: Dict[str, Operation] = {
+    'list_tasks': list_tasks,
+    'list_labels': list_labels,
+    'create_task': create_task,
+    'update_task': update_task,
+    'delete_task': delete_task,
+    'create_label': create_label,
+    'update_label': update_label,
+    'delete_label': delete_label,
+}
@@ -0,0 +1,35 @@
+"""
+Admin routes
+Operator endpoints authenticated with ADMIN_API_KEY
+"""
+from fastapi import APIRouter, Depends, status
+
+from ...middleware.auth_middleware import require_admin
+from ...schemas.auth import BatchRegisterRequest, BatchRegisterResponse, MAX_BATCH_USERS
+from ...services.auth_service import AuthService
+from .auth import get_auth_service
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post(
+    "/users",
+    response_model=BatchRegisterResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Provision users",
+    description=f"Create up to {MAX_BATCH_USERS} users in one request (requires X-Admin-Key)"
+)
+async def create_users(
+    data: BatchRegisterRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Create many users at once
+    
+    - **users**: Emails and passwords, as for registration
+    
+    Returns the created users and the emails that were already registered
+    (or repeated within the batch); one conflict does not fail the batch
+    """
+    return await auth_service.register_users(data.users)
@@ -2,14 +2,17 @@
 Authentication routes
 Endpoints for user registration and login
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, status
 
+from ...core.config import settings
 from ...core.database import get_database
 from ...repositories.user_repository import UserRepository
+from ...repositories.token_repository import RefreshTokenRepository, TokenRevocationRepository
 from ...services.auth_service import AuthService
-from ...schemas.auth import RegisterRequest, LoginRequest, TokenResponse, UpdatePasswordRequest
+from ...schemas.auth import RegisterRequest, LoginRequest, RefreshRequest, TokenResponse, UpdatePasswordRequest
 from ...models.user import UserResponse, UserInDB
 from ...middleware.auth_middleware import get_current_user
+from ...middleware.rate_limit_middleware import client_address
 
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -17,7 +20,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 def get_auth_service(db=Depends(get_database)) -> AuthService:
     """Dependency to get AuthService instance"""
-    return AuthService(UserRepository(db))
+    return AuthService(UserRepository(db), RefreshTokenRepository(db), TokenRevocationRepository(db))
 
 
 @router.post(
@@ -51,6 +54,8 @@ async def register(
 )
 async def login(
     data: LoginRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """
@@ -59,9 +64,39 @@ async def login(
     - **email**: User's registered email
     - **password**: User's password
     
-    Returns JWT access token for authenticated requests
+    Returns JWT access token for authenticated requests, or 429 with
+    Retry-After while the email or client IP is locked out after repeated
+    failures
     """
-    return await auth_service.login(data.email, data.password)
+    # Without trusted proxy hops the address may be a proxy's, shared by
+    # every client; locking it out would lock out everyone
+    client_ip = (
+        client_address(request.scope, settings.RATE_LIMIT_PROXY_HOPS)
+        if settings.RATE_LIMIT_PROXY_HOPS > 0 else None
+    )
+    return await auth_service.login(data.email, data.password, client_ip, background_tasks)
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Refresh tokens",
+    description="Exchange a refresh token for a new access token and refresh token"
+)
+async def refresh(
+    data: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Refresh an expired or expiring access token
+    
+    - **refresh_token**: Refresh token from login or the previous refresh
+    
+    Each refresh token works once; the response carries its replacement.
+    Reusing a refresh token signs out the whole session.
+    """
+    return await auth_service.refresh(data.refresh_token)
 
 
 @router.get(
@@ -0,0 +1,90 @@
+"""
+Event routes
+Server-Sent Events stream of task and label changes
+"""
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from ...core.config import settings
+from ...core.event_hub import event_hub, EventHub
+from ...models.user import UserInDB
+from ...middleware.auth_middleware import get_current_user
+
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+async def stream_events(owner_id: str, hub: EventHub = event_hub):
+    """
+    Subscribe to a user's events and yield SSE messages until closed
+    
+    The subscription is opened when the response starts streaming, so a
+    response that never starts (client gone, send failed) never holds
+    one. It is released when the client disconnects (the generator is
+    cancelled) or the hub closes it. If the hub filled up since the
+    route's capacity check, the stream ends at once and the client
+    reconnects after the retry interval.
+    
+    Sends a comment line as a heartbeat when idle so proxies keep the
+    connection open.
+    """
+    subscription = hub.subscribe(owner_id)
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        if subscription is None:
+            return
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            
+            if message is None:
+                if subscription.evicted:
+                    yield "event: evicted\ndata: {}\n\n"
+                return
+            yield message
+    finally:
+        if subscription is not None:
+            hub.unsubscribe(subscription)
+
+
+@router.get(
+    "",
+    summary="Stream change events",
+    description="Server-Sent Events stream of the authenticated user's task and label changes "
+                "made through this worker",
+    response_class=StreamingResponse
+)
+async def get_events(current_user: UserInDB = Depends(get_current_user)):
+    """
+    Stream task and label change events
+    
+    Event types: task.created, task.updated, task.deleted,
+    tasks.label_removed, label.created, label.updated, label.deleted.
+    The data line carries the changed entity as JSON (deletions carry only
+    its id). An `evicted` event means the client fell behind and should
+    refetch and reconnect.
+    
+    Fan-out is per worker: a stream only carries changes made through the
+    worker serving it. With several workers, clients should also refetch
+    periodically or on focus.
+    
+    Returns 503 if this worker has reached its connection limit.
+    """
+    if event_hub.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event stream connections"
+        )
+    
+    return StreamingResponse(
+        stream_events(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -2,7 +2,7 @@
 Label routes
 Endpoints for label management
 """
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Response, status, HTTPException
 from typing import List
 
 from ...core.database import get_database
@@ -32,7 +32,8 @@ async def get_labels(
     label_service: LabelService = Depends(get_label_service)
 ):
     """Get all labels for the current user (sorted alphabetically)"""
-    return await label_service.get_labels_by_owner(current_user.id)
+    body = await label_service.get_labels_json(current_user.id)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post(
@@ -2,13 +2,16 @@
 Task routes
 Endpoints for task management
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from typing import List
+from datetime import date
 
 from ...core.database import get_database
 from ...repositories.task_repository import TaskRepository
 from ...services.task_service import TaskService
-from ...schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from ...schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskSortField, SortOrder, CalendarDay
+)
 from ...models.user import UserInDB
 from ...middleware.auth_middleware import get_current_user
 from fastapi import HTTPException
@@ -40,8 +43,9 @@ async def create_task(
     - **title**: Task title (1-200 characters, required)
     - **description**: Optional description
     - **priority**: High, Medium, or Low (required)
-    - **deadline**: ISO 8601 date (required)
+    - **deadline**: ISO 8601 date (required; first occurrence for recurring tasks)
     - **label_ids**: Optional array of label IDs
+    - **recurrence**: Optional rule object or RRULE string (daily/weekly/monthly)
     
     Returns the created task with id, status (defaults to 'open'), and timestamps
     """
@@ -55,16 +59,51 @@ async def create_task(
     description="Get all tasks for the authenticated user"
 )
 async def get_tasks(
+    request: Request,
+    sort: TaskSortField = Query('created_at', description="Field to sort by"),
+    order: SortOrder = Query('desc', description="Sort direction: asc or desc"),
     current_user: UserInDB = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service)
 ):
     """
     Get all tasks for the current user
     
-    Returns array of tasks sorted by created_at (newest first).
+    - **sort**: deadline, priority, created_at or updated_at (default: created_at)
+    - **order**: asc or desc (default: desc)
+    
+    Returns array of tasks sorted by created_at (newest first) by default.
+    Priority sorts rank High > Medium > Low, so `order=desc` lists High first.
     Returns empty array if user has no tasks.
     """
-    return await task_service.get_tasks_by_owner(current_user.id)
+    # Already serialized (cached, or shared with concurrent identical requests)
+    body = await task_service.get_tasks_encoded(current_user.id, sort, order)
+    return body.to_response(request.headers.get("accept-encoding", ""))
+
+
+@router.get(
+    "/calendar",
+    response_model=List[CalendarDay],
+    summary="Get tasks by deadline day",
+    description="Get the authenticated user's tasks due within a date range, grouped by day"
+)
+async def get_calendar(
+    from_date: date = Query(..., alias="from", description="First day (inclusive, ISO 8601)"),
+    to_date: date = Query(..., alias="to", description="Last day (inclusive, ISO 8601)"),
+    current_user: UserInDB = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Get tasks grouped by deadline day
+    
+    - **from**: First day of the range (inclusive)
+    - **to**: Last day of the range (inclusive)
+    
+    Returns one entry per day that has tasks, in ascending order.
+    Recurring tasks are expanded into one entry per occurrence (with
+    series_id and occurrence_date set) over the requested range.
+    Returns 400 if the range is inverted or exceeds the configured maximum.
+    """
+    return await task_service.get_calendar(current_user.id, from_date, to_date)
 
 
 @router.patch(
@@ -98,6 +137,43 @@ async def update_task(
     return updated_task
 
 
+@router.patch(
+    "/{task_id}/occurrences/{occurrence_date}",
+    response_model=TaskResponse,
+    summary="Update one occurrence of a recurring task",
+    description="Complete or edit a single occurrence without changing the series"
+)
+async def update_occurrence(
+    task_id: str,
+    occurrence_date: date,
+    task_data: TaskUpdate,
+    current_user: UserInDB = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Update a single occurrence of a recurring task
+    
+    - **task_id**: Recurring task (series) ID
+    - **occurrence_date**: Occurrence date (ISO 8601)
+    - Any combination of: title, description, priority, deadline, status, label_ids
+    
+    The occurrence is stored as its own task (with series_id and
+    occurrence_date) the first time it is edited; use `{"status": "done"}`
+    to complete it. Returns 404 if the series or occurrence does not exist.
+    """
+    updated_task = await task_service.update_occurrence(
+        task_id, current_user.id, occurrence_date, task_data
+    )
+    
+    if not updated_task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Occurrence not found"
+        )
+    
+    return updated_task
+
+
 @router.delete(
     "/{task_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,58 @@
+"""
+Bloom filter
+Compact probabilistic set membership: no false negatives, rare false positives
+"""
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Sized for `capacity` items at `error_rate` false positives; adding more
+    items than that raises the false positive rate but never causes false
+    negatives. Items cannot be removed; rebuild the filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false positive probability at capacity
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def build(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        """Filter containing the given items"""
+        bloom = cls(capacity, error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory used by the bit array"""
+        return len(self._bits)
+
+    def add(self, item: str) -> None:
+        """Add an item"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
@@ -0,0 +1,190 @@
+"""
+Adaptive concurrency limit
+Caps in-flight requests per worker, adjusting the cap to observed latency
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from .config import settings
+from .metrics import CONCURRENCY_LIMIT
+
+
+@dataclass(eq=False)
+class Permit:
+    """
+    A slot held by one admitted request
+
+    Attributes:
+        priority: Request class
+        started_at: Admission time (limiter clock)
+        saturated: Whether the limit was at least half used on admission
+        congested: Whether the request's class was nearly at capacity on admission
+    """
+    priority: str
+    started_at: float
+    saturated: bool
+    congested: bool
+
+
+class _LatencyBaseline:
+    """
+    No-load latency of one route: the minimum over the current and
+    previous window, so it follows lasting changes within two windows
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._window_start: Optional[float] = None
+        self._current = math.inf
+        self._previous = math.inf
+
+    def observe(self, latency: float, now: float) -> float:
+        if self._window_start is None or now - self._window_start >= self.window_seconds:
+            self._previous, self._current = self._current, math.inf
+            self._window_start = now
+        self._current = min(self._current, latency)
+        return min(self._current, self._previous)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD limit on concurrent requests
+
+    Latency is compared with a per-route baseline, so a route that is
+    simply slower than others of its class is not mistaken for queueing.
+    A request admitted while its class was nearly at capacity
+    (`CONGESTED`) whose latency exceeds `tolerance` times its route
+    baseline (and by more than `slack_seconds`), or which ended in
+    503/504, signals queueing: the limit shrinks multiplicatively, at most
+    once per round trip (signals from requests admitted before the last
+    decrease are ignored). Slow requests under light load never shrink it.
+
+    Fast completions while the limit is at least half used grow it by one
+    per `limit` completions. Fast completions under light load grow it back
+    toward the initial limit at the same rate, so it recovers once load
+    drops instead of staying where the last overload left it. Requests are
+    never queued here: a request that does not fit is refused immediately.
+
+    Each class may only use its share of the limit (see
+    CONCURRENCY_PRIORITY_SHARES), so as the limit shrinks, bcrypt-bound auth
+    requests are shed first and cheap reads last.
+    """
+
+    BACKOFF = 0.9
+    BASELINE_WINDOW_SECONDS = 30
+    # In-flight fraction at admission: of the limit, and of the request
+    # class's capacity
+    SATURATED = 0.5
+    CONGESTED = 0.8
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        minimum: Optional[int] = None,
+        maximum: Optional[int] = None,
+        tolerance: Optional[float] = None,
+        slack_seconds: Optional[float] = None,
+        shares: Optional[Dict[str, float]] = None,
+        clock=time.monotonic
+    ):
+        """
+        Args:
+            initial: Starting limit
+            minimum: Lowest limit
+            maximum: Highest limit
+            tolerance: Latency / baseline ratio treated as queueing
+            slack_seconds: Latency above the baseline always tolerated
+            shares: Fraction of the limit each request class may use
+            clock: Time source (seconds)
+        """
+        self.minimum = minimum or settings.CONCURRENCY_LIMIT_MIN
+        self.maximum = maximum or settings.CONCURRENCY_LIMIT_MAX
+        self.initial = float(min(max(initial or settings.CONCURRENCY_LIMIT_INITIAL, self.minimum), self.maximum))
+        self.limit = self.initial
+        self.tolerance = tolerance or settings.CONCURRENCY_LATENCY_TOLERANCE
+        self.slack_seconds = (
+            settings.CONCURRENCY_LATENCY_SLACK_MS / 1000 if slack_seconds is None else slack_seconds
+        )
+        self.shares = {**settings.CONCURRENCY_PRIORITY_SHARES, **(shares or {})}
+        self.clock = clock
+        self.in_flight = 0
+        self._last_decrease = -math.inf
+        self._baselines: Dict[str, _LatencyBaseline] = {}
+        CONCURRENCY_LIMIT.set(self.limit)
+
+    def capacity(self, priority: str) -> int:
+        """Concurrent requests of a class allowed at the current limit"""
+        return max(1, int(self.limit * self.shares.get(priority, 1.0)))
+
+    def try_acquire(self, priority: str) -> Optional[Permit]:
+        """
+        Admit a request if its class has room
+
+        Returns:
+            Permit to pass to release(), or None if the request should be shed
+        """
+        if self.in_flight >= self.capacity(priority):
+            return None
+        self.in_flight += 1
+        return Permit(
+            priority,
+            self.clock(),
+            saturated=self.in_flight >= self.limit * self.SATURATED,
+            congested=self.in_flight >= self.capacity(priority) * self.CONGESTED
+        )
+
+    def release(self, permit: Permit, ok: Optional[bool], route: Optional[str] = None) -> None:
+        """
+        Free a slot and adjust the limit
+
+        Args:
+            permit: Permit from try_acquire()
+            ok: True for a normal completion, False for an overload signal
+                (503/504), None to free the slot without a latency sample
+                (cancelled or failed requests)
+            route: Route the request matched, e.g. "GET /tasks/" (default:
+                its class); latency is compared with this route's baseline
+        """
+        self.in_flight -= 1
+        if ok is None:
+            return
+
+        now = self.clock()
+        latency = now - permit.started_at
+        key = route or permit.priority
+        baseline = self._baselines.get(key)
+        if baseline is None:
+            baseline = self._baselines[key] = _LatencyBaseline(self.BASELINE_WINDOW_SECONDS)
+        no_load_latency = baseline.observe(latency, now)
+        queueing = latency > no_load_latency * self.tolerance and latency - no_load_latency > self.slack_seconds
+
+        if not ok or queueing:
+            if permit.congested and permit.started_at >= self._last_decrease:
+                self.limit = max(float(self.minimum), self.limit * self.BACKOFF)
+                self._last_decrease = now
+        elif permit.saturated:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+        elif self.limit < self.initial:
+            self.limit = min(self.initial, self.limit + 1 / self.limit)
+        CONCURRENCY_LIMIT.set(self.limit)
+
+
+def request_priority(method: str, path: str, auth_routes: Iterable[str]) -> str:
+    """
+    Class of a request
+
+    Args:
+        method: HTTP method
+        path: Request path
+        auth_routes: "METHOD /path" entries that do password hashing
+
+    Returns:
+        "auth" for listed routes, "read" for safe methods, else "write"
+    """
+    if f"{method} {path.rstrip('/') or '/'}" in auth_routes:
+        return 'auth'
+    if method in ('GET', 'HEAD', 'OPTIONS'):
+        return 'read'
+    return 'write'
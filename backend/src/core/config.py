@@ -2,6 +2,7 @@
 Application configuration
 Loads environment variables using Pydantic Settings
 """
+from typing import Dict, List, Literal, Optional
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -12,10 +13,149 @@ class Settings(BaseSettings):
     
     MONGODB_URI: str
     DATABASE_NAME: str = "todox"
+    
+    # "memory" keeps all data in process (tests and benchmarks only; data
+    # is per worker and lost on restart)
+    DATABASE_BACKEND: Literal["mongodb", "memory"] = "mongodb"
+    
+    # Motor connection pool and timeouts (per worker process)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 30000
+    
+    # "sync" creates missing indexes at startup; "skip" leaves it to
+    # `python -m src.tools.indexes sync` run as a deploy step
+    INDEX_STARTUP_MODE: Literal["sync", "skip"] = "sync"
+    
+    # Readiness probe background ping
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+    
+    # bcrypt cost: BCRYPT_ROUNDS if set, otherwise calibrated at startup to
+    # the highest cost hashing within BCRYPT_TARGET_MS on this hardware.
+    # Stored hashes at a lower cost are upgraded on the user's next login;
+    # pin BCRYPT_ROUNDS in production so every worker hashes at one cost.
+    # The floor is the previous fixed cost (security.DEFAULT_BCRYPT_ROUNDS),
+    # so a slow or busy host at startup can only raise the cost.
+    BCRYPT_ROUNDS: Optional[int] = None
+    BCRYPT_TARGET_MS: float = 250
+    BCRYPT_MIN_ROUNDS: int = 12
+    BCRYPT_MAX_ROUNDS: int = 16
+    
     JWT_SECRET: str = "dev-secret-change-in-production"
     JWT_EXPIRES_IN: int = 3600
     JWT_ALGORITHM: str = "HS256"
+    # Asymmetric signing (JWT_ALGORITHM=ES256 or RS256): private key PEM or
+    # path to one, its key ID (default: key thumbprint), and retired public
+    # keys by key ID that are still accepted during a rotation. Public keys
+    # are served at /.well-known/jwks.json.
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_KEY_ID: Optional[str] = None
+    JWT_PUBLIC_KEYS: Dict[str, str] = {}
+    # Opaque refresh tokens (POST /auth/refresh), rotated on every use
+    REFRESH_TOKEN_EXPIRES_IN: int = 30 * 86400
+    # Users whose access tokens were revoked (password change) are kept in
+    # an in-memory Bloom filter, rebuilt from the database periodically so
+    # other workers' revocations apply within the interval
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 30
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
     CORS_ORIGINS: str = "http://localhost:3000"
+    # X-Admin-Key for admin endpoints (POST /admin/users); unset disables them
+    ADMIN_API_KEY: Optional[str] = None
+    CALENDAR_MAX_RANGE_DAYS: int = 92
+    
+    # Request deadlines (X-Request-Timeout header, milliseconds)
+    REQUEST_TIMEOUT_MS: int = 10000
+    REQUEST_TIMEOUT_MAX_MS: int = 60000
+    
+    # Deadline reminders
+    REMINDERS_ENABLED: bool = False
+    REMINDER_LEAD_SECONDS: int = 86400
+    REMINDER_WINDOW_SECONDS: int = 3600
+    REMINDER_SCAN_INTERVAL_SECONDS: int = 60
+    REMINDER_RESCAN_INTERVAL_SECONDS: int = 600
+    REMINDER_LEASE_SECONDS: int = 30
+    REMINDER_SINK: Literal["log", "webhook", "queue"] = "log"
+    REMINDER_WEBHOOK_URL: Optional[str] = None
+    
+    # Server-Sent Events
+    EVENTS_BUFFER_SIZE: int = 100
+    EVENTS_MAX_CONNECTIONS: int = 10000
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_RETRY_MS: int = 3000
+    
+    # Rate limiting: token buckets per user (valid bearer token) or IP.
+    # RATE_LIMIT_ROUTES adds stricter buckets for "METHOD /path" templates.
+    # The memory store is per worker; "mongodb" shares buckets across workers.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "100/minute"
+    RATE_LIMIT_ROUTES: Dict[str, str] = {
+        "POST /auth/login": "10/minute",
+        "POST /auth/register": "5/minute",
+    }
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/livez", "/readyz", "/health", "/metrics"]
+    RATE_LIMIT_STORE: Literal["memory", "mongodb"] = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Trusted reverse proxies in front of the app (client IP from
+    # X-Forwarded-For). With 0 behind a proxy, every anonymous client shares
+    # the proxy's address; the Railway/Procfile start commands set 1.
+    RATE_LIMIT_PROXY_HOPS: int = 0
+    
+    # Failed login lockout: after the free attempts, each failure locks the
+    # email (or client IP) for base * 2^n seconds, up to the maximum. Emails
+    # have a short cap since anyone can fail logins for any email. The IP
+    # key is only used with RATE_LIMIT_PROXY_HOPS > 0 (see above).
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_EMAIL_FREE_ATTEMPTS: int = 5
+    LOGIN_THROTTLE_IP_FREE_ATTEMPTS: int = 20
+    LOGIN_THROTTLE_BASE_DELAY_SECONDS: float = 1
+    LOGIN_THROTTLE_MAX_DELAY_SECONDS: float = 900
+    LOGIN_THROTTLE_EMAIL_MAX_DELAY_SECONDS: float = 30
+    LOGIN_THROTTLE_RESET_SECONDS: float = 3600
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    
+    # Adaptive per-worker limit on in-flight requests; requests over it get
+    # 503 immediately instead of queueing on the connection pool. Each class
+    # ("read", "write", "auth") may use its share of the limit, so auth
+    # routes (bcrypt) are shed before reads.
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_LIMIT_INITIAL: int = 50
+    CONCURRENCY_LIMIT_MIN: int = 5
+    CONCURRENCY_LIMIT_MAX: int = 500
+    CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    CONCURRENCY_LATENCY_SLACK_MS: float = 20
+    CONCURRENCY_PRIORITY_SHARES: Dict[str, float] = {"read": 1.0, "write": 0.9, "auth": 0.5}
+    CONCURRENCY_AUTH_ROUTES: List[str] = [
+        "POST /auth/login",
+        "POST /auth/register",
+        "PATCH /auth/update-password",
+        "POST /admin/users",
+    ]
+    # Path prefixes never limited (probes, metrics, long-lived event streams)
+    CONCURRENCY_EXEMPT_PATHS: List[str] = ["/livez", "/readyz", "/health", "/metrics", "/events"]
+    
+    # Share one in-flight list query among identical concurrent requests
+    SINGLE_FLIGHT_ENABLED: bool = True
+    
+    # Encoded GET /tasks/ responses cached per user and invalidated by task
+    # writes. With several workers, invalidations only reach other workers
+    # through a shared broker; the TTL bounds staleness otherwise.
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_COMPRESS: bool = True
+    RESPONSE_CACHE_COMPRESS_MIN_BYTES: int = 1024
+    RESPONSE_CACHE_BROKER: Literal["local"] = "local"
+    
+    # Slow query log
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300
 
 
 settings = Settings()
@@ -2,48 +2,187 @@
 MongoDB database connection
 Provides async MongoDB client using Motor
 """
-from typing import Optional
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple, cast
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from .config import settings
+from .indexes import drop_replaced_indexes, find_conflicts, sync_indexes
+from .memory_database import MemoryClient
+from .mongo_monitoring import CommandMetricsListener, PoolMetricsListener
+from .slow_query import SlowQueryListener
 
 # Global client instance
 client: Optional[AsyncIOMotorClient] = None
+slow_query_listener: Optional[SlowQueryListener] = None
 
 
-async def connect_to_database():
-    """Initialize MongoDB connection on startup"""
-    global client
-    client = AsyncIOMotorClient(
+def create_client(event_listeners: Sequence[Any] = ()) -> AsyncIOMotorClient:
+    """
+    Create a client for the configured DATABASE_BACKEND
+    
+    Args:
+        event_listeners: pymongo monitoring listeners (ignored in memory mode)
+        
+    Returns:
+        Motor client, or a MemoryClient exposing the same API
+    """
+    if settings.DATABASE_BACKEND == "memory":
+        # Duck-typed: implements the part of the Motor API this app uses
+        return cast(AsyncIOMotorClient, MemoryClient())
+    return AsyncIOMotorClient(
         settings.MONGODB_URI,
-        maxPoolSize=10,
-        minPoolSize=1
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=list(event_listeners)
     )
+
+
+async def connect_to_database():
+    """Initialize MongoDB connection on startup"""
+    global client, slow_query_listener
+    if settings.DATABASE_BACKEND == "memory":
+        client = create_client()
+        print(f"Using in-memory database: {settings.DATABASE_NAME}")
+    else:
+        slow_query_listener = SlowQueryListener()
+        client = create_client([CommandMetricsListener(), PoolMetricsListener(), slow_query_listener])
+        # explain() runs on the listener's own thread via the synchronous client
+        slow_query_listener.client = client.delegate
+        
+        # Test connection, then open minPoolSize connections up front so the
+        # first requests don't pay for TCP/TLS handshakes and authentication
+        await client.admin.command('ping')
+        await prewarm_pool(client, settings.MONGO_MIN_POOL_SIZE)
+        print(f"Connected to MongoDB database: {settings.DATABASE_NAME}")
+    
+    # Index/migration work is either done here (one list_indexes per
+    # collection once everything exists) or by a separate
+    # `python -m src.tools.indexes sync` step, letting workers skip it
+    if settings.INDEX_STARTUP_MODE == "sync":
+        created = await migrate(get_database())
+        print(f"Database indexes checked, created: {created or 'none'}")
+        applied = await run_data_migrations(get_database())
+        if applied:
+            print(f"Data migrations applied: {applied}")
+
+
+async def migrate(db: AsyncIOMotorDatabase, rolling: bool = False, pause_seconds: float = 0) -> List[str]:
+    """
+    Create missing manifest indexes and drop superseded ones
     
-    # Test connection
-    await client.admin.command('ping')
-    print(f"Connected to MongoDB database: {settings.DATABASE_NAME}")
+    Idempotent; safe to run from every worker or as a deploy step. Data
+    migrations are not run here (see run_data_migrations). A
+    unique index that existing documents would violate (e.g. emails that
+    differ only by case) is skipped with a warning, and the index it
+    replaces is kept, until the duplicates are resolved; see
+    `python -m src.tools.indexes conflicts`.
     
-    # Create indexes
-    from ..repositories.user_repository import UserRepository
+    Args:
+        db: Database instance
+        rolling: Build missing indexes one at a time
+        pause_seconds: Pause between rolling builds
+        
+    Returns:
+        "<collection>.<index>" names of the indexes created
+    """
+    conflicts = await find_conflicts(db)
+    for collection, by_index in conflicts.items():
+        for name, groups in by_index.items():
+            print(f"Skipping index {collection}.{name}: {len(groups)} conflicting value(s), "
+                  f"e.g. {groups[0]['values']}")
+    created = await sync_indexes(
+        db,
+        rolling=rolling,
+        pause_seconds=pause_seconds,
+        exclude={collection: set(by_index) for collection, by_index in conflicts.items()}
+    )
+    await drop_replaced_indexes(db)
+    return [f"{collection}.{name}" for collection, names in created.items() for name in names]
+
+
+def _backfill_priority_rank(db: AsyncIOMotorDatabase) -> Awaitable[int]:
     from ..repositories.task_repository import TaskRepository
-    from ..repositories.label_repository import LabelRepository
-    db = get_database()
+    return TaskRepository(db).backfill_priority_rank()
+
+
+def _backfill_series_reminders(db: AsyncIOMotorDatabase) -> Awaitable[int]:
+    from ..repositories.task_repository import TaskRepository
+    return TaskRepository(db).backfill_series_reminders()
+
+
+# One-off data migrations, in order: (name, step). Each step scans whole
+# collections, so it runs once per database (at startup in sync mode, or
+# from `python -m src.tools.indexes sync`) and is then recorded in the
+# migrations collection; later starts only read those records.
+DATA_MIGRATIONS: List[Tuple[str, Callable[[AsyncIOMotorDatabase], Awaitable[int]]]] = [
+    ('tasks.priority_rank', _backfill_priority_rank),
+    ('tasks.reminder_occurrence', _backfill_series_reminders),
+]
+
+
+async def pending_data_migrations(db: AsyncIOMotorDatabase) -> List[str]:
+    """
+    Names of data migrations not yet applied to a database
+    
+    One query regardless of how many migrations exist.
+    """
+    names = [name for name, _ in DATA_MIGRATIONS]
+    applied = {doc['_id'] async for doc in db.migrations.find({'_id': {'$in': names}}, {'_id': 1})}
+    return [name for name in names if name not in applied]
+
+
+async def run_data_migrations(db: AsyncIOMotorDatabase) -> List[Tuple[str, int]]:
+    """
+    Apply pending data migrations and record each as done
     
-    user_repo = UserRepository(db)
-    await user_repo.ensure_indexes()
+    A step that fails is not recorded and runs again next time; steps are
+    written to be idempotent.
     
-    task_repo = TaskRepository(db)
-    await task_repo.ensure_indexes()
+    Args:
+        db: Database instance
+        
+    Returns:
+        (name, documents updated) for each migration applied
+    """
+    steps = dict(DATA_MIGRATIONS)
+    applied = []
+    for name in await pending_data_migrations(db):
+        updated = await steps[name](db)
+        await db.migrations.update_one(
+            {'_id': name},
+            {'$set': {'applied_at': datetime.utcnow(), 'updated': updated}},
+            upsert=True
+        )
+        applied.append((name, updated))
+    return applied
+
+
+async def prewarm_pool(client: AsyncIOMotorClient, size: int) -> None:
+    """
+    Open up to `size` pooled connections
     
-    label_repo = LabelRepository(db)
-    await label_repo.ensure_indexes()
+    Concurrent pings each check out their own connection, forcing the pool
+    to create them now instead of in the background or on first use.
     
-    print("Database indexes created")
+    Args:
+        client: Connected Motor client
+        size: Number of connections to open
+    """
+    if size > 1:
+        await asyncio.gather(*(client.admin.command('ping') for _ in range(size)))
 
 
 async def close_database_connection():
     """Close MongoDB connection on shutdown"""
     global client
+    if slow_query_listener:
+        slow_query_listener.close()
     if client:
         client.close()
         print("Closed MongoDB connection")
@@ -0,0 +1,74 @@
+"""
+Request deadlines
+Per-request time budget shared by every MongoDB operation the request makes
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import pymongo
+
+from .config import settings
+
+# Monotonic time at which the current request's budget runs out
+_deadline: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+
+
+def parse_timeout_ms(value: Optional[str]) -> int:
+    """
+    Resolve a request's time budget from its X-Request-Timeout header
+
+    Args:
+        value: Header value in milliseconds, or None
+
+    Returns:
+        Budget in milliseconds; REQUEST_TIMEOUT_MS when the header is missing
+        or invalid, capped at REQUEST_TIMEOUT_MAX_MS
+    """
+    timeout_ms = settings.REQUEST_TIMEOUT_MS
+    if value:
+        try:
+            requested = int(value)
+        except ValueError:
+            requested = 0
+        if requested > 0:
+            timeout_ms = requested
+    return min(timeout_ms, settings.REQUEST_TIMEOUT_MAX_MS)
+
+
+@contextmanager
+def request_deadline(timeout_ms: int) -> Iterator[None]:
+    """
+    Run a block under a time budget
+
+    Uses pymongo's client-side operation timeout, so every command issued
+    inside the block (reads and writes, including cursor batches) is sent
+    with maxTimeMS set to the remaining budget, and pool waits and socket
+    reads are bounded by it too. Motor copies the context into its executor
+    threads, so the budget follows the request through the services and
+    repositories without being passed explicitly.
+
+    Args:
+        timeout_ms: Budget in milliseconds
+    """
+    token = _deadline.set(time.monotonic() + timeout_ms / 1000)
+    try:
+        with pymongo.timeout(timeout_ms / 1000):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Seconds left in the current request's budget (None outside a request)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    """Whether the current request has used up its budget"""
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0
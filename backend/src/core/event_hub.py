@@ -0,0 +1,140 @@
+"""
+Event hub
+Fans out change events to per-user Server-Sent Events streams
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from pydantic import BaseModel
+
+from .config import settings
+from .events import Event, event_bus
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One connected stream
+
+    Holds a bounded queue of encoded SSE messages; a None message tells the
+    stream to close (slow-consumer eviction or shutdown).
+    """
+
+    def __init__(self, owner_id: str, buffer_size: int):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=buffer_size)
+        self.evicted = False
+
+    def close(self) -> None:
+        """Drop anything buffered and ask the stream to end"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """
+    Per-owner fan-out of event bus events
+
+    Publishing is O(subscribers of that owner): each event is encoded once
+    and pushed without awaiting onto every subscriber's bounded queue. An
+    idle connection costs one small queue. A subscriber whose queue is full
+    is evicted instead of buffering without limit or slowing writers down.
+
+    The hub only sees events published in its own process, so fan-out is
+    per worker.
+    """
+
+    def __init__(self, buffer_size: Optional[int] = None, max_connections: Optional[int] = None):
+        self.buffer_size = buffer_size or settings.EVENTS_BUFFER_SIZE
+        self.max_connections = max_connections or settings.EVENTS_MAX_CONNECTIONS
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._attached = False
+
+    @property
+    def connection_count(self) -> int:
+        """Number of open subscriptions"""
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        """Whether the per-worker connection limit is reached"""
+        return self._count >= self.max_connections
+
+    def subscribe(self, owner_id: str) -> Optional[Subscription]:
+        """
+        Open a subscription for a user's events
+
+        Args:
+            owner_id: User's ID
+
+        Returns:
+            Subscription, or None if the per-worker connection limit is reached
+        """
+        if self.full:
+            return None
+        if not self._attached:
+            event_bus.subscribe(self._on_event)
+            self._attached = True
+
+        subscription = Subscription(owner_id, self.buffer_size)
+        self._subscribers.setdefault(owner_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription (no-op if already removed)"""
+        subscriptions = self._subscribers.get(subscription.owner_id)
+        if subscriptions and subscription in subscriptions:
+            subscriptions.discard(subscription)
+            self._count -= 1
+            if not subscriptions:
+                del self._subscribers[subscription.owner_id]
+
+    def close(self) -> None:
+        """Close every subscription (on shutdown)"""
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+                self.unsubscribe(subscription)
+
+    def _on_event(self, event: Event) -> None:
+        """Encode an event once and deliver it to the owner's streams"""
+        subscriptions = self._subscribers.get(event.owner_id)
+        if not subscriptions:
+            return
+
+        message = encode_sse(event)
+        for subscription in list(subscriptions):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.info("Evicting slow event stream for user %s", event.owner_id)
+                subscription.evicted = True
+                subscription.close()
+                self.unsubscribe(subscription)
+
+
+def encode_sse(event: Event) -> str:
+    """
+    Encode an event as a Server-Sent Events message
+
+    Args:
+        event: Event to encode
+
+    Returns:
+        "event: <type>\\ndata: <json>\\n\\n"
+    """
+    if isinstance(event.data, BaseModel):
+        data = event.data.model_dump_json()
+    else:
+        data = json.dumps(event.data)
+    return f"event: {event.type}\ndata: {data}\n\n"
+
+
+# Global hub instance used by the /events endpoint
+event_hub = EventHub()
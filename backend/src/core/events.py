@@ -0,0 +1,65 @@
+"""
+In-process event bus
+Delivers repository write events to subscribers within this worker
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    A change to a stored entity
+
+    Attributes:
+        type: Event name, e.g. "task.created" or "task.deleted"
+        owner_id: Owning user's ID (string format)
+        data: Changed entity (model instance) or a dict with at least its id
+    """
+    type: str
+    owner_id: str
+    data: Any = None
+
+
+EventHandler = Callable[[Event], None]
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe bus
+
+    Handlers run inline on publish, so they must be cheap and must not block;
+    anything slow should be queued by the handler and processed elsewhere.
+    """
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler) -> None:
+        """Register a handler for all events"""
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: EventHandler) -> None:
+        """Remove a previously registered handler (no-op if unknown)"""
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def publish(self, event: Event) -> None:
+        """
+        Deliver an event to every handler
+
+        A failing handler is logged and never affects the publisher or the
+        remaining handlers.
+        """
+        for handler in list(self._handlers):
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Event handler failed for %s", event.type)
+
+
+# Global bus instance shared by repositories and background services
+event_bus = EventBus()
@@ -0,0 +1,109 @@
+"""
+Health monitoring
+Background database ping whose cached result serves the readiness probe
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import pymongo
+
+from .config import settings
+from .metrics import MONGO_POOL_CHECKED_OUT, MONGO_POOL_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Pings the database every HEALTH_CHECK_INTERVAL_SECONDS
+
+    Probes read the last result instead of pinging themselves, so probe
+    frequency costs the database nothing. Each ping has its own timeout,
+    and a result older than three intervals counts as not ready, so a
+    stalled check loop cannot report stale success.
+    """
+
+    def __init__(self, interval_seconds: Optional[float] = None, timeout_seconds: Optional[float] = None):
+        self.interval = interval_seconds or settings.HEALTH_CHECK_INTERVAL_SECONDS
+        self.timeout = timeout_seconds or settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        self.client: Any = None
+        self.database_ok = False
+        self.error: Optional[str] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, client: Any) -> None:
+        """Start the background check loop for a connected client"""
+        self.client = client
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the check loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.database_ok = False
+        self.error = "shutting down"
+
+    async def check(self) -> None:
+        """Ping the database once and record the outcome"""
+        start = time.monotonic()
+        try:
+            if self.client is None:
+                raise RuntimeError("Database not initialized")
+            with pymongo.timeout(self.timeout):
+                await self.client.admin.command('ping')
+        except Exception as exc:
+            if self.database_ok:
+                logger.warning("Database health check failed: %s", exc)
+            self.database_ok = False
+            self.error = str(exc) or exc.__class__.__name__
+        else:
+            self.database_ok = True
+            self.error = None
+        self.checked_at = time.monotonic()
+        self.latency_ms = (self.checked_at - start) * 1000
+
+    @property
+    def ready(self) -> bool:
+        """Whether the last check succeeded and is recent"""
+        return (
+            self.database_ok
+            and self.checked_at is not None
+            and time.monotonic() - self.checked_at <= 3 * self.interval
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness report built from cached state (no I/O)"""
+        report: Dict[str, Any] = {
+            "status": "ready" if self.ready else "unavailable",
+            "database": "connected" if self.ready else "disconnected",
+            "checked_seconds_ago": (
+                round(time.monotonic() - self.checked_at, 3) if self.checked_at is not None else None
+            ),
+            "ping_ms": round(self.latency_ms, 3) if self.latency_ms is not None else None,
+            "pool": {
+                "connections": int(MONGO_POOL_CONNECTIONS.value()),
+                "checked_out": int(MONGO_POOL_CHECKED_OUT.value()),
+            },
+        }
+        if self.error:
+            report["error"] = self.error
+        return report
+
+    async def _run(self) -> None:
+        """Check loop"""
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+
+# Global monitor used by the probes
+health_monitor = HealthMonitor()
@@ -0,0 +1,379 @@
+"""
+Index manifest
+Declarative list of every MongoDB index the application relies on
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One declared index: key pattern plus create_index options"""
+    keys: Tuple[Tuple[str, int], ...]
+    options: Dict[str, Any] = field(default_factory=dict)
+    reason: str = ''
+
+    @property
+    def name(self) -> str:
+        """Explicit name, or MongoDB's default name for the key pattern"""
+        return self.options.get('name') or '_'.join(f"{key}_{direction}" for key, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        """IndexModel for create_indexes"""
+        return IndexModel(list(self.keys), **{**self.options, 'name': self.name})
+
+
+def index(*keys: Tuple[str, int], reason: str = '', **options: Any) -> IndexSpec:
+    """Shorthand for declaring an IndexSpec"""
+    return IndexSpec(keys=tuple(keys), options=options, reason=reason)
+
+
+# Case-insensitive string comparison (ICU strength 2: ignores case, not
+# accents). A query only uses an index built with a collation when it
+# passes the same collation.
+CASE_INSENSITIVE: Dict[str, Any] = {'locale': 'en', 'strength': 2}
+
+
+INDEXES: Dict[str, List[IndexSpec]] = {
+    'users': [
+        index(('email', 1), unique=True, name='email_1_ci', collation=CASE_INSENSITIVE,
+              reason="Unique email regardless of case prevents duplicate registrations; login lookup"),
+    ],
+    'tasks': [
+        index(('owner_id', 1), reason="Filtering by owner"),
+        # One compound index per sort field, matching
+        # TaskRepository.SORT_FIELDS; descending sorts walk them backwards
+        index(('owner_id', 1), ('created_at', -1), reason="Task list sorted by creation (default)"),
+        index(('owner_id', 1), ('updated_at', -1), reason="Task list sorted by last update"),
+        index(('owner_id', 1), ('deadline', 1), ('_id', 1),
+              reason="Task list sorted by deadline; calendar range queries"),
+        index(('owner_id', 1), ('priority_rank', 1), ('_id', 1), reason="Task list sorted by priority"),
+        index(('status', 1), ('deadline', 1), reason="Reminder scheduler time-window scans of open tasks"),
+        index(('reminder_occurrence', 1), sparse=True,
+              reason="Reminder scheduler time-window scans of recurring series (only they have the field)"),
+        index(('owner_id', 1), ('deadline', 1),
+              name='owner_id_1_deadline_1_recurring',
+              partialFilterExpression={'recurrence': {'$type': 'object'}},
+              reason="Recurring series by owner, for lazy occurrence expansion"),
+        index(('series_id', 1), ('occurrence_date', 1),
+              unique=True,
+              partialFilterExpression={'series_id': {'$type': 'string'}},
+              reason="At most one materialized task per series occurrence"),
+    ],
+    'labels': [
+        index(('owner_id', 1), ('name', 1), unique=True,
+              name='owner_id_1_name_1_ci', collation=CASE_INSENSITIVE,
+              reason="Prevents duplicate label names per user regardless of case; sorted label list"),
+    ],
+    'refresh_tokens': [
+        index(('user_id', 1), reason="Revoke all of a user's refresh tokens on password change"),
+        index(('family_id', 1), reason="Revoke a login session when a rotated token is reused"),
+        index(('expires_at', 1), expireAfterSeconds=0, reason="TTL: removes expired refresh tokens"),
+    ],
+    'token_revocations': [
+        index(('expires_at', 1), expireAfterSeconds=0,
+              reason="TTL: forgets revocations once the revoked access tokens have expired"),
+    ],
+    'rate_limits': [
+        index(('expires_at', 1), expireAfterSeconds=0,
+              reason="TTL: removes idle token buckets of the shared rate limit store"),
+    ],
+}
+
+
+# Indexes superseded by a manifest index: {collection: {old name: new name}}.
+# migrate drops the old index once its replacement has been built.
+REPLACED_INDEXES: Dict[str, Dict[str, str]] = {
+    'users': {'email_1': 'email_1_ci'},
+    'labels': {'owner_id_1_name_1': 'owner_id_1_name_1_ci'},
+}
+
+
+# Index options whose value changes what an index enforces or serves
+COMPARED_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds', 'collation')
+
+
+@dataclass
+class IndexDiff:
+    """Differences between the manifest and one live collection"""
+    missing: List[IndexSpec] = field(default_factory=list)
+    # Same name, different key pattern or options: (spec, live index info)
+    changed: List[Tuple[IndexSpec, Dict[str, Any]]] = field(default_factory=list)
+    # Live indexes the manifest does not declare (besides _id_)
+    undeclared: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        """Whether the collection matches the manifest"""
+        return not (self.missing or self.changed or self.undeclared)
+
+
+@dataclass
+class IndexUsage:
+    """Size and usage of one live index"""
+    name: str
+    size_bytes: Optional[int]
+    ops: Optional[int]
+    since: Optional[datetime]
+    declared: bool
+
+
+def matches(spec: IndexSpec, info: Dict[str, Any]) -> bool:
+    """
+    Whether a live index (list_indexes document) matches its declaration
+
+    Key directions are compared numerically (the shell may store 1.0).
+    Declared dict options such as collation only need to be a subset of the
+    live value, since the server fills in defaults.
+    """
+    live_keys = tuple(
+        (key, int(direction) if isinstance(direction, (int, float)) else direction)
+        for key, direction in info['key'].items()
+    )
+    if live_keys != spec.keys:
+        return False
+    for option in COMPARED_OPTIONS:
+        # Presence first: expireAfterSeconds=0 is a TTL index, not a missing option
+        if (option in spec.options) != (option in info):
+            return False
+        declared, live = spec.options.get(option), info.get(option)
+        if isinstance(declared, dict) and isinstance(live, dict):
+            if any(live.get(key) != value for key, value in declared.items()):
+                return False
+        elif declared != live:
+            return False
+    return True
+
+
+async def diff_collection(collection: AsyncIOMotorCollection, specs: Sequence[IndexSpec]) -> IndexDiff:
+    """
+    Compare a collection's live indexes with its declared ones
+
+    Args:
+        collection: Collection to inspect
+        specs: Declared indexes
+
+    Returns:
+        Missing, changed and undeclared indexes
+    """
+    live = {info['name']: info async for info in collection.list_indexes()}
+    diff = IndexDiff()
+    for spec in specs:
+        info = live.pop(spec.name, None)
+        if info is None:
+            diff.missing.append(spec)
+        elif not matches(spec, info):
+            diff.changed.append((spec, info))
+    live.pop('_id_', None)
+    diff.undeclared = list(live.values())
+    return diff
+
+
+async def diff_indexes(db: AsyncIOMotorDatabase) -> Dict[str, IndexDiff]:
+    """Diff every manifest collection against the live database"""
+    return {name: await diff_collection(db[name], INDEXES[name]) for name in INDEXES}
+
+
+async def index_usage(collection: AsyncIOMotorCollection, specs: Sequence[IndexSpec]) -> List[IndexUsage]:
+    """
+    Sizes and access counts of a collection's live indexes
+
+    Uses $indexStats (accesses since the index was created or the server
+    last restarted, on the node that answered) and $collStats storage
+    stats, summed across shards.
+
+    Returns:
+        One entry per live index, largest first
+    """
+    ops: Dict[str, int] = {}
+    since: Dict[str, datetime] = {}
+    async for stat in collection.aggregate([{'$indexStats': {}}]):
+        ops[stat['name']] = ops.get(stat['name'], 0) + stat['accesses']['ops']
+        if stat['name'] not in since or stat['accesses']['since'] > since[stat['name']]:
+            since[stat['name']] = stat['accesses']['since']
+
+    sizes: Dict[str, int] = {}
+    async for stat in collection.aggregate([{'$collStats': {'storageStats': {}}}]):
+        for name, size in stat.get('storageStats', {}).get('indexSizes', {}).items():
+            sizes[name] = sizes.get(name, 0) + size
+
+    declared = {spec.name for spec in specs} | {'_id_'}
+    usage = [
+        IndexUsage(name=name, size_bytes=sizes.get(name), ops=ops.get(name), since=since.get(name),
+                   declared=name in declared)
+        for name in sorted(set(ops) | set(sizes))
+    ]
+    usage.sort(key=lambda item: item.size_bytes or 0, reverse=True)
+    return usage
+
+
+async def missing_indexes(
+    collection: AsyncIOMotorCollection,
+    specs: Sequence[IndexSpec]
+) -> List[IndexSpec]:
+    """
+    Declared indexes not present on a collection (matched by name)
+
+    Args:
+        collection: Collection to inspect
+        specs: Declared indexes
+
+    Returns:
+        Specs whose index does not exist yet
+    """
+    existing = {info['name'] async for info in collection.list_indexes()}
+    return [spec for spec in specs if spec.name not in existing]
+
+
+async def unique_conflicts(collection: AsyncIOMotorCollection, spec: IndexSpec) -> List[Dict[str, Any]]:
+    """
+    Documents that would violate a unique index, grouped by index key
+
+    Groups under the index's collation, so a case-insensitive index
+    reports values that differ only by case. Scans the collection; only
+    meant for migrations.
+
+    Args:
+        collection: Collection to inspect
+        spec: Declared unique index
+
+    Returns:
+        One {_id: {field: value}, ids, values, count} group per duplicated
+        key, where values are the conflicting documents' keys as stored
+    """
+    fields = [key for key, _ in spec.keys]
+    pipeline: List[Dict[str, Any]] = []
+    if spec.options.get('partialFilterExpression'):
+        pipeline.append({'$match': spec.options['partialFilterExpression']})
+    pipeline += [
+        {'$group': {
+            '_id': {field: f'${field}' for field in fields},
+            'ids': {'$push': '$_id'},
+            'values': {'$push': {field: f'${field}' for field in fields}},
+            'count': {'$sum': 1},
+        }},
+        {'$match': {'count': {'$gt': 1}}},
+    ]
+    options = {'collation': spec.options['collation']} if spec.options.get('collation') else {}
+    return [group async for group in collection.aggregate(pipeline, **options)]
+
+
+async def find_conflicts(
+    db: AsyncIOMotorDatabase,
+    collections: Optional[Sequence[str]] = None
+) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Existing data that blocks building missing unique manifest indexes
+
+    Only unique indexes that do not exist yet are checked, so once every
+    index is built this costs one list_indexes per collection.
+
+    Args:
+        db: Database
+        collections: Limit to these collections (default: all in the manifest)
+
+    Returns:
+        {collection: {index name: conflict groups}} (see unique_conflicts),
+        only for indexes with conflicts
+    """
+    conflicts: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for name in collections or INDEXES:
+        for spec in await missing_indexes(db[name], INDEXES[name]):
+            if not spec.options.get('unique'):
+                continue
+            groups = await unique_conflicts(db[name], spec)
+            if groups:
+                conflicts.setdefault(name, {})[spec.name] = groups
+    return conflicts
+
+
+async def drop_replaced_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    """
+    Drop superseded indexes (REPLACED_INDEXES) whose replacement exists
+
+    The old index keeps enforcing uniqueness until then, e.g. while
+    conflicts block the new one.
+
+    Returns:
+        "<collection>.<index>" names of the indexes dropped
+    """
+    dropped = []
+    for name, replaced in REPLACED_INDEXES.items():
+        live = {info['name'] async for info in db[name].list_indexes()}
+        for old, new in replaced.items():
+            if old in live and new in live:
+                await db[name].drop_index(old)
+                dropped.append(f"{name}.{old}")
+    return dropped
+
+
+async def sync_collection_indexes(
+    collection: AsyncIOMotorCollection,
+    specs: Sequence[IndexSpec],
+    rolling: bool = False,
+    pause_seconds: float = 0,
+    exclude: Collection[str] = ()
+) -> List[str]:
+    """
+    Create the declared indexes that are missing on one collection
+
+    One list_indexes round trip when nothing is missing, plus a single
+    createIndexes for everything that is. A rolling sync builds one index
+    at a time instead, pausing in between, so a large collection never has
+    several builds competing for I/O.
+
+    Args:
+        collection: Collection to sync
+        specs: Declared indexes
+        rolling: Build missing indexes one after another
+        pause_seconds: Pause between rolling builds
+        exclude: Names of indexes not to build
+
+    Returns:
+        Names of the indexes created
+    """
+    missing = [spec for spec in await missing_indexes(collection, specs) if spec.name not in exclude]
+    if not missing:
+        return []
+    if not rolling:
+        await collection.create_indexes([spec.model() for spec in missing])
+        return [spec.name for spec in missing]
+
+    for position, spec in enumerate(missing):
+        if position and pause_seconds:
+            await asyncio.sleep(pause_seconds)
+        await collection.create_indexes([spec.model()])
+    return [spec.name for spec in missing]
+
+
+async def sync_indexes(
+    db: AsyncIOMotorDatabase,
+    collections: Optional[Sequence[str]] = None,
+    rolling: bool = False,
+    pause_seconds: float = 0,
+    exclude: Optional[Mapping[str, Collection[str]]] = None
+) -> Dict[str, List[str]]:
+    """
+    Create every missing manifest index
+
+    Args:
+        db: Database
+        collections: Limit to these collections (default: all in the manifest)
+        rolling: Build missing indexes one at a time (see sync_collection_indexes)
+        pause_seconds: Pause between rolling builds
+        exclude: Index names not to build, per collection
+
+    Returns:
+        Created index names per collection
+    """
+    created = {}
+    for name in collections or INDEXES:
+        created[name] = await sync_collection_indexes(
+            db[name], INDEXES[name], rolling, pause_seconds, (exclude or {}).get(name, ())
+        )
+    return created
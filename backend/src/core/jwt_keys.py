@@ -0,0 +1,182 @@
+"""
+JWT keys
+Access token signing key and cached verifying keys, with key rotation
+"""
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWTError
+
+from .config import settings
+
+SYMMETRIC_ALGORITHMS = ('HS256', 'HS384', 'HS512')
+ASYMMETRIC_ALGORITHMS = ('ES256', 'ES384', 'ES512', 'RS256', 'RS384', 'RS512')
+
+EC_CURVE_ALGORITHMS = {'secp256r1': 'ES256', 'secp384r1': 'ES384', 'secp521r1': 'ES512'}
+
+
+def load_pem(value: str) -> str:
+    """PEM text as given, or read from the file it names"""
+    value = value.strip()
+    if value.startswith('-----BEGIN'):
+        return value.replace('\\n', '\n')
+    return Path(value).read_text()
+
+
+def key_id(public_jwk: Dict[str, Any]) -> str:
+    """
+    Key ID derived from a public JWK (RFC 7638 thumbprint, shortened)
+
+    The same key always gets the same ID, so workers agree on it without
+    configuration.
+    """
+    required = {'EC': ('crv', 'kty', 'x', 'y'), 'RSA': ('e', 'kty', 'n')}[public_jwk['kty']]
+    canonical = json.dumps({name: public_jwk[name] for name in required}, separators=(',', ':'), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode('utf-8')).digest()
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')[:16]
+
+
+def public_key_algorithm(public_pem: str, rsa_algorithm: str = 'RS256') -> str:
+    """
+    Signing algorithm of a public key: ES* by curve, rsa_algorithm for RSA
+
+    Raises:
+        ValueError: Unsupported key type
+    """
+    public_key = serialization.load_pem_public_key(public_pem.encode('utf-8'))
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and public_key.curve.name in EC_CURVE_ALGORITHMS:
+        return EC_CURVE_ALGORITHMS[public_key.curve.name]
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return rsa_algorithm
+    raise ValueError("JWT verifying keys must be EC (P-256/384/521) or RSA")
+
+
+class KeyRing:
+    """
+    The key new tokens are signed with plus every key tokens may be verified with
+
+    Key objects are parsed once and cached by key ID, so verifying a token
+    is a dictionary lookup plus the signature check. Asymmetric tokens
+    carry a `kid` header naming their key. Rotation works as follows:
+
+    1. Sign with a new private key.
+    2. Keep the old public key in JWT_PUBLIC_KEYS until tokens signed with
+       it have expired.
+
+    Each key only accepts its own algorithm, so a token cannot pick a
+    weaker one (e.g. HS256 with the public key as secret).
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: str,
+        kid: Optional[str] = None,
+        verifying_keys: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            algorithm: Signing algorithm (HS*, ES* or RS*)
+            signing_key: Shared secret (HS*) or private key PEM
+            kid: Signing key ID (default: thumbprint of the public key)
+            verifying_keys: Retired public key PEMs by key ID (asymmetric only)
+
+        Raises:
+            ValueError: Unsupported algorithm or unusable key
+        """
+        if algorithm not in SYMMETRIC_ALGORITHMS + ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.symmetric = algorithm in SYMMETRIC_ALGORITHMS
+        self._signing_key: Key = jwk.construct(signing_key, algorithm)
+        self._verifying_keys: Dict[Optional[str], Tuple[str, Key]] = {}
+        self._public_jwks: List[Dict[str, Any]] = []
+
+        if self.symmetric:
+            self.kid = kid
+            self._verifying_keys[kid] = (algorithm, self._signing_key)
+            return
+
+        public_key = self._signing_key.public_key()
+        self.kid = kid or key_id(public_key.to_dict())
+        self._add_verifying_key(self.kid, algorithm, public_key)
+        for retired_kid, public_pem in (verifying_keys or {}).items():
+            pem = load_pem(public_pem)
+            retired_algorithm = public_key_algorithm(
+                pem, algorithm if algorithm.startswith('RS') else 'RS256'
+            )
+            self._add_verifying_key(retired_kid, retired_algorithm, jwk.construct(pem, retired_algorithm))
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        """
+        Key ring from JWT_ALGORITHM and JWT_SECRET (HS*) or
+        JWT_PRIVATE_KEY, JWT_KEY_ID and JWT_PUBLIC_KEYS (ES*, RS*)
+
+        Raises:
+            ValueError: Asymmetric algorithm without JWT_PRIVATE_KEY
+        """
+        algorithm = settings.JWT_ALGORITHM
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            return cls(algorithm, settings.JWT_SECRET)
+        if not settings.JWT_PRIVATE_KEY:
+            raise ValueError(f"JWT_ALGORITHM={algorithm} requires JWT_PRIVATE_KEY")
+        return cls(
+            algorithm,
+            load_pem(settings.JWT_PRIVATE_KEY),
+            settings.JWT_KEY_ID,
+            settings.JWT_PUBLIC_KEYS
+        )
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """Encode and sign claims with the current key"""
+        headers = {'kid': self.kid} if self.kid else None
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=headers)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token's signature and expiry and return its claims
+
+        Tokens without a kid are checked against the current signing key.
+
+        Raises:
+            JWTError: Unknown key, wrong algorithm, bad signature or expired
+        """
+        kid = jwt.get_unverified_header(token).get('kid')
+        entry = self._verifying_keys.get(kid) or (None if kid else self._verifying_keys.get(self.kid))
+        if entry is None:
+            raise JWTError("Unknown signing key")
+        algorithm, key = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+    def jwks(self) -> Dict[str, Any]:
+        """Public keys as a JWK Set (empty for shared-secret algorithms)"""
+        return {'keys': list(self._public_jwks)}
+
+    def _add_verifying_key(self, kid: str, algorithm: str, public_key: Key) -> None:
+        self._verifying_keys[kid] = (algorithm, public_key)
+        self._public_jwks.append({**public_key.to_dict(), 'kid': kid, 'alg': algorithm, 'use': 'sig'})
+
+
+_key_ring: Optional[KeyRing] = None
+
+
+def get_key_ring() -> KeyRing:
+    """Key ring built from settings on first use"""
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = KeyRing.from_settings()
+    return _key_ring
+
+
+def reset_key_ring() -> None:
+    """Rebuild the key ring from settings on next use (after changing them)"""
+    global _key_ring
+    _key_ring = None
@@ -0,0 +1,116 @@
+"""
+Login throttle
+Per-email and per-IP failed login counters with exponential backoff
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+from .config import settings
+
+
+@dataclass
+class _Failures:
+    count: int
+    last_failure: float
+    locked_until: float = 0.0
+
+
+class LoginThrottle:
+    """
+    In-process failed login tracker
+
+    After `free_attempts` consecutive failures for a key, each further
+    failure locks the key for base_delay * 2^n seconds, capped at
+    email_max_delay for emails and max_delay for IPs. Anyone can fail
+    logins for someone else's email, so its cap is kept short: it slows
+    guessing to a few attempts a minute, but locks the real user out for
+    at most that long. Locked attempts are refused before the user lookup and the
+    bcrypt verify, so guessing against a locked email or from a locked IP
+    costs a dictionary lookup. A successful login clears the email's
+    counter but not the IP's, so one valid account cannot be used to reset
+    an IP that is spraying others. Keys idle for reset_seconds are
+    forgotten, and at most max_keys are kept (least recently failed are
+    evicted first). Counters are per worker.
+    """
+
+    def __init__(
+        self,
+        email_free_attempts: Optional[int] = None,
+        ip_free_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        email_max_delay: Optional[float] = None,
+        reset_seconds: Optional[float] = None,
+        max_keys: Optional[int] = None,
+        clock=time.monotonic
+    ):
+        self.email_free_attempts = email_free_attempts or settings.LOGIN_THROTTLE_EMAIL_FREE_ATTEMPTS
+        self.ip_free_attempts = ip_free_attempts or settings.LOGIN_THROTTLE_IP_FREE_ATTEMPTS
+        self.base_delay = base_delay or settings.LOGIN_THROTTLE_BASE_DELAY_SECONDS
+        self.max_delay = max_delay or settings.LOGIN_THROTTLE_MAX_DELAY_SECONDS
+        self.email_max_delay = email_max_delay or settings.LOGIN_THROTTLE_EMAIL_MAX_DELAY_SECONDS
+        self.reset_seconds = reset_seconds or settings.LOGIN_THROTTLE_RESET_SECONDS
+        self.max_keys = max_keys or settings.LOGIN_THROTTLE_MAX_KEYS
+        self.clock = clock
+        self._failures: "OrderedDict[str, _Failures]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def retry_after(self, email: str, client_ip: Optional[str] = None) -> float:
+        """
+        Seconds until a login attempt is allowed
+
+        Args:
+            email: Attempted email address
+            client_ip: Client IP address, if known
+
+        Returns:
+            0 if the attempt may proceed, else the longest remaining lockout
+        """
+        now = self.clock()
+        wait = 0.0
+        for key, _, _ in self._keys(email, client_ip):
+            entry = self._failures.get(key)
+            if entry is not None:
+                wait = max(wait, entry.locked_until - now)
+        return wait
+
+    def record_failure(self, email: str, client_ip: Optional[str] = None) -> None:
+        """Count a failed attempt and lock keys past their free attempts"""
+        now = self.clock()
+        for key, free_attempts, max_delay in self._keys(email, client_ip):
+            entry = self._failures.pop(key, None)
+            if entry is None or now - entry.last_failure > self.reset_seconds:
+                entry = _Failures(0, now)
+            entry.count += 1
+            entry.last_failure = now
+            if entry.count > free_attempts:
+                delay = self.base_delay * 2 ** min(entry.count - free_attempts - 1, 32)
+                entry.locked_until = now + min(delay, max_delay)
+            self._failures[key] = entry
+        while len(self._failures) > self.max_keys:
+            self._failures.popitem(last=False)
+
+    def record_success(self, email: str) -> None:
+        """Clear the email's failure count after a successful login"""
+        self._failures.pop(self._email_key(email), None)
+
+    def clear(self) -> None:
+        """Forget all failures"""
+        self._failures.clear()
+
+    def _keys(self, email: str, client_ip: Optional[str]) -> Iterable[Tuple[str, int, float]]:
+        yield self._email_key(email), self.email_free_attempts, self.email_max_delay
+        if client_ip:
+            yield f"ip:{client_ip}", self.ip_free_attempts, self.max_delay
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email.strip().lower()}"
+
+
+# Global throttle used by AuthService.login (when LOGIN_THROTTLE_ENABLED)
+login_throttle = LoginThrottle()
@@ -0,0 +1,740 @@
+"""
+In-memory database
+Process-local stand-in for the subset of Motor's API the repositories use
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from bson import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+Document = Dict[str, Any]
+SortSpec = List[Tuple[str, int]]
+
+_MISSING = object()
+
+# BSON comparison order, so mixed-type sorts and range queries behave
+# like MongoDB (missing/null first)
+_TYPE_ORDER: List[Tuple[type, int]] = [
+    (type(None), 1), (bool, 8), (int, 2), (float, 2), (str, 3),
+    (dict, 4), (list, 5), (bytes, 6), (ObjectId, 7), (datetime, 9),
+]
+
+_TYPE_ALIASES: Dict[str, Tuple[type, ...]] = {
+    'double': (float,), 'string': (str,), 'object': (dict,), 'array': (list,),
+    'objectId': (ObjectId,), 'bool': (bool,), 'date': (datetime,), 'null': (type(None),),
+    'int': (int,), 'long': (int,), 'number': (int, float),
+}
+
+
+def _copy(value: Any) -> Any:
+    """Copy nested dicts and lists (leaves are immutable BSON values)"""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _type_rank(value: Any) -> int:
+    for kind, rank in _TYPE_ORDER:
+        if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+            return rank
+    return 10
+
+
+def _fold(value: Any) -> Any:
+    """Casefold strings, including inside documents and arrays"""
+    if isinstance(value, str):
+        return value.casefold()
+    if isinstance(value, dict):
+        return {key: _fold(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fold(item) for item in value]
+    return value
+
+
+def _sort_key(value: Any, fold_case: bool = False) -> Tuple[int, Any]:
+    if value is _MISSING:
+        value = None
+    if fold_case:
+        value = _fold(value)
+    if isinstance(value, (dict, list)):
+        return _type_rank(value), repr(value)
+    return _type_rank(value), value
+
+
+def _get(doc: Any, path: str) -> Any:
+    """Value at a dotted path, or _MISSING"""
+    for part in path.split('.'):
+        if isinstance(doc, dict):
+            doc = doc.get(part, _MISSING)
+        elif isinstance(doc, list) and part.isdigit() and int(part) < len(doc):
+            doc = doc[int(part)]
+        else:
+            return _MISSING
+        if doc is _MISSING:
+            return _MISSING
+    return doc
+
+
+def _set(doc: Document, path: str, value: Any) -> None:
+    parts = path.split('.')
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc: Document, path: str) -> None:
+    parts = path.split('.')
+    for part in parts[:-1]:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            return
+        doc = child
+    doc.pop(parts[-1], None)
+
+
+def _compare(value: Any, operand: Any, predicate: Callable[[Any, Any], bool]) -> bool:
+    """Range comparison; values of different BSON types never match"""
+    if value is _MISSING or _type_rank(value) != _type_rank(operand):
+        return False
+    return predicate(value, operand)
+
+
+def _equals(value: Any, operand: Any, fold_case: bool) -> bool:
+    if value is _MISSING:
+        return operand is None
+    if fold_case and isinstance(value, str) and isinstance(operand, str):
+        return value.casefold() == operand.casefold()
+    return value == operand
+
+
+def _condition(value: Any, condition: Any, fold_case: bool) -> bool:
+    """Whether a field value satisfies a query condition"""
+    if isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition):
+        return all(_operator(value, op, operand, fold_case) for op, operand in condition.items())
+    if _equals(value, condition, fold_case):
+        return True
+    # Equality against an array field matches any element
+    return isinstance(value, list) and any(_equals(item, condition, fold_case) for item in value)
+
+
+def _operator(value: Any, op: str, operand: Any, fold_case: bool) -> bool:
+    elements = value if isinstance(value, list) else [value]
+    if op == '$eq':
+        return _condition(value, operand, fold_case)
+    if op == '$ne':
+        return not _condition(value, operand, fold_case)
+    if op == '$in':
+        return any(_condition(value, item, fold_case) for item in operand)
+    if op == '$nin':
+        return not any(_condition(value, item, fold_case) for item in operand)
+    if op == '$exists':
+        return (value is not _MISSING) == bool(operand)
+    if op == '$type':
+        kinds = sum((_TYPE_ALIASES[name] for name in ([operand] if isinstance(operand, str) else operand)), ())
+        return value is not _MISSING and isinstance(value, kinds) and not (
+            isinstance(value, bool) and bool not in kinds
+        )
+    if op == '$not':
+        return not _condition(value, operand, fold_case)
+    if op == '$size':
+        return isinstance(value, list) and len(value) == operand
+    if op == '$elemMatch':
+        return isinstance(value, list) and any(
+            matches(item, operand, fold_case) if isinstance(item, dict) else _condition(item, operand, fold_case)
+            for item in value
+        )
+    comparisons = {
+        '$gt': lambda a, b: a > b, '$gte': lambda a, b: a >= b,
+        '$lt': lambda a, b: a < b, '$lte': lambda a, b: a <= b,
+    }
+    if op in comparisons:
+        return any(_compare(item, operand, comparisons[op]) for item in elements)
+    raise OperationFailure(f"Unsupported query operator in memory backend: {op}")
+
+
+def matches(doc: Document, query: Optional[Mapping[str, Any]], fold_case: bool = False) -> bool:
+    """
+    Whether a document matches a MongoDB query
+
+    Supports equality (including null-matches-missing and array
+    membership), comparison, $in/$nin, $exists, $type, $not, $size,
+    $elemMatch, $and, $or and $nor.
+
+    Args:
+        doc: Document
+        query: Query filter
+        fold_case: Compare strings case-insensitively (collation strength <= 2)
+    """
+    for key, condition in (query or {}).items():
+        if key == '$and':
+            if not all(matches(doc, part, fold_case) for part in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(doc, part, fold_case) for part in condition):
+                return False
+        elif key == '$nor':
+            if any(matches(doc, part, fold_case) for part in condition):
+                return False
+        elif not _condition(_get(doc, key), condition, fold_case):
+            return False
+    return True
+
+
+def _normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> SortSpec:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, Mapping):
+        return list(key_or_list.items())
+    return [(key, value) for key, value in key_or_list]
+
+
+def _sorted(docs: List[Document], spec: SortSpec, fold_case: bool = False) -> List[Document]:
+    # Stable sorts from the least significant key up
+    for key, direction in reversed(spec):
+        docs = sorted(docs, key=lambda doc: _sort_key(_get(doc, key), fold_case), reverse=direction == -1)
+    return docs
+
+
+def _project(doc: Document, projection: Optional[Mapping[str, Any]]) -> Document:
+    if not projection:
+        return doc
+    include_id = projection.get('_id', 1)
+    fields = {key: value for key, value in projection.items() if key != '_id'}
+    if fields and all(fields.values()):
+        projected = {key: doc[key] for key in fields if key in doc}
+        if include_id and '_id' in doc:
+            projected = {'_id': doc['_id'], **projected}
+        return projected
+    projected = {key: value for key, value in doc.items() if key not in fields}
+    if not include_id:
+        projected.pop('_id', None)
+    return projected
+
+
+def _is_case_insensitive(collation: Optional[Mapping[str, Any]]) -> bool:
+    return collation is not None and collation.get('strength', 3) <= 2
+
+
+def _apply_update(doc: Document, update: Mapping[str, Any], inserting: bool = False) -> None:
+    """Apply update operators to a document in place"""
+    if not update or not all(key.startswith('$') for key in update):
+        raise OperationFailure("Memory backend only supports operator updates")
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == '$set' or (op == '$setOnInsert' and inserting):
+                _set(doc, path, _copy(value))
+            elif op == '$setOnInsert':
+                continue
+            elif op == '$unset':
+                _unset(doc, path)
+            elif op == '$inc':
+                current = _get(doc, path)
+                _set(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ('$push', '$addToSet'):
+                current = _get(doc, path)
+                items = list(current) if isinstance(current, list) else []
+                new = value['$each'] if isinstance(value, dict) and '$each' in value else [value]
+                for item in new:
+                    if op == '$push' or item not in items:
+                        items.append(_copy(item))
+                _set(doc, path, items)
+            elif op == '$pull':
+                current = _get(doc, path)
+                if isinstance(current, list):
+                    _set(doc, path, [
+                        item for item in current
+                        if not (matches(item, value) if isinstance(item, dict) and isinstance(value, dict)
+                                else _condition(item, value, False))
+                    ])
+            else:
+                raise OperationFailure(f"Unsupported update operator in memory backend: {op}")
+
+
+class _Index:
+    """Index metadata; unique indexes keep a key -> _id map to enforce uniqueness"""
+
+    def __init__(self, keys: SortSpec, name: str, options: Mapping[str, Any]):
+        self.keys = keys
+        self.name = name
+        self.options = dict(options)
+        self.unique = bool(options.get('unique')) or name == '_id_'
+        self.partial = options.get('partialFilterExpression')
+        self.fold_case = _is_case_insensitive(options.get('collation'))
+        self.entries: Dict[Tuple, Any] = {}
+
+    def info(self) -> Document:
+        info: Document = {'v': 2, 'key': dict(self.keys), 'name': self.name}
+        info.update({key: value for key, value in self.options.items() if key not in ('name', 'key')})
+        if self.fold_case:
+            info['collation'] = {'locale': 'en', 'caseLevel': False, 'strength': 2, **info['collation']}
+        return info
+
+    def key_for(self, doc: Document) -> Optional[Tuple]:
+        """Index key of a document, or None if a partial index excludes it"""
+        if self.partial is not None and not matches(doc, self.partial):
+            return None
+        key = []
+        for field, _ in self.keys:
+            value = _get(doc, field)
+            value = None if value is _MISSING else value
+            if self.fold_case and isinstance(value, str):
+                value = value.casefold()
+            key.append(repr(value) if isinstance(value, (dict, list)) else value)
+        return tuple(key)
+
+
+class MemoryCursor:
+    """Cursor over a materialized result list (find and aggregate)"""
+
+    def __init__(self, load: Callable[["MemoryCursor"], List[Document]]):
+        self._load = load
+        self._sort: SortSpec = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[Iterator[Document]] = None
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "MemoryCursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _iterator(self) -> Iterator[Document]:
+        if self._results is None:
+            self._results = iter(self._load(self))
+        return self._results
+
+    async def to_list(self, length: Optional[int] = None) -> List[Document]:
+        results = self._iterator()
+        if length is None:
+            return list(results)
+        return [doc for _, doc in zip(range(length), results)]
+
+    def __aiter__(self) -> "MemoryCursor":
+        return self
+
+    async def __anext__(self) -> Document:
+        try:
+            return next(self._iterator())
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    """
+    In-memory collection
+
+    Operations run synchronously inside their coroutine, so each one is
+    atomic with respect to the event loop (as a single-document Mongo
+    write is). Stored and returned documents are copies, so callers can
+    never alias stored state. Unique indexes, including partial and
+    case-insensitive (collation strength 1-2) ones, are enforced.
+    """
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: Dict[Any, Document] = {}
+        self._indexes: Dict[str, _Index] = {'_id_': _Index([('_id', 1)], '_id_', {})}
+
+    # Writes
+
+    async def insert_one(self, document: Document, **kwargs: Any) -> InsertOneResult:
+        document.setdefault('_id', ObjectId())
+        self._insert(document)
+        return InsertOneResult(document['_id'], True)
+
+    async def insert_many(self, documents: Iterable[Document], ordered: bool = True, **kwargs: Any) -> InsertManyResult:
+        # Duplicates raise BulkWriteError shaped like pymongo's: one
+        # writeErrors entry per rejected document, by position
+        inserted = []
+        write_errors = []
+        for position, document in enumerate(documents):
+            document.setdefault('_id', ObjectId())
+            try:
+                self._insert(document)
+                inserted.append(document['_id'])
+            except DuplicateKeyError as exc:
+                write_errors.append({
+                    'index': position, 'code': 11000, 'errmsg': str(exc),
+                    'keyPattern': (exc.details or {}).get('keyPattern'),
+                    'keyValue': (exc.details or {}).get('keyValue'), 'op': document,
+                })
+                if ordered:
+                    break
+        if write_errors:
+            raise BulkWriteError({
+                'writeErrors': write_errors, 'writeConcernErrors': [], 'nInserted': len(inserted),
+                'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': [],
+            })
+        return InsertManyResult(inserted, True)
+
+    async def update_one(self, filter: Document, update: Document, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return self._update(filter, update, upsert, multi=False, **kwargs)
+
+    async def update_many(self, filter: Document, update: Document, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return self._update(filter, update, upsert, multi=True, **kwargs)
+
+    async def find_one_and_update(
+        self,
+        filter: Document,
+        update: Document,
+        projection: Optional[Document] = None,
+        sort: Any = None,
+        upsert: bool = False,
+        return_document: bool = False,
+        **kwargs: Any
+    ) -> Optional[Document]:
+        candidates = self._select(filter, sort, kwargs.get('collation'))
+        if not candidates:
+            if not upsert:
+                return None
+            doc = self._upsert(filter, update)
+            return _project(_copy(doc), projection) if return_document else None
+        doc = candidates[0]
+        before = _copy(doc)
+        self._replace(doc, update)
+        result = self._docs[doc['_id']] if return_document else before
+        return _project(_copy(result), projection)
+
+    async def delete_one(self, filter: Document, **kwargs: Any) -> DeleteResult:
+        return self._delete(filter, multi=False, collation=kwargs.get('collation'))
+
+    async def delete_many(self, filter: Document, **kwargs: Any) -> DeleteResult:
+        return self._delete(filter, multi=True, collation=kwargs.get('collation'))
+
+    # Reads
+
+    def find(
+        self,
+        filter: Optional[Document] = None,
+        projection: Optional[Document] = None,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+        collation: Optional[Document] = None,
+        **kwargs: Any
+    ) -> MemoryCursor:
+        def load(cursor: MemoryCursor) -> List[Document]:
+            docs = self._select(filter, cursor._sort, collation)
+            docs = docs[cursor._skip:]
+            if cursor._limit:
+                docs = docs[:cursor._limit]
+            return [_project(_copy(doc), projection) for doc in docs]
+
+        cursor = MemoryCursor(load)
+        cursor._sort = _normalize_sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter: Optional[Document] = None, *args: Any, **kwargs: Any) -> Optional[Document]:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {'_id': filter}
+        results = await self.find(filter, *args, **kwargs).limit(1).to_list(1)
+        return results[0] if results else None
+
+    async def count_documents(self, filter: Document, **kwargs: Any) -> int:
+        return len(self._select(filter, None, kwargs.get('collation')))
+
+    def aggregate(self, pipeline: Sequence[Document], **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(lambda cursor: _aggregate(
+            [_copy(doc) for doc in self._docs.values()], pipeline, _is_case_insensitive(kwargs.get('collation'))
+        ))
+
+    # Indexes
+
+    async def create_indexes(self, indexes: Sequence[IndexModel], **kwargs: Any) -> List[str]:
+        names = []
+        for model in indexes:
+            document = dict(model.document)
+            keys = list(document.pop('key').items())
+            names.append(self._create_index(keys, document))
+        return names
+
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        return self._create_index(_normalize_sort(keys, 1), kwargs)
+
+    def list_indexes(self, **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(lambda cursor: [index.info() for index in self._indexes.values()])
+
+    async def index_information(self) -> Dict[str, Document]:
+        return {name: index.info() for name, index in self._indexes.items()}
+
+    async def drop_index(self, index_or_name: Any, **kwargs: Any) -> None:
+        name = index_or_name if isinstance(index_or_name, str) else '_'.join(
+            f"{key}_{direction}" for key, direction in _normalize_sort(index_or_name, 1)
+        )
+        if name == '_id_' or name not in self._indexes:
+            raise OperationFailure(f"index not found with name [{name}]")
+        del self._indexes[name]
+
+    async def drop_indexes(self, **kwargs: Any) -> None:
+        self._indexes = {'_id_': self._indexes['_id_']}
+
+    async def drop(self, **kwargs: Any) -> None:
+        self._docs.clear()
+        for index in self._indexes.values():
+            index.entries.clear()
+
+    # Internals
+
+    def _create_index(self, keys: SortSpec, options: Mapping[str, Any]) -> str:
+        name = options.get('name') or '_'.join(f"{key}_{direction}" for key, direction in keys)
+        existing = self._indexes.get(name)
+        if existing is not None:
+            if existing.keys != keys:
+                raise OperationFailure(f"An existing index has the same name as the requested index: {name}")
+            return name
+        index = _Index(keys, name, options)
+        for doc in self._docs.values():
+            key = index.key_for(doc)
+            if key is None or not index.unique:
+                continue
+            if key in index.entries:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+            index.entries[key] = doc['_id']
+        self._indexes[name] = index
+        return name
+
+    def _check_unique(self, doc: Document, ignore_id: Any = _MISSING) -> List[Tuple[_Index, Tuple]]:
+        keys = []
+        for index in self._indexes.values():
+            if not index.unique:
+                continue
+            key = index.key_for(doc)
+            if key is None:
+                continue
+            owner = index.entries.get(key, _MISSING)
+            if owner is not _MISSING and owner != ignore_id:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {index.name}",
+                    11000,
+                    {'keyPattern': dict(index.keys), 'keyValue': dict(zip((k for k, _ in index.keys), key))}
+                )
+            keys.append((index, key))
+        return keys
+
+    def _insert(self, document: Document) -> None:
+        doc = _copy(document)
+        for index, key in self._check_unique(doc):
+            index.entries[key] = doc['_id']
+        self._docs[doc['_id']] = doc
+
+    def _replace(self, doc: Document, update: Document) -> None:
+        """Apply an update to a stored document, keeping unique indexes consistent"""
+        updated = _copy(doc)
+        _apply_update(updated, update)
+        if updated.get('_id') != doc['_id']:
+            raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'")
+        new_keys = self._check_unique(updated, ignore_id=doc['_id'])
+        for index in self._indexes.values():
+            if index.unique:
+                old_key = index.key_for(doc)
+                if old_key is not None:
+                    index.entries.pop(old_key, None)
+        for index, key in new_keys:
+            index.entries[key] = doc['_id']
+        self._docs[doc['_id']] = updated
+
+    def _select(self, filter: Optional[Document], sort: Any, collation: Optional[Document]) -> List[Document]:
+        fold_case = _is_case_insensitive(collation)
+        if filter and '_id' in filter and not isinstance(filter['_id'], dict):
+            doc = self._docs.get(filter['_id'])
+            docs = [doc] if doc is not None and matches(doc, filter, fold_case) else []
+        else:
+            docs = [doc for doc in self._docs.values() if matches(doc, filter, fold_case)]
+        spec = _normalize_sort(sort)
+        return _sorted(docs, spec, fold_case) if spec else docs
+
+    def _update(self, filter: Document, update: Document, upsert: bool, multi: bool, **kwargs: Any) -> UpdateResult:
+        candidates = self._select(filter, None, kwargs.get('collation'))
+        if not multi:
+            candidates = candidates[:1]
+        if not candidates:
+            if upsert:
+                doc = self._upsert(filter, update)
+                return UpdateResult({'n': 1, 'nModified': 0, 'upserted': doc['_id']}, True)
+            return UpdateResult({'n': 0, 'nModified': 0}, True)
+        modified = 0
+        for doc in candidates:
+            before = doc
+            self._replace(doc, update)
+            modified += self._docs[doc['_id']] != before
+        return UpdateResult({'n': len(candidates), 'nModified': modified}, True)
+
+    def _upsert(self, filter: Document, update: Document) -> Document:
+        doc = {
+            key: _copy(value) for key, value in filter.items()
+            if not key.startswith('$') and not (isinstance(value, dict) and any(k.startswith('$') for k in value))
+        }
+        _apply_update(doc, update, inserting=True)
+        doc.setdefault('_id', ObjectId())
+        self._insert(doc)
+        return self._docs[doc['_id']]
+
+    def _delete(self, filter: Document, multi: bool, collation: Optional[Document]) -> DeleteResult:
+        candidates = self._select(filter, None, collation)
+        if not multi:
+            candidates = candidates[:1]
+        for doc in candidates:
+            for index in self._indexes.values():
+                if index.unique:
+                    key = index.key_for(doc)
+                    if key is not None:
+                        index.entries.pop(key, None)
+            del self._docs[doc['_id']]
+        return DeleteResult({'n': len(candidates)}, True)
+
+
+def _expression(doc: Document, expression: Any) -> Any:
+    """Evaluate a (field path / $$ROOT / literal) aggregation expression"""
+    if isinstance(expression, str) and expression.startswith('$'):
+        if expression == '$$ROOT':
+            return doc
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        return {key: _expression(doc, value) for key, value in expression.items()}
+    return expression
+
+
+def _aggregate(docs: List[Document], pipeline: Sequence[Document], fold_case: bool) -> List[Document]:
+    """Run $match, $sort, $group, $project, $skip, $limit and $count stages"""
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == '$match':
+            docs = [doc for doc in docs if matches(doc, spec, fold_case)]
+        elif name == '$sort':
+            docs = _sorted(docs, _normalize_sort(spec), fold_case)
+        elif name == '$project':
+            docs = [_project(doc, spec) for doc in docs]
+        elif name == '$skip':
+            docs = docs[spec:]
+        elif name == '$limit':
+            docs = docs[:spec]
+        elif name == '$count':
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == '$group':
+            docs = _group(docs, spec, fold_case)
+        else:
+            raise OperationFailure(f"Unsupported aggregation stage in memory backend: {name}")
+    return docs
+
+
+def _group(docs: List[Document], spec: Document, fold_case: bool) -> List[Document]:
+    groups: Dict[Any, Document] = {}
+    for doc in docs:
+        group_id = _expression(doc, spec['_id'])
+        key: Any = _sort_key(group_id, fold_case)
+        if isinstance(group_id, (dict, list)):
+            key = repr(key)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'_id': group_id}
+            for field, accumulator in spec.items():
+                if field != '_id':
+                    (op, _), = accumulator.items()
+                    group[field] = [] if op in ('$push', '$addToSet') else _MISSING
+        for field, accumulator in spec.items():
+            if field == '_id':
+                continue
+            (op, expression), = accumulator.items()
+            value = _expression(doc, expression)
+            current = group[field]
+            if op == '$push':
+                current.append(value)
+            elif op == '$addToSet':
+                if value not in current:
+                    current.append(value)
+            elif op == '$sum':
+                group[field] = (0 if current is _MISSING else current) + (value if isinstance(value, (int, float)) else 0)
+            elif op == '$first':
+                if current is _MISSING:
+                    group[field] = value
+            elif op == '$last':
+                group[field] = value
+            elif op in ('$min', '$max'):
+                if current is _MISSING or (value < current if op == '$min' else value > current):
+                    group[field] = value
+            else:
+                raise OperationFailure(f"Unsupported accumulator in memory backend: {op}")
+    return [
+        {field: (None if value is _MISSING else value) for field, value in group.items()}
+        for group in groups.values()
+    ]
+
+
+class _Admin:
+    async def command(self, command: Union[str, Document], *args: Any, **kwargs: Any) -> Document:
+        return {'ok': 1.0}
+
+
+class MemoryDatabase:
+    """In-memory database: collections are created on first access"""
+
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self, name)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command: Union[str, Document], *args: Any, **kwargs: Any) -> Document:
+        return {'ok': 1.0}
+
+    async def list_collection_names(self, **kwargs: Any) -> List[str]:
+        return list(self._collections)
+
+    async def drop_collection(self, name: str, **kwargs: Any) -> None:
+        self._collections.pop(name, None)
+
+
+class MemoryClient:
+    """
+    In-memory replacement for AsyncIOMotorClient (DATABASE_BACKEND=memory)
+
+    Data lives in this process only: each worker has its own copy and
+    everything is lost on restart. Meant for tests and benchmarks of the
+    layers above the database, not for deployment.
+    """
+
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+        self.admin = _Admin()
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(self, name)
+        return database
+
+    def get_database(self, name: str) -> MemoryDatabase:
+        return self[name]
+
+    async def drop_database(self, name_or_database: Union[str, MemoryDatabase]) -> None:
+        name = name_or_database if isinstance(name_or_database, str) else name_or_database.name
+        self._databases.pop(name, None)
+
+    def close(self) -> None:
+        pass
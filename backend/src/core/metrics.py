@@ -0,0 +1,281 @@
+"""
+Metrics
+Minimal Prometheus-compatible counters, gauges and histograms
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds (Prometheus client defaults plus
+# finer resolution below 5ms)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Response size buckets in bytes
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Metric:
+    """Base class: a named metric family with fixed label names"""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        # Observations arrive from the event loop and from pymongo's
+        # monitoring threads
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines for this family"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def _format_labels(self, values: LabelValues, extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        """Increase the counter for a label set"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        """Current value for a label set"""
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._format_labels(labels)} {_number(value)}" for labels, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type = 'gauge'
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        """Decrease the gauge for a label set"""
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        """Set the gauge for a label set"""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative bucket histogram per label set
+
+    Quantiles (p50/p95/p99) are derived at query time, e.g.
+    histogram_quantile(0.99, rate(<name>_bucket[5m])).
+    """
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (+Inf last)], sum, count
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        """Record one observation"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def quantile(self, q: float, labels: LabelValues = ()) -> Optional[float]:
+        """
+        Estimate a quantile from the buckets (upper bound of its bucket)
+
+        Args:
+            q: Quantile between 0 and 1
+            labels: Label set
+
+        Returns:
+            Bucket upper bound, or None without observations
+        """
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None or not series[1][1]:
+                return None
+            counts, total = list(series[0]), series[1][1]
+        rank = q * total
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), list(totals)) for labels, (counts, totals) in self._series.items()]
+        lines = []
+        for labels, counts, (total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(labels)} {int(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family (returns it for assignment)"""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(name, documentation, label_names)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge"""
+        metric = Gauge(name, documentation, label_names)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram"""
+        metric = Histogram(name, documentation, label_names, buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# Global registry and the application's metric families
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total', 'HTTP requests by route template and status', ('method', 'route', 'status')
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template', ('method', 'route')
+)
+HTTP_RESPONSE_SIZE = registry.histogram(
+    'http_response_size_bytes', 'HTTP response body size by route template', ('method', 'route'),
+    buckets=SIZE_BUCKETS
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being served'
+)
+MONGO_COMMAND_DURATION = registry.histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency by collection and command',
+    ('collection', 'command')
+)
+MONGO_COMMAND_FAILURES = registry.counter(
+    'mongodb_command_failures_total', 'Failed MongoDB commands by collection and command',
+    ('collection', 'command')
+)
+MONGO_POOL_CHECKOUT_WAIT = registry.histogram(
+    'mongodb_pool_checkout_wait_seconds', 'Time spent waiting to check a connection out of the pool'
+)
+MONGO_POOL_CHECKOUT_FAILURES = registry.counter(
+    'mongodb_pool_checkout_failures_total', 'Failed connection checkouts by reason', ('reason',)
+)
+MONGO_POOL_CONNECTIONS = registry.gauge(
+    'mongodb_pool_connections', 'Open connections in the MongoDB pool'
+)
+MONGO_POOL_CHECKED_OUT = registry.gauge(
+    'mongodb_pool_checked_out', 'Connections currently checked out of the MongoDB pool'
+)
+MONGO_POOL_WAITING = registry.gauge(
+    'mongodb_pool_wait_queue', 'Operations waiting for a pooled connection'
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    'singleflight_calls_total',
+    'Coalescable reads by group; role "leader" ran the query, "shared" joined one in flight',
+    ('group', 'role')
+)
+RESPONSE_CACHE_LOOKUPS = registry.counter(
+    'response_cache_lookups_total', 'Encoded response cache lookups by result (hit or miss)', ('result',)
+)
+RESPONSE_CACHE_EVICTIONS = registry.counter(
+    'response_cache_evictions_total', 'Entries removed by reason (size, expired, invalidated)', ('reason',)
+)
+RESPONSE_CACHE_BYTES = registry.gauge(
+    'response_cache_bytes', 'Bytes held by the encoded response cache'
+)
+RATE_LIMITED = registry.counter(
+    'http_rate_limited_total', 'Requests refused with 429 by deciding rule', ('rule',)
+)
+CONCURRENCY_LIMIT = registry.gauge(
+    'http_concurrency_limit', 'Current adaptive limit on in-flight requests (per worker)'
+)
+REQUESTS_SHED = registry.counter(
+    'http_requests_shed_total', 'Requests refused with 503 by the concurrency limit, by class', ('priority',)
+)
+TOKEN_REVOCATION_CHECKS = registry.counter(
+    'token_revocation_checks_total',
+    'Access token revocation checks by result (negative needs no query; false_positive and revoked do)',
+    ('result',)
+)
@@ -0,0 +1,106 @@
+"""
+MongoDB command monitoring
+pymongo listeners that feed per-collection command and connection pool metrics
+"""
+from typing import Any, Dict, Tuple
+
+from pymongo import monitoring
+
+from .metrics import (
+    MONGO_COMMAND_DURATION, MONGO_COMMAND_FAILURES, MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_CHECKOUT_FAILURES, MONGO_POOL_CHECKOUT_WAIT, MONGO_POOL_CONNECTIONS,
+    MONGO_POOL_WAITING
+)
+
+
+def command_collection(command_name: str, command: Any) -> str:
+    """
+    Extract the target collection from a command document
+    
+    Args:
+        command_name: Command name, e.g. "find" or "getMore"
+        command: Command document
+        
+    Returns:
+        Collection name, or "" for database/admin commands (e.g. ping)
+    """
+    if command_name == 'getMore':
+        return command.get('collection', '')
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ''
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Records every command's duration by collection and command name
+    
+    Callbacks run on pymongo's I/O threads and only touch a dict and the
+    metric registry, so they add no round trips and negligible latency.
+    """
+    
+    def __init__(self):
+        # Collection per in-flight command; succeeded/failed events don't carry it
+        self._pending: Dict[Tuple[Any, int], str] = {}
+    
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._pending[(event.connection_id, event.request_id)] = command_collection(
+            event.command_name, event.command
+        )
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        collection = self._pending.pop((event.connection_id, event.request_id), '')
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000, (collection, event.command_name)
+        )
+    
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        collection = self._pending.pop((event.connection_id, event.request_id), '')
+        labels = (collection, event.command_name)
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1_000_000, labels)
+        MONGO_COMMAND_FAILURES.inc(labels)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool size, checkouts and checkout wait time
+    
+    A growing wait-time histogram or wait queue means the pool, not Mongo,
+    is the bottleneck and MONGO_MAX_POOL_SIZE should be raised.
+    """
+    
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+    
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+    
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+    
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+    
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.inc()
+    
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+    
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        MONGO_POOL_CONNECTIONS.dec()
+    
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        MONGO_POOL_WAITING.inc()
+    
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        MONGO_POOL_WAITING.dec()
+        MONGO_POOL_CHECKED_OUT.inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+    
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        MONGO_POOL_WAITING.dec()
+        MONGO_POOL_CHECKOUT_FAILURES.inc((event.reason,))
+    
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        MONGO_POOL_CHECKED_OUT.dec()
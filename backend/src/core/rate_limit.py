@@ -0,0 +1,287 @@
+"""
+Rate limiting
+Token buckets (GCRA) keyed by client, with in-process and shared stores
+"""
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    `requests` per `period_seconds`, allowing bursts of up to `requests`
+
+    Attributes:
+        requests: Bucket capacity
+        period_seconds: Time to refill an empty bucket
+    """
+    requests: int
+    period_seconds: float
+
+    @property
+    def interval(self) -> float:
+        """Seconds per token"""
+        return self.period_seconds / self.requests
+
+    def __str__(self) -> str:
+        return f"{self.requests}/{self.period_seconds:g}s"
+
+
+def parse_rate(value: str) -> RateLimit:
+    """
+    Parse "100/minute", "5/second" or "20/10s"
+
+    Raises:
+        ValueError: Malformed rate
+    """
+    count, _, period = value.strip().partition('/')
+    period = period.strip().lower()
+    if period.endswith('s') and period[:-1].replace('.', '', 1).isdigit():
+        seconds = float(period[:-1])
+    elif period in PERIODS:
+        seconds = PERIODS[period]
+    else:
+        raise ValueError(f"Invalid rate {value!r}; use e.g. 100/minute or 20/10s")
+    requests = int(count)
+    if requests < 1 or seconds <= 0:
+        raise ValueError(f"Invalid rate {value!r}")
+    return RateLimit(requests, seconds)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """
+    Outcome of taking one token
+
+    Attributes:
+        allowed: Whether the request may proceed
+        limit: Applied limit
+        remaining: Whole tokens left after this request
+        retry_after: Seconds until a token is available (0 when allowed)
+        reset_after: Seconds until the bucket is full again
+    """
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+def gcra(tat: Optional[float], now: float, limit: RateLimit) -> Tuple[Optional[float], RateLimitResult]:
+    """
+    Generic cell rate algorithm step
+
+    A token bucket stored as a single number: the theoretical arrival time
+    (TAT) at which the bucket would be full again. Refill is continuous, so
+    there is no fixed-window boundary at which 2x the limit can get through.
+
+    Args:
+        tat: Stored TAT, or None for an unknown (full) bucket
+        now: Current time in seconds
+        limit: Applied limit
+
+    Returns:
+        (new TAT to store, or None if unchanged (denied), result)
+    """
+    base = max(tat or now, now)
+    new_tat = base + limit.interval
+    if new_tat - now > limit.period_seconds:
+        retry_after = new_tat - now - limit.period_seconds
+        return None, RateLimitResult(False, limit, 0, retry_after, base - now)
+    remaining = int((limit.period_seconds - (new_tat - now)) / limit.interval + 1e-9)
+    return new_tat, RateLimitResult(True, limit, remaining, 0.0, new_tat - now)
+
+
+class RateLimitStore:
+    """Base class for token bucket storage"""
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        """Take one token from a key's bucket"""
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-worker store: one float per key in an LRU bounded to max_keys
+
+    Evicting the least recently seen key only forgets an idle client's
+    bucket, which has almost always refilled anyway. Limits apply per
+    worker process.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None, clock=time.monotonic):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MAX_KEYS
+        self.clock = clock
+        self._buckets: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        now = self.clock()
+        new_tat, result = gcra(self._buckets.get(key), now, limit)
+        if new_tat is not None:
+            self._buckets[key] = new_tat
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if key in self._buckets:
+            # Refused hits count as activity too, so a throttled client is
+            # never evicted into a fresh bucket
+            self._buckets.move_to_end(key)
+        return result
+
+
+class MongoRateLimitStore(RateLimitStore):
+    """
+    Store shared by all workers in the `rate_limits` collection
+
+    Each hit is a read plus a compare-and-swap on the stored TAT (retried
+    on conflict); idle buckets are removed by a TTL index. If MongoDB is
+    unavailable requests are let through rather than failed.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def collection(self):
+        if self._db is None:
+            from .database import get_database
+            return get_database().rate_limits
+        return self._db.rate_limits
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        try:
+            for _ in range(self.MAX_ATTEMPTS):
+                now = time.time()
+                doc = await self.collection.find_one({'_id': key})
+                tat = doc['tat'] if doc else None
+                new_tat, result = gcra(tat, now, limit)
+                if new_tat is None:
+                    return result
+
+                update = {'$set': {
+                    'tat': new_tat,
+                    'expires_at': datetime.utcnow() + timedelta(seconds=new_tat - now)
+                }}
+                if doc is None:
+                    try:
+                        await self.collection.insert_one({'_id': key, **update['$set']})
+                        return result
+                    except DuplicateKeyError:
+                        continue
+                swapped = await self.collection.update_one({'_id': key, 'tat': tat}, update)
+                if swapped.modified_count:
+                    return result
+        except PyMongoError:
+            logger.warning("Rate limit store unavailable, allowing request for %s", key, exc_info=True)
+        # Contended or unavailable: fail open
+        return RateLimitResult(True, limit, 0, 0.0, 0.0)
+
+
+def create_rate_limit_store(kind: str) -> RateLimitStore:
+    """
+    Build a rate limit store from configuration
+
+    Args:
+        kind: "memory" or "mongodb"
+
+    Returns:
+        RateLimitStore instance
+
+    Raises:
+        ValueError: Unknown store kind
+    """
+    if kind == 'memory':
+        return MemoryRateLimitStore()
+    if kind == 'mongodb':
+        return MongoRateLimitStore()
+    raise ValueError(f"Unknown rate limit store: {kind}")
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    """A limit for one method and path template, e.g. POST /auth/login"""
+    name: str
+    method: str
+    pattern: Pattern[str]
+    limit: RateLimit
+
+
+def compile_route_rule(spec: str, rate: str) -> RouteRule:
+    """
+    Build a rule from "METHOD /path/{param}" and a rate string
+
+    Raises:
+        ValueError: Malformed spec or rate
+    """
+    method, _, path = spec.strip().partition(' ')
+    if not path.startswith('/'):
+        raise ValueError(f"Invalid rate limit route {spec!r}; use e.g. 'POST /auth/login'")
+    regex = re.sub(r'\\\{[^/]+?\\\}', '[^/]+', re.escape(path.strip().rstrip('/')))
+    return RouteRule(spec.strip(), method.upper(), re.compile(f'^{regex}/?$'), parse_rate(rate))
+
+
+class RateLimiter:
+    """
+    Applies the default per-client limit and any matching route limits
+
+    Each request takes a token from the client's default bucket and from
+    the bucket of every route rule it matches (route buckets are separate
+    per rule and client). Route buckets are checked first, so a request
+    refused by a route limit does not also use up the default budget.
+    """
+
+    def __init__(
+        self,
+        store: Optional[RateLimitStore] = None,
+        default: Optional[str] = None,
+        routes: Optional[Dict[str, str]] = None
+    ):
+        self.store = store or create_rate_limit_store(settings.RATE_LIMIT_STORE)
+        default = settings.RATE_LIMIT_DEFAULT if default is None else default
+        self.default = parse_rate(default) if default else None
+        routes = settings.RATE_LIMIT_ROUTES if routes is None else routes
+        self.rules: List[RouteRule] = [compile_route_rule(spec, rate) for spec, rate in routes.items()]
+
+    async def check(self, method: str, path: str, client: str) -> Tuple[str, RateLimitResult]:
+        """
+        Take tokens for a request
+
+        Args:
+            method: HTTP method
+            path: Request path
+            client: Client identity, e.g. "user:<id>" or "ip:<address>"
+
+        Returns:
+            (name of the deciding rule, result); the result is the refusal
+            if any bucket refused, else the one with the fewest tokens left
+        """
+        decisive: Optional[Tuple[str, RateLimitResult]] = None
+        for rule in self.rules:
+            if rule.method == method and rule.pattern.match(path):
+                result = await self.store.hit(f"{rule.name}|{client}", rule.limit)
+                if not result.allowed:
+                    return rule.name, result
+                if decisive is None or result.remaining < decisive[1].remaining:
+                    decisive = (rule.name, result)
+        if self.default is not None:
+            result = await self.store.hit(f"default|{client}", self.default)
+            if not result.allowed or decisive is None or result.remaining < decisive[1].remaining:
+                decisive = ('default', result)
+        return decisive or ('none', RateLimitResult(True, RateLimit(1, 1), 1, 0.0, 0.0))
@@ -0,0 +1,231 @@
+"""
+Recurrence utilities
+RRULE-subset parsing and lazy occurrence expansion for recurring tasks
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Collection, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from ..models.task import RecurrenceRule
+
+WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def parse_rrule(rule: str) -> Dict:
+    """
+    Parse an RFC 5545 RRULE string into RecurrenceRule fields
+
+    Supports FREQ (DAILY, WEEKLY, MONTHLY), INTERVAL, BYDAY (weekly only,
+    without ordinals), COUNT and UNTIL. An optional "RRULE:" prefix is
+    accepted.
+
+    Args:
+        rule: e.g. "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20251231"
+
+    Returns:
+        Dict of RecurrenceRule fields
+
+    Raises:
+        ValueError: Malformed rule or unsupported part
+    """
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+
+    fields: Dict = {}
+    for part in filter(None, rule.strip().split(';')):
+        name, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"Malformed RRULE part: {part}")
+        name, value = name.upper(), value.upper()
+
+        if name == 'FREQ':
+            if value not in ('DAILY', 'WEEKLY', 'MONTHLY'):
+                raise ValueError(f"Unsupported FREQ: {value}")
+            fields['freq'] = value.lower()
+        elif name == 'INTERVAL':
+            fields['interval'] = int(value)
+        elif name == 'COUNT':
+            fields['count'] = int(value)
+        elif name == 'UNTIL':
+            fields['until'] = datetime.strptime(value[:8], '%Y%m%d').date()
+        elif name == 'BYDAY':
+            try:
+                fields['by_weekday'] = [WEEKDAY_CODES.index(code) for code in value.split(',')]
+            except ValueError:
+                raise ValueError(f"Unsupported BYDAY: {value}")
+        elif name != 'WKST':
+            raise ValueError(f"Unsupported RRULE part: {name}")
+
+    if 'freq' not in fields:
+        raise ValueError("RRULE requires FREQ")
+    return fields
+
+
+def expand_occurrences(
+    rule: 'RecurrenceRule',
+    start: date,
+    window_start: date,
+    window_end: date,
+    skip: Optional[Collection[date]] = None
+) -> Sequence[date]:
+    """
+    Expand a recurrence rule over a date window
+
+    Daily and weekly rules jump straight to the first period inside the
+    window, so the cost depends on the window size, not on how long ago
+    the series started. Fixed-step date runs are memoized, so series that
+    share a rule and phase (e.g. every daily task) reuse the same dates.
+
+    Args:
+        rule: Recurrence rule
+        start: First occurrence (the series deadline)
+        window_start: First day of the window (inclusive)
+        window_end: Last day of the window (inclusive)
+        skip: Occurrence dates to leave out (e.g. materialized ones)
+
+    Returns:
+        Occurrence dates within the window, ascending
+    """
+    end = window_end if rule.until is None else min(window_end, rule.until)
+    if end < start or end < window_start:
+        return []
+
+    occurrences: Sequence[date]
+    if rule.freq == 'monthly':
+        occurrences = _expand_monthly(rule, start, window_start, end)
+    elif rule.freq == 'weekly' and rule.by_weekday:
+        occurrences = _expand_weekdays(rule, start, window_start, end)
+    else:
+        step = rule.interval * (7 if rule.freq == 'weekly' else 1)
+        last = end.toordinal()
+        if rule.count is not None:
+            last = min(last, start.toordinal() + (rule.count - 1) * step)
+        occurrences = _date_run(
+            _align(start.toordinal(), window_start.toordinal(), step), last, step
+        )
+
+    if skip:
+        return [day for day in occurrences if day not in skip]
+    return occurrences
+
+
+def next_occurrence(rule: 'RecurrenceRule', start: date, day: date) -> Optional[date]:
+    """
+    First occurrence of a series on or after a day
+
+    Looks eight periods of the rule ahead, which is enough to step over
+    months without the start's day of month (even Feb 29 recurs within
+    four yearly periods).
+
+    Args:
+        rule: Recurrence rule
+        start: First occurrence (the series deadline)
+        day: Earliest date to return
+
+    Returns:
+        The occurrence date, or None once the series has ended
+    """
+    period_days = {'daily': 1, 'weekly': 7, 'monthly': 31}[rule.freq] * rule.interval
+    window_start = max(day, start)
+    occurrences = expand_occurrences(
+        rule, start, window_start, window_start + timedelta(days=8 * period_days)
+    )
+    return occurrences[0] if occurrences else None
+
+
+def _align(first: int, window_start: int, step: int) -> int:
+    """First ordinal of the run first, first+step, ... on/after window_start"""
+    return first + max(0, -(-(window_start - first) // step)) * step
+
+
+@lru_cache(maxsize=256)
+def _date_run(first: int, last: int, step: int) -> Tuple[date, ...]:
+    """Dates from ordinal first to last (inclusive) every step days"""
+    return tuple(date.fromordinal(ordinal) for ordinal in range(first, last + 1, step))
+
+
+def _expand_weekdays(
+    rule: 'RecurrenceRule',
+    start: date,
+    window_start: date,
+    end: date
+) -> List[date]:
+    """Occurrences on given weekdays of every `interval`-th week"""
+    weekdays = sorted(set(rule.by_weekday or []))
+    week_zero = start - timedelta(days=start.weekday())
+    period_days = 7 * rule.interval
+
+    if rule.count is None:
+        # Each weekday is its own fixed-step run; merge them
+        runs: List[date] = []
+        for weekday in weekdays:
+            first = week_zero + timedelta(days=weekday)
+            if first < start:
+                first += timedelta(days=period_days)
+            runs.extend(_date_run(
+                _align(first.toordinal(), window_start.toordinal(), period_days),
+                end.toordinal(),
+                period_days
+            ))
+        return sorted(runs)
+
+    # Occurrences in the first (partial) week, then len(weekdays) per period
+    first_week = sum(1 for weekday in weekdays if weekday >= start.weekday())
+
+    period = max(0, (window_start - week_zero).days // period_days)
+    index = 0 if period == 0 else first_week + (period - 1) * len(weekdays)
+
+    occurrences: List[date] = []
+    while True:
+        week = week_zero + timedelta(days=period * period_days)
+        if week > end:
+            return occurrences
+        for weekday in weekdays:
+            day = week + timedelta(days=weekday)
+            if day < start:
+                continue
+            if day > end or (rule.count is not None and index >= rule.count):
+                return occurrences
+            if day >= window_start:
+                occurrences.append(day)
+            index += 1
+        period += 1
+
+
+def _expand_monthly(
+    rule: 'RecurrenceRule',
+    start: date,
+    window_start: date,
+    end: date
+) -> List[date]:
+    """
+    Occurrences on the start's day of month every `interval` months
+
+    Months without that day (e.g. the 31st) are skipped and do not count
+    towards COUNT, as in RFC 5545.
+    """
+    occurrences: List[date] = []
+    index = 0
+    months = 0
+    if rule.count is None:
+        # Without COUNT there is nothing to tally; skip whole periods
+        elapsed = (window_start.year - start.year) * 12 + window_start.month - start.month
+        months = max(0, elapsed // rule.interval * rule.interval)
+    while True:
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        month += 1
+        if date(year, month, 1) > end:
+            return occurrences
+        if start.day <= calendar.monthrange(year, month)[1]:
+            if rule.count is not None and index >= rule.count:
+                return occurrences
+            day = date(year, month, start.day)
+            if day > end:
+                return occurrences
+            if day >= window_start:
+                occurrences.append(day)
+            index += 1
+        months += rule.interval
@@ -0,0 +1,297 @@
+"""
+Response cache
+Per-owner cache of encoded list responses, invalidated by writes
+"""
+import gzip
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from fastapi import Response
+
+from .config import settings
+from .events import Event, event_bus
+from .metrics import RESPONSE_CACHE_BYTES, RESPONSE_CACHE_EVICTIONS, RESPONSE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Hashable]
+
+# Per-entry bookkeeping (key tuple, OrderedDict node, EncodedBody) counted
+# against the memory budget on top of the body itself
+ENTRY_OVERHEAD_BYTES = 200
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """
+    A serialized JSON response body, possibly gzip-compressed
+
+    Attributes:
+        content: Body bytes as stored
+        gzipped: Whether content is gzip-compressed
+    """
+    content: bytes
+    gzipped: bool = False
+
+    @classmethod
+    def encode(cls, data: bytes, compress_min_bytes: Optional[int] = None) -> "EncodedBody":
+        """
+        Wrap JSON bytes, compressing them if at least compress_min_bytes long
+
+        Args:
+            data: Uncompressed JSON
+            compress_min_bytes: Size threshold, or None to never compress
+        """
+        if compress_min_bytes is not None and len(data) >= compress_min_bytes:
+            return cls(gzip.compress(data, compresslevel=6, mtime=0), gzipped=True)
+        return cls(data)
+
+    def to_response(self, accept_encoding: str = '') -> Response:
+        """
+        JSON response for a client's Accept-Encoding header
+
+        Compressed bodies are sent as-is to gzip-capable clients and
+        decompressed for the rest.
+        """
+        if not self.gzipped:
+            return Response(content=self.content, media_type="application/json")
+        headers = {"Vary": "Accept-Encoding"}
+        if 'gzip' in accept_encoding.lower():
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.content, media_type="application/json", headers=headers)
+        return Response(content=gzip.decompress(self.content), media_type="application/json", headers=headers)
+
+
+class CacheBroker:
+    """
+    Base class for invalidation brokers
+
+    A broker carries "owner X changed" messages between the caches of all
+    workers, so a write handled by one worker invalidates every copy.
+    """
+
+    def publish(self, owner_id: str) -> None:
+        """Announce that an owner's cached responses are stale"""
+        raise NotImplementedError
+
+    def listen(self, handler: Callable[[str], None]) -> None:
+        """Register a handler called with the owner id of every announcement"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the broker"""
+
+
+class LocalCacheBroker(CacheBroker):
+    """
+    In-process broker
+
+    Delivers synchronously to every cache attached in this process. It is
+    the single-worker default and a stand-in for a shared broker (Redis
+    pub/sub, NATS) in tests: several caches attached to one instance behave
+    like workers sharing a real broker.
+    """
+
+    def __init__(self):
+        self._handlers: List[Callable[[str], None]] = []
+
+    def publish(self, owner_id: str) -> None:
+        for handler in list(self._handlers):
+            try:
+                handler(owner_id)
+            except Exception:
+                logger.exception("Cache invalidation handler failed for user %s", owner_id)
+
+    def listen(self, handler: Callable[[str], None]) -> None:
+        self._handlers.append(handler)
+
+    def close(self) -> None:
+        self._handlers.clear()
+
+
+def create_cache_broker(kind: str) -> CacheBroker:
+    """
+    Build an invalidation broker from configuration
+
+    Args:
+        kind: "local"
+
+    Returns:
+        CacheBroker instance
+
+    Raises:
+        ValueError: Unknown broker kind
+    """
+    if kind == 'local':
+        return LocalCacheBroker()
+    raise ValueError(f"Unknown response cache broker: {kind}")
+
+
+@dataclass(eq=False)
+class Reservation:
+    """A cache fill in progress; made stale by an invalidation of its owner"""
+    owner_id: str
+    key: Hashable
+    stale: bool = False
+
+
+@dataclass
+class _Entry:
+    body: EncodedBody
+    expires_at: float
+    size: int = field(init=False)
+
+    def __post_init__(self):
+        self.size = len(self.body.content) + ENTRY_OVERHEAD_BYTES
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses bounded by total size
+
+    Entries are keyed by owner and request variant (e.g. sort and order).
+    Invalidation is per owner: every write event for the owner drops all of
+    its entries here and, through the broker, in every other worker. A TTL
+    bounds staleness if an invalidation message is ever lost.
+
+    Fills are reserved before the query starts; an invalidation arriving
+    while the query runs makes the reservation stale, so a result read
+    before a write is never stored after it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        broker: Optional[CacheBroker] = None,
+        invalidate_on: Tuple[str, ...] = ('task.', 'tasks.')
+    ):
+        """
+        Args:
+            max_bytes: Memory budget for all entries
+            ttl_seconds: Maximum entry age
+            broker: Invalidation broker shared with other workers
+            invalidate_on: Event type prefixes that invalidate the owner
+        """
+        self.max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or settings.RESPONSE_CACHE_TTL_SECONDS
+        self.broker = broker or create_cache_broker(settings.RESPONSE_CACHE_BROKER)
+        self.invalidate_on = invalidate_on
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._owner_keys: Dict[str, Set[Hashable]] = {}
+        self._reservations: Dict[str, Set[Reservation]] = {}
+        self._bytes = 0
+        self.broker.listen(self._drop_owner)
+        event_bus.subscribe(self._on_event)
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes currently accounted to entries"""
+        return self._bytes
+
+    def get(self, owner_id: str, key: Hashable) -> Optional[EncodedBody]:
+        """
+        Cached body for an owner's request variant
+
+        Returns:
+            EncodedBody, or None on a miss or expired entry
+        """
+        entry = self._entries.get((owner_id, key))
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove((owner_id, key), 'expired')
+            entry = None
+        if entry is None:
+            RESPONSE_CACHE_LOOKUPS.inc(('miss',))
+            return None
+        self._entries.move_to_end((owner_id, key))
+        RESPONSE_CACHE_LOOKUPS.inc(('hit',))
+        return entry.body
+
+    def reserve(self, owner_id: str, key: Hashable) -> Reservation:
+        """Start a fill; call before reading the data to be cached"""
+        reservation = Reservation(owner_id, key)
+        self._reservations.setdefault(owner_id, set()).add(reservation)
+        return reservation
+
+    def put(self, reservation: Reservation, body: EncodedBody) -> bool:
+        """
+        Store a fill unless its owner was invalidated since reserve()
+
+        Evicts least recently used entries to stay within max_bytes; a body
+        larger than the whole budget is not cached.
+
+        Returns:
+            Whether the body was stored
+        """
+        self.release(reservation)
+        entry = _Entry(body, time.monotonic() + self.ttl_seconds)
+        if reservation.stale or entry.size > self.max_bytes:
+            return False
+
+        cache_key = (reservation.owner_id, reservation.key)
+        if cache_key in self._entries:
+            self._remove(cache_key, None)
+        while self._bytes + entry.size > self.max_bytes:
+            self._remove(next(iter(self._entries)), 'size')
+        self._entries[cache_key] = entry
+        self._owner_keys.setdefault(reservation.owner_id, set()).add(reservation.key)
+        self._bytes += entry.size
+        RESPONSE_CACHE_BYTES.set(self._bytes)
+        return True
+
+    def release(self, reservation: Reservation) -> None:
+        """End a fill without storing (e.g. the query failed); idempotent"""
+        reservations = self._reservations.get(reservation.owner_id)
+        if reservations is not None:
+            reservations.discard(reservation)
+            if not reservations:
+                del self._reservations[reservation.owner_id]
+
+    def invalidate(self, owner_id: str) -> None:
+        """Drop an owner's entries in this worker and announce it to the others"""
+        self.broker.publish(owner_id)
+        # Brokers that don't echo to the publisher still invalidate locally
+        self._drop_owner(owner_id)
+
+    def clear(self) -> None:
+        """Drop every entry (reservations in progress become stale)"""
+        for owner_id in list(self._owner_keys) + list(self._reservations):
+            self._drop_owner(owner_id)
+
+    def close(self) -> None:
+        """Detach from the event bus and close the broker"""
+        event_bus.unsubscribe(self._on_event)
+        self.broker.close()
+
+    def _drop_owner(self, owner_id: str) -> None:
+        for reservation in self._reservations.pop(owner_id, ()):
+            reservation.stale = True
+        for key in list(self._owner_keys.get(owner_id, ())):
+            self._remove((owner_id, key), 'invalidated')
+
+    def _remove(self, cache_key: CacheKey, reason: Optional[str]) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return
+        owner_id, key = cache_key
+        keys = self._owner_keys.get(owner_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._owner_keys[owner_id]
+        self._bytes -= entry.size
+        RESPONSE_CACHE_BYTES.set(self._bytes)
+        if reason:
+            RESPONSE_CACHE_EVICTIONS.inc((reason,))
+
+    def _on_event(self, event: Event) -> None:
+        if settings.RESPONSE_CACHE_ENABLED and event.type.startswith(self.invalidate_on):
+            self.invalidate(event.owner_id)
+
+
+# Global cache of encoded GET /tasks/ responses (used when
+# RESPONSE_CACHE_ENABLED is set)
+task_list_cache = ResponseCache()
@@ -2,27 +2,117 @@
 Security utilities
 Password hashing and JWT token management
 """
+import logging
+import math
+import secrets
+import time
 import bcrypt
-from jose import jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, MutableMapping, Optional
 
 from .config import settings
+from .jwt_keys import get_key_ring
 
+logger = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
+# Cost used until configure_password_hashing() runs (and by tests)
+DEFAULT_BCRYPT_ROUNDS = 12
+
+_calibrated_rounds: Optional[int] = None
+
+
+def calibrate_bcrypt_rounds(target_ms: float, minimum: int, maximum: int, probe_rounds: int = 8) -> int:
     """
-    Hash a password using bcrypt with cost factor 12
+    Highest bcrypt cost whose hash takes at most target_ms on this machine
+    
+    Times a cheap probe hash (best of three) and extrapolates, since each
+    extra round doubles the work.
+    
+    Args:
+        target_ms: Time budget per hash in milliseconds
+        minimum: Lowest cost to return
+        maximum: Highest cost to return
+        probe_rounds: Cost of the timed probe
+        
+    Returns:
+        Cost factor clamped to [minimum, maximum]
+    """
+    salt = bcrypt.gensalt(rounds=probe_rounds)
+    best = math.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', salt)
+        best = min(best, time.perf_counter() - start)
+    extra = math.floor(math.log2(target_ms / 1000 / best)) if best > 0 else maximum
+    return max(minimum, min(maximum, probe_rounds + extra))
+
+
+def configure_password_hashing() -> int:
+    """
+    Set the bcrypt cost for new hashes (called at startup)
+    
+    Uses BCRYPT_ROUNDS if set, otherwise calibrates to BCRYPT_TARGET_MS.
+    
+    Returns:
+        Cost factor in use
+    """
+    global _calibrated_rounds
+    if settings.BCRYPT_ROUNDS:
+        _calibrated_rounds = settings.BCRYPT_ROUNDS
+    else:
+        _calibrated_rounds = calibrate_bcrypt_rounds(
+            settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+        )
+        logger.info(
+            "Calibrated bcrypt cost to %d for a %gms target", _calibrated_rounds, settings.BCRYPT_TARGET_MS
+        )
+    return _calibrated_rounds
+
+
+def bcrypt_rounds() -> int:
+    """Cost factor for new password hashes"""
+    return _calibrated_rounds or settings.BCRYPT_ROUNDS or DEFAULT_BCRYPT_ROUNDS
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """
+    Cost factor of a bcrypt hash ("$2b$12$..." -> 12)
+    
+    Returns:
+        Cost factor, or None if the hash is not in bcrypt format
+    """
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Whether a stored hash uses a lower cost than new hashes
+    
+    Only ever upgrades: workers calibrated to different costs (mixed or
+    busy hosts) would otherwise rewrite the same hash back and forth, and
+    a low calibration would weaken existing hashes.
+    """
+    rounds = hash_rounds(hashed_password)
+    return rounds is None or rounds < bcrypt_rounds()
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hash a password using bcrypt
     
     Args:
         password: Plain text password
+        rounds: Cost factor (default: bcrypt_rounds())
         
     Returns:
         Hashed password string
     """
     # Convert password to bytes and hash
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or bcrypt_rounds())
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return as string for MongoDB storage
     return hashed.decode('utf-8')
@@ -69,4 +159,56 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
         "iat": timegm(now.utctimetuple())
     }
     
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return get_key_ring().sign(payload)
+
+
+def create_refresh_token() -> str:
+    """
+    Create an opaque refresh token
+    
+    Returns:
+        256-bit random URL-safe string (stored only as a hash)
+    """
+    return secrets.token_urlsafe(32)
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a JWT access token and return its claims
+    
+    Args:
+        token: Encoded JWT
+        
+    Returns:
+        Token payload ("sub" is the user ID)
+        
+    Raises:
+        JWTError: Invalid signature, malformed or expired token
+    """
+    return get_key_ring().verify(token)
+
+
+def verify_request_token(scope: MutableMapping[str, Any], token: str) -> dict:
+    """
+    decode_access_token, at most once per request
+    
+    Verified claims are kept in the request's ASGI scope state, so the
+    rate limit middleware and get_current_user share one signature check.
+    
+    Args:
+        scope: ASGI scope of the current request
+        token: Encoded JWT
+        
+    Returns:
+        Token payload
+        
+    Raises:
+        JWTError: Invalid signature, malformed or expired token
+    """
+    state = scope.setdefault('state', {})
+    cached = state.get('access_token_claims')
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    claims = decode_access_token(token)
+    state['access_token_claims'] = (token, claims)
+    return claims
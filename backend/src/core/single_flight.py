@@ -0,0 +1,91 @@
+"""
+Single-flight
+Shares one in-flight read among concurrent identical requests
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Sequence, TypeVar
+
+from .config import settings
+from .events import Event, event_bus
+from .metrics import SINGLE_FLIGHT_CALLS
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Per-owner request coalescing
+
+    The first caller for a key starts the call as its own task; callers
+    arriving while it runs await the same result (or exception) instead of
+    issuing another query. Nothing is kept once the call finishes, so this
+    is not a cache: it only merges requests that overlap in time.
+
+    A write event for an owner detaches that owner's in-flight calls, so a
+    read that starts after a write never joins a query that started before
+    it. The shared task runs in the first caller's context (its deadline
+    applies to everyone) and is shielded: a caller that disconnects does
+    not cancel it for the others.
+    """
+
+    def __init__(self, name: str, invalidate_on: Sequence[str] = ()):
+        """
+        Args:
+            name: Group name used in metrics
+            invalidate_on: Event type prefixes that detach the owner's calls
+        """
+        self.name = name
+        self.invalidate_on = tuple(invalidate_on)
+        self._calls: Dict[str, Dict[Hashable, asyncio.Future]] = {}
+        self._attached = False
+
+    async def do(self, owner_id: str, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `call`, or join an identical call already in flight
+
+        Args:
+            owner_id: Owner the result belongs to
+            key: Identifies identical requests for this owner (e.g. sort options)
+            call: Zero-argument coroutine function producing the result
+
+        Returns:
+            The call's result, shared with concurrent callers
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await call()
+        if self.invalidate_on and not self._attached:
+            event_bus.subscribe(self._on_event)
+            self._attached = True
+
+        calls = self._calls.setdefault(owner_id, {})
+        future = calls.get(key)
+        if future is None:
+            SINGLE_FLIGHT_CALLS.inc((self.name, 'leader'))
+            future = asyncio.ensure_future(call())
+            calls[key] = future
+            future.add_done_callback(lambda done: self._finished(owner_id, key, done))
+        else:
+            SINGLE_FLIGHT_CALLS.inc((self.name, 'shared'))
+        return await asyncio.shield(future)
+
+    def forget(self, owner_id: str) -> None:
+        """Detach an owner's in-flight calls; later callers start new ones"""
+        self._calls.pop(owner_id, None)
+
+    def in_flight(self, owner_id: str) -> int:
+        """Number of distinct calls in flight for an owner"""
+        return len(self._calls.get(owner_id, ()))
+
+    def _finished(self, owner_id: str, key: Hashable, future: asyncio.Future) -> None:
+        calls = self._calls.get(owner_id)
+        if calls is not None and calls.get(key) is future:
+            del calls[key]
+            if not calls:
+                del self._calls[owner_id]
+        # Mark the exception retrieved even if every caller went away
+        if not future.cancelled():
+            future.exception()
+
+    def _on_event(self, event: Event) -> None:
+        if event.type.startswith(self.invalidate_on):
+            self.forget(event.owner_id)
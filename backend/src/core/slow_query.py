@@ -0,0 +1,210 @@
+"""
+Slow query log
+Logs MongoDB commands over a latency threshold, with redacted filter shapes
+and optional explain() plans
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pymongo import monitoring
+
+from .config import settings
+from .mongo_monitoring import command_collection
+
+logger = logging.getLogger(__name__)
+
+# Commands whose plans explain() can report
+EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct', 'findAndModify', 'update', 'delete'}
+
+# Command fields added by the driver that explain must not repeat
+DRIVER_FIELDS = {'lsid', 'txnNumber', 'autocommit', 'startTransaction', 'readConcern', 'writeConcern'}
+
+
+def redact(value: Any) -> Any:
+    """
+    Replace every literal in a filter with "?" while keeping its structure
+
+    Field names and operators are kept, so two queries with the same shape
+    produce the same output.
+
+    Args:
+        value: Filter, pipeline or value
+
+    Returns:
+        Redacted copy
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return ['?']
+    return '?'
+
+
+def command_shape(command_name: str, command: Mapping[str, Any]) -> Dict:
+    """
+    Extract the query-relevant parts of a command, redacted
+
+    Args:
+        command_name: Command name
+        command: Command document
+
+    Returns:
+        Dict with filter/sort/pipeline shapes (empty if not a query)
+    """
+    shape: Dict[str, Any] = {}
+    if command_name in ('find', 'count', 'distinct'):
+        shape['filter'] = redact(command.get('filter', command.get('query', {})))
+        if 'sort' in command:
+            shape['sort'] = dict(command['sort'])
+    elif command_name == 'aggregate':
+        shape['pipeline'] = redact(command.get('pipeline', []))
+    elif command_name == 'findAndModify':
+        shape['filter'] = redact(command.get('query', {}))
+    elif command_name == 'update':
+        shape['filter'] = [redact(update.get('q', {})) for update in command.get('updates', [])]
+    elif command_name == 'delete':
+        shape['filter'] = [redact(delete.get('q', {})) for delete in command.get('deletes', [])]
+    return shape
+
+
+def documents_returned(command_name: str, reply: Mapping[str, Any]) -> Optional[int]:
+    """Number of documents a command returned or affected, if known"""
+    if 'cursor' in reply:
+        cursor = reply['cursor']
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', [])))
+    if command_name == 'findAndModify':
+        return 1 if reply.get('value') is not None else 0
+    if 'n' in reply:
+        return reply['n']
+    return None
+
+
+def summarize_plan(explain: Dict) -> Dict:
+    """
+    Reduce an executionStats explain() result to the interesting numbers
+
+    Returns:
+        Dict with docs/keys examined, documents returned and the winning
+        plan's stages (e.g. "FETCH <- IXSCAN owner_id_1_created_at_-1")
+    """
+    stats = explain.get('executionStats', {})
+    planner = explain.get('queryPlanner', {})
+    if not planner and 'stages' in explain:
+        # Aggregations nest the find-layer explain in the first stage
+        planner = explain['stages'][0].get('$cursor', {}).get('queryPlanner', {})
+        stats = explain['stages'][0].get('$cursor', {}).get('executionStats', stats)
+
+    stages = []
+    plan = planner.get('winningPlan', {})
+    plan = plan.get('queryPlan', plan)
+    while plan:
+        stage = plan.get('stage', '?')
+        if plan.get('indexName'):
+            stage += f" {plan['indexName']}"
+        stages.append(stage)
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+
+    return {
+        'plan': ' <- '.join(stages),
+        'docs_examined': stats.get('totalDocsExamined'),
+        'keys_examined': stats.get('totalKeysExamined'),
+        'returned': stats.get('nReturned'),
+    }
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Logs commands slower than SLOW_QUERY_THRESHOLD_MS
+
+    Each entry carries the collection, command, redacted filter shape,
+    duration and documents returned. With SLOW_QUERY_EXPLAIN enabled, the
+    command is re-run as explain("executionStats") on a background thread
+    (at most once per shape per SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS) and the
+    plan is logged with docs/keys examined. A COLLSCAN or a large
+    examined/returned ratio then points straight at a missing index.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        explain: Optional[bool] = None,
+        explain_interval_seconds: Optional[float] = None
+    ):
+        self.threshold_ms = threshold_ms if threshold_ms is not None else settings.SLOW_QUERY_THRESHOLD_MS
+        self.explain = explain if explain is not None else settings.SLOW_QUERY_EXPLAIN
+        self.explain_interval = (
+            explain_interval_seconds if explain_interval_seconds is not None
+            else settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+        )
+        # Synchronous pymongo client used for explain (set after connecting)
+        self.client: Any = None
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Mapping[str, Any]]] = {}
+        self._explained_at: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name == 'explain':
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending and event.duration_micros >= self.threshold_ms * 1000:
+            self.record(event.command_name, pending[0], pending[1], event.reply, event.duration_micros / 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._pending.pop((event.connection_id, event.request_id), None)
+
+    def record(
+        self,
+        command_name: str,
+        database: str,
+        command: Mapping[str, Any],
+        reply: Mapping[str, Any],
+        duration_ms: float
+    ) -> None:
+        """Log one slow command and schedule its explain if enabled"""
+        collection = command_collection(command_name, command)
+        shape = command_shape(command_name, command)
+        logger.warning(
+            "Slow MongoDB command: %s.%s %s took %.1fms, returned=%s, shape=%s",
+            database, collection, command_name, duration_ms,
+            documents_returned(command_name, reply), shape
+        )
+
+        if self.explain and self.client is not None and command_name in EXPLAINABLE:
+            key = f"{database}.{collection}.{command_name}:{shape}"
+            now = time.monotonic()
+            if now - self._explained_at.get(key, float('-inf')) >= self.explain_interval:
+                self._explained_at[key] = now
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain')
+                self._executor.submit(self._explain, database, collection, command_name, command)
+
+    def _explain(self, database: str, collection: str, command_name: str, command: Mapping[str, Any]) -> None:
+        """Run explain on the synchronous client and log the plan summary"""
+        explained = {
+            key: value for key, value in command.items()
+            if not key.startswith('$') and key not in DRIVER_FIELDS
+        }
+        try:
+            result = self.client[database].command(
+                {'explain': explained, 'verbosity': 'executionStats'}
+            )
+        except Exception as exc:
+            logger.warning("Explain failed for %s.%s %s: %s", database, collection, command_name, exc)
+            return
+        logger.warning(
+            "Slow MongoDB command plan: %s.%s %s %s",
+            database, collection, command_name, summarize_plan(result)
+        )
+
+    def close(self) -> None:
+        """Stop the explain thread"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,114 @@
+"""
+Token revocation list
+In-memory Bloom filter of users whose access tokens were revoked
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, List, Optional
+
+from .bloom import BloomFilter
+from .config import settings
+from .metrics import TOKEN_REVOCATION_CHECKS
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    """
+    Answers "was this access token revoked?" without a database round trip
+    for almost every request
+
+    The filter holds the IDs of users with an unexpired revocation. A user
+    not in the filter is certainly not revoked; a hit (a revoked user, or a
+    rare false positive) is confirmed against the token_revocations
+    collection. Revocations made by this worker are added at once; the
+    filter is rebuilt from the database every
+    TOKEN_REVOCATION_REFRESH_SECONDS, which picks up other workers'
+    revocations and drops expired ones.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        refresh_seconds: Optional[float] = None
+    ):
+        self.capacity = capacity or settings.TOKEN_REVOCATION_BLOOM_CAPACITY
+        self.error_rate = error_rate or settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+        self.refresh_seconds = refresh_seconds or settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self._added_during_refresh: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: str) -> None:
+        """Record a revocation made by this worker"""
+        self.bloom.add(user_id)
+        if self._added_during_refresh is not None:
+            self._added_during_refresh.append(user_id)
+
+    async def is_revoked(self, repository: Any, user_id: str, issued_at: datetime) -> bool:
+        """
+        Whether an access token was revoked
+
+        Args:
+            repository: TokenRevocationRepository, used only on a filter hit
+            user_id: Token subject
+            issued_at: Token issue time (iat)
+
+        Returns:
+            True if the token was issued before the user's cutoff
+        """
+        if user_id not in self.bloom:
+            TOKEN_REVOCATION_CHECKS.inc(('negative',))
+            return False
+        revoked_before = await repository.revoked_before(user_id)
+        if revoked_before is None or issued_at >= revoked_before:
+            TOKEN_REVOCATION_CHECKS.inc(('false_positive',))
+            return False
+        TOKEN_REVOCATION_CHECKS.inc(('revoked',))
+        return True
+
+    async def refresh(self, repository: Any) -> None:
+        """
+        Rebuild the filter from the database
+
+        Revocations added while the query runs are carried over, so none
+        is lost to the swap.
+        """
+        self._added_during_refresh = []
+        try:
+            user_ids = await repository.revoked_user_ids()
+            bloom = BloomFilter.build(
+                user_ids + self._added_during_refresh, max(self.capacity, 2 * len(user_ids)), self.error_rate
+            )
+        finally:
+            self._added_during_refresh = None
+        self.bloom = bloom
+
+    def start(self, repository: Any) -> None:
+        """Start the periodic rebuild loop"""
+        self._task = asyncio.create_task(self._run(repository))
+
+    async def stop(self) -> None:
+        """Stop the rebuild loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, repository: Any) -> None:
+        """Rebuild loop; failures keep the current filter"""
+        while True:
+            try:
+                await self.refresh(repository)
+            except Exception:
+                logger.warning("Token revocation refresh failed", exc_info=True)
+            await asyncio.sleep(self.refresh_seconds)
+
+
+# Global revocation list consulted by get_current_user
+token_revocations = TokenRevocationList()
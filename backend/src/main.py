@@ -2,22 +2,57 @@
 Todox Backend API
 FastAPI application entry point
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
 
-from .core.database import connect_to_database, close_database_connection
+from .core.database import connect_to_database, close_database_connection, get_database
 from .core.config import settings
-from .api.v1 import auth, tasks, labels
+from .core.deadline import deadline_exceeded
+from .core.event_hub import event_hub
+from .core.health import health_monitor
+from .core.metrics import registry
+from .core.jwt_keys import get_key_ring
+from .core.security import configure_password_hashing
+from .core.token_revocation import token_revocations
+from .middleware.concurrency_limit_middleware import ConcurrencyLimitMiddleware
+from .middleware.deadline_middleware import DeadlineMiddleware
+from .middleware.metrics_middleware import MetricsMiddleware
+from .middleware.rate_limit_middleware import RateLimitMiddleware
+from .api.v1 import admin, auth, tasks, labels, events
+from .repositories.token_repository import TokenRevocationRepository
+from .services.reminder_service import ReminderScheduler
+from .services.reminder_sinks import create_reminder_sink
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
+    configure_password_hashing()
+    get_key_ring()  # Fail fast on a misconfigured signing key
     await connect_to_database()
+    
+    from .core.database import client
+    await health_monitor.check()
+    health_monitor.start(client)
+    token_revocations.start(TokenRevocationRepository(get_database()))
+    
+    reminder_scheduler = None
+    if settings.REMINDERS_ENABLED:
+        sink = create_reminder_sink(settings.REMINDER_SINK, settings.REMINDER_WEBHOOK_URL)
+        reminder_scheduler = ReminderScheduler(get_database(), sink)
+        reminder_scheduler.start()
+    
     yield
     # Shutdown
+    await health_monitor.stop()
+    await token_revocations.stop()
+    event_hub.close()
+    if reminder_scheduler:
+        await reminder_scheduler.stop()
     await close_database_connection()
 
 
@@ -28,6 +63,14 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (innermost, so 429s still carry CORS headers and CORS
+# preflights are answered without using up tokens)
+app.add_middleware(RateLimitMiddleware)
+
+# Load shedding (outside rate limiting so overload is refused before any
+# rate limit store work; inside CORS so 503s carry CORS headers)
+app.add_middleware(ConcurrencyLimitMiddleware)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -37,29 +80,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request deadlines and cancellation on client disconnect
+app.add_middleware(DeadlineMiddleware)
+
+# Request metrics (added last so it wraps every other middleware)
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
 app.include_router(labels.router)
+app.include_router(events.router)
+app.include_router(admin.router)
+
+@app.exception_handler(ExecutionTimeout)
+@app.exception_handler(ConnectionFailure)
+async def database_unavailable_handler(request: Request, exc: Exception):
+    """
+    Pool wait-queue and server-selection timeouts mean the database is
+    saturated or unreachable; tell clients to retry instead of failing with 500.
+    Operations cut short by the request's deadline are reported as 504.
+    """
+    if isinstance(exc, ExecutionTimeout) or deadline_exceeded():
+        return JSONResponse(
+            status_code=504,
+            content={"detail": "Request deadline exceeded"}
+        )
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database temporarily unavailable"},
+        headers={"Retry-After": "1"}
+    )
 
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "Todox API - Use /docs for API documentation"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in text exposition format"""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """
+    Public keys for verifying access tokens (JWK Set)
+    Empty when tokens are signed with a shared secret (HS256)
+    """
+    return JSONResponse(get_key_ring().jwks(), headers={"Cache-Control": "public, max-age=300"})
+
+@app.get("/livez")
+async def liveness():
+    """
+    Liveness probe
+    Reports that the process is serving requests; performs no I/O
+    """
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    """
+    Readiness probe
+    Served from the background database ping, so probes never touch MongoDB
+    """
+    return JSONResponse(
+        status_code=200 if health_monitor.ready else 503,
+        content=health_monitor.status()
+    )
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint
-    Verifies API is running and database is connected
+    Kept with its original body for existing monitors; served from the
+    background database ping like /readyz, which has the detail
     """
-    try:
-        # Ping database to verify connection
-        from .core.database import client
-        if client:
-            await client.admin.command('ping')
-            return {"status": "healthy", "database": "connected"}
-        else:
-            return {"status": "unhealthy", "database": "not initialized"}, 503
-    except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}, 503
+    if health_monitor.ready:
+        return {"status": "healthy", "database": "connected"}
+    if health_monitor.client is None:
+        return JSONResponse(status_code=503, content={"status": "unhealthy", "database": "not initialized"})
+    return JSONResponse(
+        status_code=503,
+        content={"status": "unhealthy", "database": "disconnected", "error": health_monitor.error or "stale check"}
+    )
@@ -2,21 +2,29 @@
 Authentication middleware
 JWT token verification and user authentication
 """
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import JWTError
 from bson import ObjectId
+from datetime import datetime
 
 from ..core.config import settings
 from ..core.database import get_database
+from ..core.security import verify_request_token
+from ..core.token_revocation import token_revocations
 from ..repositories.user_repository import UserRepository
+from ..repositories.token_repository import TokenRevocationRepository
 from ..models.user import UserInDB
 
 security = HTTPBearer()
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db=Depends(get_database)
 ) -> UserInDB:
@@ -24,9 +32,11 @@ async def get_current_user(
     FastAPI dependency that verifies JWT token and returns current user.
     
     Extracts token from Authorization header, decodes and validates it,
-    then fetches the user from the database.
+    rejects it if revoked (an in-memory check for users without
+    revocations), then fetches the user from the database.
     
     Args:
+        request: Current request (reuses claims the rate limiter verified)
         credentials: HTTP Bearer credentials from Authorization header
         db: Database instance from dependency
         
@@ -45,21 +55,22 @@ async def get_current_user(
     try:
         token = credentials.credentials
         
-        # Decode JWT token
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        # Decode JWT token (once per request, see verify_request_token)
+        payload = verify_request_token(request.scope, token)
         
         # Extract user_id from token
-        user_id: str = payload.get("sub")
+        user_id: Optional[str] = payload.get("sub")
         if user_id is None:
             raise credentials_exception
         
     except JWTError:
         raise credentials_exception
     
+    # Tokens issued before a password change are revoked
+    issued_at = datetime.utcfromtimestamp(payload.get("iat", 0))
+    if await token_revocations.is_revoked(TokenRevocationRepository(db), user_id, issued_at):
+        raise credentials_exception
+    
     # Fetch user from database
     user_repo = UserRepository(db)
     user = await user_repo.find_by_id(ObjectId(user_id))
@@ -68,3 +79,20 @@ async def get_current_user(
         raise credentials_exception
     
     return user
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """
+    FastAPI dependency guarding admin endpoints with ADMIN_API_KEY
+    
+    Args:
+        x_admin_key: X-Admin-Key request header
+        
+    Raises:
+        HTTPException 404: Admin endpoints are disabled (no ADMIN_API_KEY)
+        HTTPException 403: Missing or wrong admin key
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
@@ -0,0 +1,83 @@
+"""
+Concurrency limit middleware
+Sheds requests over the adaptive in-flight limit with 503 Service Unavailable
+"""
+import json
+from typing import Optional
+
+from ..core.concurrency_limit import AdaptiveConcurrencyLimit, request_priority
+from ..core.config import settings
+from ..core.metrics import REQUESTS_SHED
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Pure ASGI load shedding
+
+    Requests that do not fit under the current limit for their class are
+    refused at once with 503 and Retry-After, so overload costs clients a
+    fast retry instead of a pool wait-queue timeout. Latency is measured
+    from admission to the end of the response and compared per matched
+    route template; 429s and cancelled or failed requests free their slot
+    without adjusting the limit.
+    """
+
+    def __init__(self, app, limiter: Optional[AdaptiveConcurrencyLimit] = None):
+        self.app = app
+        self._limiter = limiter
+        self.exempt = tuple(settings.CONCURRENCY_EXEMPT_PATHS)
+        self.auth_routes = frozenset(settings.CONCURRENCY_AUTH_ROUTES)
+
+    @property
+    def limiter(self) -> AdaptiveConcurrencyLimit:
+        # Built on first use so settings changed after import apply
+        if self._limiter is None:
+            self._limiter = AdaptiveConcurrencyLimit()
+        return self._limiter
+
+    def is_exempt(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + '/') for prefix in self.exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.CONCURRENCY_LIMIT_ENABLED or self.is_exempt(scope['path']):
+            await self.app(scope, receive, send)
+            return
+
+        priority = request_priority(scope['method'], scope['path'], self.auth_routes)
+        permit = self.limiter.try_acquire(priority)
+        if permit is None:
+            REQUESTS_SHED.inc((priority,))
+            await send_service_unavailable(send)
+            return
+
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        ok = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if status_code is not None and status_code != 429:
+                ok = status_code not in (503, 504)
+        finally:
+            route = scope.get('route')
+            self.limiter.release(permit, ok, f"{scope['method']} {getattr(route, 'path', '<unmatched>')}")
+
+
+async def send_service_unavailable(send) -> None:
+    """Send a 503 JSON response for a shed request"""
+    body = json.dumps({"detail": "Server overloaded, retry shortly"}).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': 503,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'retry-after', b'1'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
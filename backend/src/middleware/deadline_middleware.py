@@ -0,0 +1,84 @@
+"""
+Deadline middleware
+Applies a per-request time budget and cancels requests whose client disconnected
+"""
+import asyncio
+import logging
+
+from ..core.deadline import parse_timeout_ms, request_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware enforcing request deadlines
+
+    The budget comes from the X-Request-Timeout header (milliseconds) or
+    REQUEST_TIMEOUT_MS and caps every MongoDB operation of the request (see
+    core.deadline). The request runs in its own task while this middleware
+    reads the ASGI receive channel and hands messages to the app. If the
+    client disconnects before the response is complete, the task is
+    cancelled, so an abandoned request issues no further queries. A command
+    already running on the server stops at its maxTimeMS.
+
+    Request bodies are read ahead of the app, which suits this JSON API but
+    would bypass flow control for large uploads.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timeout_header = None
+        for name, value in scope['headers']:
+            if name == b'x-request-timeout':
+                timeout_header = value.decode('latin-1')
+                break
+
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def receive_wrapper():
+            message = await messages.get()
+            if message['type'] == 'http.disconnect':
+                # Every later receive() sees the disconnect too
+                messages.put_nowait(message)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                response_complete = True
+            await send(message)
+
+        with request_deadline(parse_timeout_ms(timeout_header)):
+            app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+
+        async def watch_disconnect():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message['type'] == 'http.disconnect':
+                    if not response_complete and not app_task.done():
+                        disconnected = True
+                        scope['client_disconnected'] = True
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                app_task.cancel()
+                raise
+            logger.info("Client disconnected, cancelled %s %s", scope['method'], scope['path'])
+        finally:
+            watcher.cancel()
@@ -0,0 +1,54 @@
+"""
+Metrics middleware
+Records per-route request count, latency, response size and in-flight requests
+"""
+from time import perf_counter
+
+from ..core.metrics import HTTP_IN_FLIGHT, HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_RESPONSE_SIZE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body buffering)
+
+    Requests are labelled with the matched route template (e.g.
+    /tasks/{task_id}) rather than the raw path, keeping label cardinality
+    bounded; requests that match no route are labelled "<unmatched>".
+    Requests abandoned by the client before a response started are counted
+    with status 499.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = None
+        size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+        
+        HTTP_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            
+            route = scope.get('route')
+            labels = (scope['method'], getattr(route, 'path', '<unmatched>'))
+            if status_code is None:
+                status_code = 499 if scope.get('client_disconnected') else 500
+            HTTP_REQUESTS.inc(labels + (str(status_code),))
+            HTTP_REQUEST_DURATION.observe(duration, labels)
+            HTTP_RESPONSE_SIZE.observe(size, labels)
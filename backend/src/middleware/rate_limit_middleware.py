@@ -0,0 +1,110 @@
+"""
+Rate limit middleware
+Refuses requests over the per-client limits with 429 Too Many Requests
+"""
+import json
+import math
+from typing import Optional
+
+from jose import JWTError
+
+from ..core.config import settings
+from ..core.metrics import RATE_LIMITED
+from ..core.rate_limit import RateLimiter, RateLimitResult
+from ..core.security import verify_request_token
+
+
+def client_address(scope, proxy_hops: int) -> str:
+    """
+    The client's IP address
+
+    Behind `proxy_hops` trusted reverse proxies the address is taken from
+    X-Forwarded-For, counting from the right (entries further left are
+    supplied by the client and cannot be trusted).
+    """
+    if proxy_hops > 0:
+        for name, value in scope.get('headers', ()):
+            if name == b'x-forwarded-for':
+                hops = [hop.strip() for hop in value.decode('latin-1').split(',') if hop.strip()]
+                if hops:
+                    return hops[-min(proxy_hops, len(hops))]
+    client = scope.get('client')
+    return client[0] if client else 'unknown'
+
+
+def client_identity(scope, proxy_hops: int) -> str:
+    """
+    Rate limit key: the user for a validly signed bearer token, else the IP
+
+    Only the signature and expiry are checked (no database lookup); an
+    invalid token falls back to the IP, so forged tokens cannot be used to
+    get fresh buckets. The verified claims stay in the scope for
+    get_current_user, so the signature is checked once per request.
+    """
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            scheme, _, token = value.decode('latin-1').partition(' ')
+            if scheme.lower() == 'bearer' and token:
+                try:
+                    user_id = verify_request_token(scope, token).get('sub')
+                except JWTError:
+                    user_id = None
+                if user_id:
+                    return f"user:{user_id}"
+            break
+    return f"ip:{client_address(scope, proxy_hops)}"
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI token-bucket rate limiting
+
+    Probe and metrics endpoints are exempt (RATE_LIMIT_EXEMPT_PATHS).
+    Refusals are 429 responses with Retry-After and RateLimit-* headers;
+    allowed requests pass through untouched.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self._limiter = limiter
+        self.exempt = set(settings.RATE_LIMIT_EXEMPT_PATHS)
+
+    @property
+    def limiter(self) -> RateLimiter:
+        # Built on first use so settings changed after import apply
+        if self._limiter is None:
+            self._limiter = RateLimiter()
+        return self._limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.RATE_LIMIT_ENABLED or scope['path'] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        identity = client_identity(scope, settings.RATE_LIMIT_PROXY_HOPS)
+        rule, result = await self.limiter.check(scope['method'], scope['path'], identity)
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc((rule,))
+        await send_too_many_requests(send, result)
+
+
+async def send_too_many_requests(send, result: RateLimitResult) -> None:
+    """Send a 429 JSON response for a refused request"""
+    body = json.dumps({"detail": "Too many requests"}).encode()
+    retry_after = max(1, math.ceil(result.retry_after))
+    await send({
+        'type': 'http.response.start',
+        'status': 429,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'retry-after', str(retry_after).encode()),
+            (b'ratelimit-limit', str(result.limit.requests).encode()),
+            (b'ratelimit-remaining', b'0'),
+            (b'ratelimit-reset', str(math.ceil(result.reset_after)).encode()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
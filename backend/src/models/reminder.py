@@ -0,0 +1,15 @@
+"""
+Reminder data models
+Pydantic models for deadline reminder events
+"""
+from pydantic import BaseModel, Field
+from datetime import datetime, date
+
+
+class Reminder(BaseModel):
+    """Deadline reminder emitted by the reminder scheduler"""
+    task_id: str
+    owner_id: str
+    title: str
+    deadline: date
+    remind_at: datetime = Field(..., description="When the reminder became due (UTC)")
@@ -2,12 +2,63 @@
 Task data models
 Pydantic models for task entities
 """
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
+from typing import Any, Optional, List, Literal
 from datetime import datetime, date
 
+from ..core.recurrence import parse_rrule
+
 TaskPriority = Literal['High', 'Medium', 'Low']
 TaskStatus = Literal['open', 'done']
+TaskSortField = Literal['deadline', 'priority', 'created_at', 'updated_at']
+SortOrder = Literal['asc', 'desc']
+
+# Numeric rank stored alongside the priority literal so that priority
+# sorts can be served from an index (higher rank = more important)
+PRIORITY_RANK = {'High': 3, 'Medium': 2, 'Low': 1}
+
+RecurrenceFrequency = Literal['daily', 'weekly', 'monthly']
+
+
+class RecurrenceRule(BaseModel):
+    """
+    Recurrence rule (subset of RFC 5545 RRULE)
+    
+    Accepts either an object or an RRULE string such as
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10".
+    """
+    freq: RecurrenceFrequency = Field(..., description="daily, weekly or monthly")
+    interval: int = Field(1, ge=1, le=366, description="Repeat every N days/weeks/months")
+    by_weekday: Optional[List[int]] = Field(
+        None, description="Weekdays for weekly rules (0=Monday ... 6=Sunday)"
+    )
+    count: Optional[int] = Field(None, ge=1, description="Total number of occurrences")
+    until: Optional[date] = Field(None, description="Last possible occurrence (inclusive)")
+    
+    @model_validator(mode='before')
+    @classmethod
+    def parse_rrule_string(cls, value: Any) -> Any:
+        """Allow the rule to be given as an RRULE string"""
+        if isinstance(value, str):
+            return parse_rrule(value)
+        return value
+    
+    @field_validator('by_weekday')
+    @classmethod
+    def validate_weekdays(cls, value: Optional[List[int]]) -> Optional[List[int]]:
+        """Weekdays must be 0-6"""
+        if value is not None and any(day < 0 or day > 6 for day in value):
+            raise ValueError("by_weekday values must be between 0 (Monday) and 6 (Sunday)")
+        return value
+    
+    @model_validator(mode='after')
+    def validate_rule(self) -> 'RecurrenceRule':
+        """Reject combinations the expander does not support"""
+        if self.by_weekday and self.freq != 'weekly':
+            raise ValueError("by_weekday is only supported for weekly rules")
+        if self.count is not None and self.until is not None:
+            raise ValueError("count and until are mutually exclusive")
+        return self
 
 
 class TaskBase(BaseModel):
@@ -16,6 +67,9 @@ class TaskBase(BaseModel):
     description: Optional[str] = Field(None, description="Optional task description")
     priority: TaskPriority = Field(..., description="Task priority: High, Medium, or Low")
     deadline: date = Field(..., description="Task deadline (ISO 8601 date)")
+    recurrence: Optional[RecurrenceRule] = Field(
+        None, description="Repeat the task; deadline is the first occurrence"
+    )
 
 
 class TaskCreate(TaskBase):
@@ -31,6 +85,7 @@ class TaskUpdate(BaseModel):
     deadline: Optional[date] = None
     status: Optional[TaskStatus] = None
     label_ids: Optional[List[str]] = None
+    recurrence: Optional[RecurrenceRule] = None
 
 
 class TaskInDB(TaskBase):
@@ -43,7 +98,19 @@ class TaskInDB(TaskBase):
     owner_id: str
     created_at: datetime
     updated_at: datetime
+    series_id: Optional[str] = Field(
+        None, description="Recurring task this occurrence belongs to"
+    )
+    occurrence_date: Optional[date] = Field(
+        None, description="Scheduled date of this occurrence within its series"
+    )
 
 
 # Alias for API responses
 TaskResponse = TaskInDB
+
+
+class CalendarDay(BaseModel):
+    """Tasks due on a single calendar day"""
+    day: date = Field(..., description="Deadline day (ISO 8601 date)")
+    tasks: List[TaskResponse] = Field(default_factory=list, description="Tasks due that day")
@@ -10,6 +10,8 @@ from pymongo.errors import DuplicateKeyError
 from fastapi import HTTPException, status
 
 from ..models.label import LabelInDB
+from ..core.events import Event, event_bus
+from ..core.indexes import CASE_INSENSITIVE, INDEXES, sync_collection_indexes
 
 
 class LabelRepository:
@@ -31,7 +33,7 @@ class LabelRepository:
             LabelInDB: Created label
             
         Raises:
-            HTTPException 409: Label name already exists for this user
+            HTTPException 409: Label name already exists for this user (ignoring case)
         """
         label_data = {
             "name": name,
@@ -41,25 +43,31 @@ class LabelRepository:
         
         try:
             result = await self.collection.insert_one(label_data)
-            label_data["_id"] = result.inserted_id
-            return LabelInDB(**self._doc_to_dict(label_data))
         except DuplicateKeyError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Label '{name}' already exists"
             )
+        
+        label_data["_id"] = result.inserted_id
+        label = LabelInDB(**self._doc_to_dict(label_data))
+        event_bus.publish(Event('label.created', label.owner_id, label))
+        return label
     
     async def find_by_owner(self, owner_id: ObjectId) -> List[LabelInDB]:
         """
         Find all labels for a user, sorted alphabetically
         
+        Sorts under the (owner_id, name) index's case-insensitive
+        collation, so the index serves both the filter and the order.
+        
         Args:
             owner_id: User's ObjectId
             
         Returns:
             List of LabelInDB (alphabetically sorted)
         """
-        cursor = self.collection.find({'owner_id': owner_id}).sort('name', 1)
+        cursor = self.collection.find({'owner_id': owner_id}, collation=CASE_INSENSITIVE).sort('name', 1)
         labels = await cursor.to_list(length=None)
         return [LabelInDB(**self._doc_to_dict(label)) for label in labels]
     
@@ -103,12 +111,18 @@ class LabelRepository:
                 {'$set': {'name': name}},
                 return_document=True
             )
-            return LabelInDB(**self._doc_to_dict(result)) if result else None
         except DuplicateKeyError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Label '{name}' already exists"
             )
+        
+        if not result:
+            return None
+        
+        label = LabelInDB(**self._doc_to_dict(result))
+        event_bus.publish(Event('label.updated', label.owner_id, label))
+        return label
     
     async def delete_label(self, label_id: ObjectId, owner_id: ObjectId) -> bool:
         """
@@ -131,7 +145,11 @@ class LabelRepository:
         
         # Delete the label
         result = await self.collection.delete_one({'_id': label_id, 'owner_id': owner_id})
-        return result.deleted_count > 0
+        if result.deleted_count == 0:
+            return False
+        
+        event_bus.publish(Event('label.deleted', str(owner_id), {'id': str(label_id)}))
+        return True
     
     async def remove_label_from_tasks(self, label_id: ObjectId, owner_id: ObjectId):
         """
@@ -152,15 +170,12 @@ class LabelRepository:
                 '$pull': {'label_ids': label_id_str}
             }
         )
+        
+        event_bus.publish(Event('tasks.label_removed', str(owner_id), {'label_id': label_id_str}))
     
     async def ensure_indexes(self):
-        """Create required indexes for labels collection"""
-        # Compound unique index: (owner_id, name)
-        # Prevents duplicate label names per user
-        await self.collection.create_index(
-            [("owner_id", 1), ("name", 1)],
-            unique=True
-        )
+        """Create missing indexes for labels collection (see core.indexes)"""
+        await sync_collection_indexes(self.collection, INDEXES['labels'])
     
     def _doc_to_dict(self, doc: dict) -> dict:
         """
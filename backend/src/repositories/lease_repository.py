@@ -0,0 +1,57 @@
+"""
+Lease repository
+Mongo-backed leases for electing a single leader among workers
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+
+
+class LeaseRepository:
+    """Repository for named, expiring leases"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.leases
+    
+    async def acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """
+        Acquire or renew a lease
+        
+        The lease is granted if nobody holds it, the current lease has
+        expired, or the caller already holds it (renewal). The _id unique
+        index makes concurrent acquisition safe: a losing upsert raises
+        DuplicateKeyError.
+        
+        Args:
+            name: Lease name (one leader per name)
+            holder: Unique identifier of the calling worker
+            ttl_seconds: Lease duration from now
+            
+        Returns:
+            True if the caller holds the lease, False otherwise
+        """
+        now = datetime.utcnow()
+        try:
+            lease = await self.collection.find_one_and_update(
+                {
+                    '_id': name,
+                    '$or': [{'holder': holder}, {'expires_at': {'$lte': now}}]
+                },
+                {'$set': {'holder': holder, 'expires_at': now + timedelta(seconds=ttl_seconds)}},
+                upsert=True,
+                return_document=True
+            )
+        except DuplicateKeyError:
+            # Another worker holds a live lease
+            return False
+        return lease is not None and lease['holder'] == holder
+    
+    async def release(self, name: str, holder: str) -> None:
+        """
+        Release a lease if the caller holds it
+        
+        Args:
+            name: Lease name
+            holder: Identifier of the calling worker
+        """
+        await self.collection.delete_one({'_id': name, 'holder': holder})
@@ -4,10 +4,26 @@ Database operations for task entities
 """
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from datetime import datetime, date
+from pymongo.errors import DuplicateKeyError
 
-from ..models.task import TaskInDB
+from ..models.task import TaskInDB, TaskSortField, SortOrder, PRIORITY_RANK, CalendarDay
+from ..core.events import Event, event_bus
+from ..core.indexes import INDEXES, sync_collection_indexes
+from ..core.recurrence import next_occurrence
+
+
+# Sort specification per sort field. Every spec is backed by a compound
+# index prefixed with owner_id (see core.indexes), so MongoDB walks the
+# index in order instead of running a blocking in-memory SORT stage.
+# Fields with frequent ties get _id as a stable tie-breaker.
+SORT_FIELDS = {
+    'deadline': ['deadline', '_id'],
+    'priority': ['priority_rank', '_id'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at'],
+}
 
 
 class TaskRepository:
@@ -26,34 +42,210 @@ class TaskRepository:
         Returns:
             TaskInDB: Created task with id and timestamps
         """
-        # Convert date to datetime for MongoDB storage
-        if 'deadline' in task_data and hasattr(task_data['deadline'], 'isoformat'):
-            task_data['deadline'] = datetime.combine(task_data['deadline'], datetime.min.time())
+        # Convert dates to datetimes for MongoDB storage
+        self._dates_to_storage(task_data)
         
         task_data['created_at'] = datetime.utcnow()
         task_data['updated_at'] = datetime.utcnow()
         task_data['status'] = task_data.get('status', 'open')
         task_data['label_ids'] = task_data.get('label_ids', [])
+        if 'priority' in task_data:
+            task_data['priority_rank'] = PRIORITY_RANK[task_data['priority']]
+        # Recurring series are reminded once per occurrence, starting with the first
+        if task_data.get('recurrence'):
+            task_data['reminder_occurrence'] = task_data['deadline']
         
         result = await self.collection.insert_one(task_data)
         task_data['_id'] = result.inserted_id
         
-        return TaskInDB(**self._doc_to_dict(task_data))
+        task = TaskInDB(**self._doc_to_dict(task_data))
+        event_bus.publish(Event('task.created', task.owner_id, task))
+        return task
     
-    async def find_by_owner(self, owner_id: ObjectId) -> List[TaskInDB]:
+    async def find_by_owner(
+        self,
+        owner_id: ObjectId,
+        sort: TaskSortField = 'created_at',
+        order: SortOrder = 'desc'
+    ) -> List[TaskInDB]:
         """
-        Find all tasks belonging to a user, sorted by created_at descending
+        Find all tasks belonging to a user in the requested order
         
         Args:
             owner_id: User's ObjectId
+            sort: Field to sort by (default: created_at)
+            order: Sort direction, asc or desc (default: desc)
             
         Returns:
-            List of TaskInDB (newest first)
+            List of TaskInDB (newest first by default)
         """
-        cursor = self.collection.find({'owner_id': owner_id}).sort('created_at', -1)
+        direction = 1 if order == 'asc' else -1
+        sort_spec = [(field, direction) for field in SORT_FIELDS[sort]]
+        
+        # The sort is index-backed; allow_disk_use is only a safety net so a
+        # missing index can never fail a large page on the 100MB sort limit
+        cursor = self.collection.find(
+            {'owner_id': owner_id},
+            sort=sort_spec,
+            allow_disk_use=True
+        )
         tasks = await cursor.to_list(length=None)
         return [TaskInDB(**self._doc_to_dict(task)) for task in tasks]
     
+    async def find_by_deadline_range(
+        self,
+        owner_id: ObjectId,
+        start: date,
+        end: date
+    ) -> List[CalendarDay]:
+        """
+        Find a user's tasks due within a date range, grouped by deadline day
+        
+        Runs as a single aggregation served by the (owner_id, deadline, _id)
+        index; days without tasks are omitted. Recurring series are not
+        included (they are expanded by the service), but their materialized
+        occurrences are.
+        
+        Args:
+            owner_id: User's ObjectId
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+            
+        Returns:
+            List of CalendarDay in ascending day order
+        """
+        pipeline: List[Dict[str, Any]] = [
+            {'$match': {
+                'owner_id': owner_id,
+                'deadline': {
+                    '$gte': datetime.combine(start, datetime.min.time()),
+                    '$lte': datetime.combine(end, datetime.min.time())
+                },
+                'recurrence': None
+            }},
+            {'$sort': {'deadline': 1, '_id': 1}},
+            {'$group': {'_id': '$deadline', 'tasks': {'$push': '$$ROOT'}}},
+            {'$sort': {'_id': 1}}
+        ]
+        cursor = self.collection.aggregate(pipeline)
+        groups = await cursor.to_list(length=None)
+        return [
+            CalendarDay(
+                day=group['_id'].date(),
+                tasks=[TaskInDB(**self._doc_to_dict(task)) for task in group['tasks']]
+            )
+            for group in groups
+        ]
+    
+    async def find_recurring_by_owner(self, owner_id: ObjectId, until: date) -> List[TaskInDB]:
+        """
+        Find a user's recurring series that start on or before a date
+        
+        Served by the partial (owner_id, deadline) index over recurring tasks.
+        
+        Args:
+            owner_id: User's ObjectId
+            until: Latest first-occurrence date to include
+            
+        Returns:
+            List of recurring TaskInDB series
+        """
+        cursor = self.collection.find({
+            'owner_id': owner_id,
+            'recurrence': {'$type': 'object'},
+            'deadline': {'$lte': datetime.combine(until, datetime.min.time())}
+        })
+        tasks = await cursor.to_list(length=None)
+        return [TaskInDB(**self._doc_to_dict(task)) for task in tasks]
+    
+    async def find_materialized_dates(
+        self,
+        owner_id: ObjectId,
+        series_ids: List[str],
+        start: date,
+        end: date
+    ) -> Set[Tuple[str, date]]:
+        """
+        Find which occurrences of some series have been materialized
+        
+        Args:
+            owner_id: User's ObjectId
+            series_ids: Series task IDs
+            start: First occurrence date (inclusive)
+            end: Last occurrence date (inclusive)
+            
+        Returns:
+            Set of (series_id, occurrence_date) pairs
+        """
+        cursor = self.collection.find(
+            {
+                'series_id': {'$in': series_ids},
+                'occurrence_date': {
+                    '$gte': datetime.combine(start, datetime.min.time()),
+                    '$lte': datetime.combine(end, datetime.min.time())
+                },
+                'owner_id': owner_id
+            },
+            projection={'_id': 0, 'series_id': 1, 'occurrence_date': 1}
+        )
+        return {
+            (doc['series_id'], doc['occurrence_date'].date())
+            async for doc in cursor
+        }
+    
+    async def materialize_occurrence(self, series: TaskInDB, occurrence: date) -> TaskInDB:
+        """
+        Store one occurrence of a recurring series as its own task
+        
+        Idempotent: the unique (series_id, occurrence_date) index means an
+        occurrence is materialized at most once, and later calls return the
+        existing task.
+        
+        Args:
+            series: Recurring series task
+            occurrence: Occurrence date to materialize
+            
+        Returns:
+            The materialized TaskInDB (no recurrence, deadline = occurrence)
+        """
+        now = datetime.utcnow()
+        occurrence_dt = datetime.combine(occurrence, datetime.min.time())
+        owner_id = ObjectId(series.owner_id)
+        task_data = {
+            'title': series.title,
+            'description': series.description,
+            'priority': series.priority,
+            'priority_rank': PRIORITY_RANK[series.priority],
+            'deadline': occurrence_dt,
+            'status': 'open',
+            'label_ids': list(series.label_ids),
+            'recurrence': None,
+            'series_id': series.id,
+            'occurrence_date': occurrence_dt,
+            'owner_id': owner_id,
+            'created_at': now,
+            'updated_at': now
+        }
+        
+        try:
+            result = await self.collection.insert_one(task_data)
+        except DuplicateKeyError:
+            # Already materialized (possibly by a concurrent request)
+            existing = await self.collection.find_one({
+                'series_id': series.id,
+                'occurrence_date': occurrence_dt,
+                'owner_id': owner_id
+            })
+            if existing is None:
+                # Deleted again in between; nothing to return
+                raise
+            return TaskInDB(**self._doc_to_dict(existing))
+        
+        task_data['_id'] = result.inserted_id
+        task = TaskInDB(**self._doc_to_dict(task_data))
+        event_bus.publish(Event('task.created', task.owner_id, task))
+        return task
+    
     async def find_by_id(self, task_id: ObjectId, owner_id: ObjectId) -> Optional[TaskInDB]:
         """
         Find a task by ID, ensuring it belongs to the owner
@@ -89,23 +281,47 @@ class TaskRepository:
         Returns:
             Updated TaskInDB if found and owned by user, None otherwise
         """
-        # Convert date to datetime for MongoDB storage
-        if 'deadline' in update_data and hasattr(update_data['deadline'], 'isoformat'):
-            update_data['deadline'] = datetime.combine(update_data['deadline'], datetime.min.time())
+        # Convert dates to datetimes for MongoDB storage
+        self._dates_to_storage(update_data)
+        
+        # Keep the numeric rank in sync with the priority literal
+        if 'priority' in update_data:
+            update_data['priority_rank'] = PRIORITY_RANK[update_data['priority']]
         
         update_data['updated_at'] = datetime.utcnow()
         
+        update = {'$set': update_data}
+        # A moved deadline needs a fresh reminder
+        if 'deadline' in update_data:
+            update['$unset'] = {'reminder_sent_at': ''}
+        
         result = await self.collection.find_one_and_update(
             {'_id': task_id, 'owner_id': owner_id},
-            {'$set': update_data},
+            update,
             return_document=True
         )
         
-        return TaskInDB(**self._doc_to_dict(result)) if result else None
+        if not result:
+            return None
+        
+        # A changed schedule restarts a series' reminders from its first
+        # occurrence; the scheduler skips ahead past the ones already gone
+        if 'deadline' in update_data or 'recurrence' in update_data:
+            if result.get('recurrence'):
+                await self.collection.update_one(
+                    {'_id': task_id}, {'$set': {'reminder_occurrence': result['deadline']}}
+                )
+            elif 'reminder_occurrence' in result:
+                await self.collection.update_one({'_id': task_id}, {'$unset': {'reminder_occurrence': ''}})
+        
+        task = TaskInDB(**self._doc_to_dict(result))
+        event_bus.publish(Event('task.updated', task.owner_id, task))
+        return task
     
     async def delete_task(self, task_id: ObjectId, owner_id: ObjectId) -> bool:
         """
-        Delete a task
+        Delete a task, and the occurrences materialized from it if it is a
+        recurring series
         
         CRITICAL: Always includes owner_id in query for security
         
@@ -117,15 +333,221 @@ class TaskRepository:
             True if task was deleted, False if not found or not owned by user
         """
         result = await self.collection.delete_one({'_id': task_id, 'owner_id': owner_id})
-        return result.deleted_count > 0
+        if result.deleted_count == 0:
+            return False
+        
+        occurrence_ids = [
+            doc['_id'] async for doc in self.collection.find(
+                {'series_id': str(task_id), 'owner_id': owner_id}, projection={'_id': 1}
+            )
+        ]
+        if occurrence_ids:
+            await self.collection.delete_many({'_id': {'$in': occurrence_ids}, 'owner_id': owner_id})
+        
+        for deleted_id in [task_id, *occurrence_ids]:
+            event_bus.publish(Event('task.deleted', str(owner_id), {'id': str(deleted_id)}))
+        return True
+    
+    async def find_reminder_candidates(
+        self,
+        deadline_from: datetime,
+        deadline_to: datetime
+    ) -> AsyncIterator[Tuple[str, datetime]]:
+        """
+        Stream open, not-yet-reminded tasks with a deadline in a time window
+        
+        Served by the (status, deadline) index; only ids and deadlines are
+        fetched so large windows stay cheap. Recurring series are left out
+        (see find_series_reminder_candidates).
+        
+        Args:
+            deadline_from: Window start (inclusive)
+            deadline_to: Window end (exclusive)
+            
+        Yields:
+            (task_id, deadline) tuples
+        """
+        cursor = self.collection.find(
+            {
+                'status': 'open',
+                'deadline': {'$gte': deadline_from, '$lt': deadline_to},
+                'reminder_sent_at': {'$exists': False},
+                'recurrence': None
+            },
+            projection={'_id': 1, 'deadline': 1}
+        )
+        async for doc in cursor:
+            yield str(doc['_id']), doc['deadline']
+    
+    async def find_series_reminder_candidates(
+        self,
+        occurrence_from: Optional[datetime],
+        occurrence_to: datetime
+    ) -> AsyncIterator[Tuple[str, datetime]]:
+        """
+        Stream open recurring series whose next reminder is for an
+        occurrence in a time window
+        
+        Served by the sparse reminder_occurrence index, which only holds
+        series.
+        
+        Args:
+            occurrence_from: Window start (inclusive), or None for no lower
+                bound (to catch series left behind while no scheduler ran)
+            occurrence_to: Window end (exclusive)
+            
+        Yields:
+            (series_id, occurrence) tuples
+        """
+        occurrence_range = {'$lt': occurrence_to}
+        if occurrence_from is not None:
+            occurrence_range['$gte'] = occurrence_from
+        cursor = self.collection.find(
+            {'reminder_occurrence': occurrence_range, 'status': 'open'},
+            projection={'_id': 1, 'reminder_occurrence': 1}
+        )
+        async for doc in cursor:
+            yield str(doc['_id']), doc['reminder_occurrence']
+    
+    async def find_series_for_reminder(self, series_id: ObjectId, occurrence: date) -> Optional[TaskInDB]:
+        """
+        Find an open recurring series whose next reminder is for an occurrence
+        
+        Args:
+            series_id: Series task's ObjectId
+            occurrence: Occurrence date
+            
+        Returns:
+            The series TaskInDB, or None if it was deleted, completed or has
+            moved on to another occurrence
+        """
+        doc = await self.collection.find_one({
+            '_id': series_id,
+            'status': 'open',
+            'recurrence': {'$type': 'object'},
+            'reminder_occurrence': datetime.combine(occurrence, datetime.min.time())
+        })
+        return TaskInDB(**self._doc_to_dict(doc)) if doc else None
+    
+    async def advance_series_reminder(
+        self,
+        series: TaskInDB,
+        occurrence: date,
+        day: date
+    ) -> Optional[date]:
+        """
+        Move a series' next reminder from an occurrence to the first
+        occurrence on or after a day
+        
+        Only succeeds while the series is still at that occurrence, so a
+        concurrent schedule change or a second scheduler is never undone.
+        
+        Args:
+            series: Recurring series task
+            occurrence: Occurrence the series' next reminder is for
+            day: Earliest date for the new occurrence
+            
+        Returns:
+            The new occurrence, or None if the series has ended or moved
+        """
+        following = next_occurrence(series.recurrence, series.deadline, day) if series.recurrence else None
+        update: dict
+        if following is None:
+            update = {'$unset': {'reminder_occurrence': ''}}
+        else:
+            update = {'$set': {'reminder_occurrence': datetime.combine(following, datetime.min.time())}}
+        result = await self.collection.update_one(
+            {
+                '_id': ObjectId(series.id),
+                'reminder_occurrence': datetime.combine(occurrence, datetime.min.time())
+            },
+            update
+        )
+        return following if result.modified_count else None
+    
+    async def claim_reminder(
+        self,
+        task_id: ObjectId,
+        deadline_before: datetime,
+        now: datetime
+    ) -> Optional[TaskInDB]:
+        """
+        Atomically mark a task's reminder as sent
+        
+        Only succeeds if the task is still open, not yet reminded and due
+        before deadline_before, so a stale in-memory schedule or a second
+        scheduler can never send the same reminder twice. Recurring series
+        are never claimed themselves; their occurrences are.
+        
+        Args:
+            task_id: Task's ObjectId
+            deadline_before: Latest deadline that is due for a reminder
+            now: Time to record as reminder_sent_at
+            
+        Returns:
+            The claimed TaskInDB, or None if it no longer needs a reminder
+        """
+        result = await self.collection.find_one_and_update(
+            {
+                '_id': task_id,
+                'status': 'open',
+                'deadline': {'$lte': deadline_before},
+                'reminder_sent_at': {'$exists': False},
+                'recurrence': None
+            },
+            {'$set': {'reminder_sent_at': now}},
+            return_document=True
+        )
+        return TaskInDB(**self._doc_to_dict(result)) if result else None
     
     async def ensure_indexes(self):
-        """Create required indexes for tasks collection"""
-        # Index for filtering by owner
-        await self.collection.create_index("owner_id")
+        """Create missing indexes for tasks collection (see core.indexes)"""
+        await sync_collection_indexes(self.collection, INDEXES['tasks'])
+    
+    async def backfill_priority_rank(self) -> int:
+        """
+        Set priority_rank on tasks created before it was stored
         
-        # Compound index for sorted queries by owner
-        await self.collection.create_index([("owner_id", 1), ("created_at", -1)])
+        Returns:
+            Number of tasks updated
+        """
+        updated = 0
+        for priority, rank in PRIORITY_RANK.items():
+            result = await self.collection.update_many(
+                {'priority': priority, 'priority_rank': {'$exists': False}},
+                {'$set': {'priority_rank': rank}}
+            )
+            updated += result.modified_count
+        return updated
+    
+    async def backfill_series_reminders(self) -> int:
+        """
+        Point recurring series created before per-occurrence reminders at
+        their first occurrence (the scheduler skips ahead from there)
+        
+        Returns:
+            Number of series updated
+        """
+        updated = 0
+        cursor = self.collection.find(
+            {'recurrence': {'$type': 'object'}, 'reminder_occurrence': {'$exists': False}},
+            projection={'_id': 1, 'deadline': 1}
+        )
+        async for doc in cursor:
+            result = await self.collection.update_one(
+                {'_id': doc['_id'], 'reminder_occurrence': {'$exists': False}},
+                {'$set': {'reminder_occurrence': doc['deadline']}}
+            )
+            updated += result.modified_count
+        return updated
+    
+    def _dates_to_storage(self, data: dict) -> None:
+        """Convert date fields to datetimes in place (BSON has no date type)"""
+        if 'deadline' in data and hasattr(data['deadline'], 'isoformat'):
+            data['deadline'] = datetime.combine(data['deadline'], datetime.min.time())
+        recurrence = data.get('recurrence')
+        if recurrence and isinstance(recurrence.get('until'), date):
+            recurrence['until'] = datetime.combine(recurrence['until'], datetime.min.time())
     
     def _doc_to_dict(self, doc: dict) -> dict:
         """
@@ -146,7 +568,12 @@ class TaskRepository:
         if 'label_ids' in doc and doc['label_ids']:
             doc['label_ids'] = [str(lid) if isinstance(lid, ObjectId) else lid 
                                for lid in doc['label_ids']]
-        # Convert datetime back to date for deadline
+        # Convert datetimes back to dates
         if 'deadline' in doc and isinstance(doc['deadline'], datetime):
             doc['deadline'] = doc['deadline'].date()
+        if isinstance(doc.get('occurrence_date'), datetime):
+            doc['occurrence_date'] = doc['occurrence_date'].date()
+        recurrence = doc.get('recurrence')
+        if recurrence and isinstance(recurrence.get('until'), datetime):
+            recurrence['until'] = recurrence['until'].date()
         return doc
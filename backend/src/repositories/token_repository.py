@@ -0,0 +1,141 @@
+"""
+Token repositories
+Database operations for refresh tokens and access token revocations
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Storage key of a refresh token
+
+    Refresh tokens are 256-bit random strings, so a fast hash is enough;
+    the database never holds a usable token.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class RefreshTokenRepository:
+    """
+    Repository for refresh tokens
+
+    Each document is one unused or rotated token, keyed by its hash:
+    {_id, user_id, family_id, created_at, expires_at, rotated_at}. Tokens
+    issued by rotating another share its family_id. Expired documents are
+    removed by a TTL index.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.refresh_tokens
+
+    async def create(self, token: str, user_id: str, family_id: str, expires_in: int) -> None:
+        """
+        Store a newly issued refresh token
+
+        Args:
+            token: Plain refresh token (only its hash is stored)
+            user_id: Owner's ID
+            family_id: Login session the token belongs to
+            expires_in: Lifetime in seconds
+        """
+        now = datetime.utcnow()
+        await self.collection.insert_one({
+            "_id": hash_refresh_token(token),
+            "user_id": user_id,
+            "family_id": family_id,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=expires_in),
+            "rotated_at": None
+        })
+
+    async def rotate(self, token: str) -> Optional[dict]:
+        """
+        Mark an unused, unexpired refresh token as used
+
+        Atomic, so of two concurrent requests with the same token only one
+        succeeds.
+
+        Args:
+            token: Plain refresh token
+
+        Returns:
+            The token document, or None if unknown, expired or already used
+        """
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"_id": hash_refresh_token(token), "rotated_at": None, "expires_at": {"$gt": now}},
+            {"$set": {"rotated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def find(self, token: str) -> Optional[dict]:
+        """Token document by plain token, whatever its state"""
+        return await self.collection.find_one({"_id": hash_refresh_token(token)})
+
+    async def delete_family(self, family_id: str) -> int:
+        """
+        Delete every token of a login session
+
+        Returns:
+            Number of tokens deleted
+        """
+        result = await self.collection.delete_many({"family_id": family_id})
+        return result.deleted_count
+
+    async def delete_for_user(self, user_id: str) -> int:
+        """
+        Delete every refresh token of a user (e.g. after a password change)
+
+        Returns:
+            Number of tokens deleted
+        """
+        result = await self.collection.delete_many({"user_id": user_id})
+        return result.deleted_count
+
+
+class TokenRevocationRepository:
+    """
+    Repository for user-wide access token revocations
+
+    One document per user: {_id: user_id, revoked_before, expires_at}.
+    Access tokens issued before revoked_before are rejected; the
+    document expires once every such token has expired anyway.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.token_revocations
+
+    async def revoke_user(self, user_id: str, revoked_before: datetime, expires_at: datetime) -> None:
+        """
+        Revoke a user's access tokens issued before revoked_before
+
+        Args:
+            user_id: User's ID
+            revoked_before: Issue time cutoff (exclusive)
+            expires_at: When the revocation can be forgotten
+        """
+        await self.collection.update_one(
+            {"_id": user_id},
+            {"$set": {"revoked_before": revoked_before, "expires_at": expires_at}},
+            upsert=True
+        )
+
+    async def revoked_before(self, user_id: str) -> Optional[datetime]:
+        """
+        A user's revocation cutoff
+
+        Returns:
+            Cutoff, or None if the user has no unexpired revocation
+        """
+        doc = await self.collection.find_one({"_id": user_id, "expires_at": {"$gt": datetime.utcnow()}})
+        return doc["revoked_before"] if doc else None
+
+    async def revoked_user_ids(self) -> List[str]:
+        """IDs of every user with an unexpired revocation"""
+        cursor = self.collection.find({"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1})
+        return [doc["_id"] async for doc in cursor]
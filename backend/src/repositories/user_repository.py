@@ -5,9 +5,11 @@ Database operations for user entities
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pymongo.errors import BulkWriteError
 
 from ..models.user import UserInDB
+from ..core.indexes import CASE_INSENSITIVE, INDEXES, sync_collection_indexes
 
 
 class UserRepository:
@@ -45,9 +47,55 @@ class UserRepository:
             updated_at=user_data["updated_at"]
         )
     
+    async def create_users(self, users: Sequence[Tuple[str, str]]) -> Tuple[List[UserInDB], List[str]]:
+        """
+        Create many users with one unordered insert_many
+        
+        Duplicate emails (already registered or repeated in the batch) are
+        skipped by the unique index without stopping the other inserts.
+        
+        Args:
+            users: (email, bcrypt hashed password) pairs
+            
+        Returns:
+            (created users in input order, emails rejected as duplicates)
+            
+        Raises:
+            BulkWriteError: A write failed for another reason than a duplicate
+        """
+        now = datetime.utcnow()
+        docs: List[Dict[str, Any]] = [
+            {"email": email, "hashed_password": hashed_password, "created_at": now, "updated_at": now}
+            for email, hashed_password in users
+        ]
+        
+        duplicates = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if exc.details.get("writeConcernErrors") or any(error["code"] != 11000 for error in errors):
+                raise
+            duplicates = {error["index"] for error in errors}
+        
+        created = [
+            UserInDB(
+                id=str(doc["_id"]),
+                email=doc["email"],
+                hashed_password=doc["hashed_password"],
+                created_at=doc["created_at"],
+                updated_at=doc["updated_at"]
+            )
+            for position, doc in enumerate(docs) if position not in duplicates
+        ]
+        return created, [docs[position]["email"] for position in sorted(duplicates)]
+    
     async def find_by_email(self, email: str) -> Optional[UserInDB]:
         """
-        Find user by email address
+        Find user by email address, ignoring case
+        
+        Uses the case-insensitive email index (same collation), so this is
+        a single index seek.
         
         Args:
             email: User's email address
@@ -55,7 +103,7 @@ class UserRepository:
         Returns:
             UserInDB if found, None otherwise
         """
-        user = await self.collection.find_one({"email": email})
+        user = await self.collection.find_one({"email": email}, collation=CASE_INSENSITIVE)
         if not user:
             return None
         
@@ -107,7 +155,28 @@ class UserRepository:
             }
         )
     
+    async def replace_password_hash(self, user_id: str, old_hashed_password: str, new_hashed_password: str) -> bool:
+        """
+        Swap a password hash for an equivalent one (e.g. at a new bcrypt cost)
+        
+        Only applies if the stored hash is still old_hashed_password, so a
+        password change made in the meantime is never overwritten.
+        updated_at is left alone: the password itself did not change.
+        
+        Args:
+            user_id: User's ID (string format)
+            old_hashed_password: Hash the new one was derived from
+            new_hashed_password: Rehashed password
+            
+        Returns:
+            True if the hash was replaced
+        """
+        result = await self.collection.update_one(
+            {"_id": ObjectId(user_id), "hashed_password": old_hashed_password},
+            {"$set": {"hashed_password": new_hashed_password}}
+        )
+        return result.modified_count == 1
+    
     async def ensure_indexes(self):
-        """Create required indexes for users collection"""
-        # Unique index on email to prevent duplicate registrations
-        await self.collection.create_index("email", unique=True)
+        """Create missing indexes for users collection (see core.indexes)"""
+        await sync_collection_indexes(self.collection, INDEXES['users'])
@@ -2,8 +2,15 @@
 Authentication schemas
 Request and response models for auth endpoints
 """
+from typing import List, Optional
+
 from pydantic import BaseModel, EmailStr, Field
 
+from ..models.user import UserResponse
+
+# Users per POST /admin/users request (each costs one bcrypt hash)
+MAX_BATCH_USERS = 100
+
 
 class RegisterRequest(BaseModel):
     """Schema for user registration request"""
@@ -22,9 +29,27 @@ class TokenResponse(BaseModel):
     access_token: str = Field(..., description="JWT access token")
     token_type: str = Field(default="bearer", description="Token type")
     expires_in: int = Field(..., description="Token expiry time in seconds")
+    refresh_token: Optional[str] = Field(default=None, description="Single-use token for POST /auth/refresh")
+    refresh_expires_in: Optional[int] = Field(default=None, description="Refresh token expiry time in seconds")
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for new tokens"""
+    refresh_token: str = Field(..., description="Refresh token from login or a previous refresh")
 
 
 class UpdatePasswordRequest(BaseModel):
     """Schema for updating user password"""
     current_password: str = Field(..., description="Current password for verification")
     new_password: str = Field(..., min_length=8, description="New password (minimum 8 characters)")
+
+
+class BatchRegisterRequest(BaseModel):
+    """Schema for provisioning many users at once"""
+    users: List[RegisterRequest] = Field(..., min_length=1, max_length=MAX_BATCH_USERS, description="Users to create")
+
+
+class BatchRegisterResponse(BaseModel):
+    """Schema for the outcome of a batch registration"""
+    created: List[UserResponse] = Field(..., description="Users created")
+    conflicts: List[str] = Field(..., description="Emails already registered (or repeated in the batch)")
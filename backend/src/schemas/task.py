@@ -2,7 +2,9 @@
 Task API schemas
 Request and response models for task endpoints
 """
-from ..models.task import TaskCreate, TaskUpdate, TaskResponse
+from ..models.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskSortField, SortOrder, CalendarDay
+)
 
 # Re-export schemas for API use
-__all__ = ['TaskCreate', 'TaskUpdate', 'TaskResponse']
+__all__ = ['TaskCreate', 'TaskUpdate', 'TaskResponse', 'TaskSortField', 'SortOrder', 'CalendarDay']
@@ -2,21 +2,50 @@
 Authentication service
 Business logic for user registration and login
 """
-from fastapi import HTTPException, status
+import asyncio
+import logging
+import math
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pymongo.errors import DuplicateKeyError
 
 from ..repositories.user_repository import UserRepository
+from ..repositories.token_repository import RefreshTokenRepository, TokenRevocationRepository
 from ..models.user import UserResponse
-from ..schemas.auth import TokenResponse
-from ..core.security import hash_password, verify_password, create_access_token
+from ..schemas.auth import BatchRegisterResponse, RegisterRequest, TokenResponse
+from ..core.security import (
+    hash_password, verify_password, create_access_token, create_refresh_token, password_needs_rehash
+)
 from ..core.config import settings
+from ..core.login_throttle import login_throttle
+from ..core.token_revocation import token_revocations
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
     """Service for authentication operations"""
     
-    def __init__(self, user_repository: UserRepository):
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        refresh_token_repository: Optional[RefreshTokenRepository] = None,
+        revocation_repository: Optional[TokenRevocationRepository] = None
+    ):
+        """
+        Args:
+            user_repository: Users
+            refresh_token_repository: Refresh tokens (none are issued if None)
+            revocation_repository: Access token revocations (password
+                changes revoke nothing if None)
+        """
         self.user_repo = user_repository
+        self.refresh_repo = refresh_token_repository
+        self.revocation_repo = revocation_repository
     
     async def register_user(self, email: str, password: str) -> UserResponse:
         """
@@ -30,24 +59,15 @@ class AuthService:
             UserResponse with user data (excludes password)
             
         Raises:
-            HTTPException 409: Email already registered
+            HTTPException 409: Email already registered (ignoring case)
         """
-        # Check if email already exists
-        existing_user = await self.user_repo.find_by_email(email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Email already registered"
-            )
-        
-        # Hash password
-        hashed_password = hash_password(password)
+        # Hash off the event loop, then a single insert: the unique email
+        # index rejects duplicates, so no existence pre-check round trip
+        hashed_password = await run_in_threadpool(hash_password, password)
         
-        # Create user
         try:
             user = await self.user_repo.create_user(email, hashed_password)
         except DuplicateKeyError:
-            # Race condition: email was registered between check and insert
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email already registered"
@@ -61,48 +81,171 @@ class AuthService:
             updated_at=user.updated_at
         )
     
-    async def login(self, email: str, password: str) -> TokenResponse:
+    async def register_users(self, users: List[RegisterRequest]) -> BatchRegisterResponse:
+        """
+        Register many users at once (admin provisioning)
+        
+        Passwords are hashed in parallel in the threadpool, then all users
+        are written with one unordered insert_many. Emails that are
+        already registered, or repeated within the batch, are reported as
+        conflicts; the rest are created.
+        
+        Args:
+            users: Emails and plain text passwords
+            
+        Returns:
+            BatchRegisterResponse with created users and conflicting emails
+        """
+        hashed_passwords = await asyncio.gather(
+            *(run_in_threadpool(hash_password, user.password) for user in users)
+        )
+        created, conflicts = await self.user_repo.create_users(
+            [(user.email, hashed) for user, hashed in zip(users, hashed_passwords)]
+        )
+        return BatchRegisterResponse(
+            created=[
+                UserResponse(id=user.id, email=user.email, created_at=user.created_at, updated_at=user.updated_at)
+                for user in created
+            ],
+            conflicts=conflicts
+        )
+    
+    async def login(
+        self,
+        email: str,
+        password: str,
+        client_ip: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> TokenResponse:
         """
         Authenticate user and generate JWT token
         
+        A password hash at a different bcrypt cost than the current one is
+        rehashed in a background task after the response is sent.
+        
         Args:
             email: User's email address
             password: Plain text password
+            client_ip: Client IP address, for per-IP failure throttling
+            background_tasks: Where to schedule the hash upgrade (skipped if None)
             
         Returns:
             TokenResponse with JWT access token
             
         Raises:
             HTTPException 401: Invalid credentials (email or password)
+            HTTPException 429: Too many failed attempts for the email or IP
         """
-        # Find user by email
+        throttled = settings.LOGIN_THROTTLE_ENABLED
+        if throttled:
+            # Refuse locked-out attempts before any database or bcrypt work
+            retry_after = login_throttle.retry_after(email, client_ip)
+            if retry_after > 0:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many failed login attempts",
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+        
+        # Find user by email and verify password
         user = await self.user_repo.find_by_email(email)
-        if not user:
+        if not user or not verify_password(password, user.hashed_password):
+            if throttled:
+                login_throttle.record_failure(email, client_ip)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
         
-        # Verify password
-        if not verify_password(password, user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid credentials"
-            )
+        if throttled:
+            login_throttle.record_success(email)
         
-        # Generate JWT token
-        access_token = create_access_token(user.id)
+        if background_tasks is not None and password_needs_rehash(user.hashed_password):
+            background_tasks.add_task(self.upgrade_password_hash, user.id, password, user.hashed_password)
         
-        return TokenResponse(
-            access_token=access_token,
+        return await self._issue_tokens(user.id)
+    
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        """
+        Exchange a refresh token for a new access token and refresh token
+        
+        Refresh tokens are single-use. Presenting one that was already
+        rotated means it leaked (or a client replayed it), so every token
+        of its login session is revoked.
+        
+        Args:
+            refresh_token: Token from login or a previous refresh
+            
+        Returns:
+            TokenResponse with new access and refresh tokens
+            
+        Raises:
+            HTTPException 401: Unknown, expired, reused or revoked refresh token
+        """
+        from bson import ObjectId
+        
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+        if self.refresh_repo is None:
+            raise invalid
+        
+        token_doc = await self.refresh_repo.rotate(refresh_token)
+        if token_doc is None:
+            reused = await self.refresh_repo.find(refresh_token)
+            if reused is not None and reused["rotated_at"] is not None:
+                logger.warning("Refresh token reused, revoking session of user %s", reused["user_id"])
+                await self.refresh_repo.delete_family(reused["family_id"])
+            raise invalid
+        
+        if await self.user_repo.find_by_id(ObjectId(token_doc["user_id"])) is None:
+            raise invalid
+        
+        return await self._issue_tokens(token_doc["user_id"], token_doc["family_id"])
+    
+    async def _issue_tokens(self, user_id: str, family_id: Optional[str] = None) -> TokenResponse:
+        """Access token plus, if refresh tokens are stored, a refresh token"""
+        response = TokenResponse(
+            access_token=create_access_token(user_id),
             token_type="bearer",
             expires_in=settings.JWT_EXPIRES_IN
         )
+        if self.refresh_repo is not None:
+            refresh_token = create_refresh_token()
+            await self.refresh_repo.create(
+                refresh_token, user_id, family_id or uuid.uuid4().hex, settings.REFRESH_TOKEN_EXPIRES_IN
+            )
+            response.refresh_token = refresh_token
+            response.refresh_expires_in = settings.REFRESH_TOKEN_EXPIRES_IN
+        return response
+    
+    async def upgrade_password_hash(self, user_id: str, password: str, old_hashed_password: str) -> None:
+        """
+        Rehash a verified password at the current bcrypt cost
+        
+        Hashing runs in the threadpool so it does not block the event loop.
+        Failures are logged and otherwise ignored; the next login retries.
+        
+        Args:
+            user_id: User's ID
+            password: Plain text password, already verified
+            old_hashed_password: Stored hash it was verified against
+        """
+        try:
+            new_hashed_password = await run_in_threadpool(hash_password, password)
+            await self.user_repo.replace_password_hash(user_id, old_hashed_password, new_hashed_password)
+        except Exception:
+            logger.exception("Failed to upgrade password hash for user %s", user_id)
     
     async def update_password(self, user_id: str, current_password: str, new_password: str) -> None:
         """
         Update user password after verifying current password
         
+        Every refresh token of the user is deleted and every access token
+        issued before the current second is revoked, signing out all
+        sessions.
+        
         Args:
             user_id: User's ID
             current_password: Current password for verification
@@ -131,4 +274,16 @@ class AuthService:
         
         # Hash new password and update
         new_hashed_password = hash_password(new_password)
-        await self.user_repo.update_password(user_id, new_hashed_password)
\ No newline at end of file
+        await self.user_repo.update_password(user_id, new_hashed_password)
+        
+        # Sign out existing sessions
+        if self.refresh_repo is not None:
+            await self.refresh_repo.delete_for_user(user_id)
+        if self.revocation_repo is not None:
+            # iat has second precision: tokens issued in an earlier second are
+            # revoked, so logging in again right away still works
+            now = datetime.utcnow().replace(microsecond=0)
+            await self.revocation_repo.revoke_user(
+                user_id, now, now + timedelta(seconds=settings.JWT_EXPIRES_IN + 60)
+            )
+            token_revocations.add(user_id)
\ No newline at end of file
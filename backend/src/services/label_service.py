@@ -4,9 +4,15 @@ Business logic for label management
 """
 from bson import ObjectId
 from typing import List, Optional
+from pydantic import TypeAdapter
 
 from ..repositories.label_repository import LabelRepository
 from ..models.label import LabelCreate, LabelUpdate, LabelResponse
+from ..core.single_flight import SingleFlight
+
+# Concurrent label list reads for an owner share one query and body
+label_list_flight = SingleFlight('labels', invalidate_on=('label.',))
+_label_list_json = TypeAdapter(List[LabelResponse])
 
 
 class LabelService:
@@ -25,6 +31,14 @@ class LabelService:
         labels = await self.label_repo.find_by_owner(ObjectId(owner_id))
         return [LabelResponse(**label.model_dump()) for label in labels]
     
+    async def get_labels_json(self, owner_id: str) -> bytes:
+        """Get all labels for a user as a JSON array, coalescing concurrent calls"""
+        async def load() -> bytes:
+            labels = await self.label_repo.find_by_owner(ObjectId(owner_id))
+            return _label_list_json.dump_json(labels)
+        
+        return await label_list_flight.do(owner_id, 'all', load)
+    
     async def update_label(
         self,
         label_id: str,
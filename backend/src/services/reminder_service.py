@@ -0,0 +1,303 @@
+"""
+Reminder service
+Background scheduler that emits reminders for approaching task deadlines
+"""
+import asyncio
+import heapq
+import logging
+import os
+import socket
+import uuid
+from bson import ObjectId
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..core.config import settings
+from ..core.events import Event, event_bus
+from ..models.reminder import Reminder
+from ..models.task import TaskInDB
+from ..repositories.lease_repository import LeaseRepository
+from ..repositories.task_repository import TaskRepository
+from .reminder_sinks import ReminderSink
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """
+    Emits a reminder once per open task, `lead` before its deadline
+
+    Only the worker holding the "reminder-scheduler" lease does any work, so
+    running several uvicorn workers is safe. The leader keeps a min-heap of
+    reminders due within the next `window`, filled by (status, deadline)
+    index range scans as the window slides forward and kept current by task
+    write events from this worker. A periodic rescan of the (bounded)
+    window picks up writes made on other workers. Memory and scan cost
+    depend on how many reminders fall inside the window, never on the total
+    number of open tasks.
+
+    Each reminder is claimed atomically in Mongo before it is emitted, so a
+    stale heap entry or a leadership hand-over cannot send it twice.
+
+    A recurring series is reminded once per occurrence: the series records
+    which occurrence is next (reminder_occurrence). When that reminder is
+    due the occurrence is materialized and claimed like any other task,
+    then the series moves on to its following occurrence.
+    """
+
+    LEASE_NAME = 'reminder-scheduler'
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        sink: ReminderSink,
+        lead_seconds: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+        scan_interval_seconds: Optional[int] = None,
+        rescan_interval_seconds: Optional[int] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.task_repo = TaskRepository(db)
+        self.lease_repo = LeaseRepository(db)
+        self.sink = sink
+        self.lead = timedelta(seconds=lead_seconds or settings.REMINDER_LEAD_SECONDS)
+        self.window = timedelta(seconds=window_seconds or settings.REMINDER_WINDOW_SECONDS)
+        self.scan_interval = scan_interval_seconds or settings.REMINDER_SCAN_INTERVAL_SECONDS
+        self.rescan_interval = timedelta(
+            seconds=rescan_interval_seconds or settings.REMINDER_RESCAN_INTERVAL_SECONDS
+        )
+        self.lease_seconds = lease_seconds or settings.REMINDER_LEASE_SECONDS
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.is_leader = False
+        self._lease_renew_at: Optional[datetime] = None
+        self._heap: List[Tuple[datetime, str]] = []
+        # Current remind_at per task; heap entries that disagree are stale
+        self._scheduled: Dict[str, datetime] = {}
+        # Occurrence each scheduled recurring series is due to be reminded of
+        self._occurrences: Dict[str, date] = {}
+        # Reminders due before the horizon are all in the heap
+        self._horizon: Optional[datetime] = None
+        self._last_full_scan: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Subscribe to task events and start the scheduling loop"""
+        event_bus.subscribe(self._on_event)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop, release the lease and close the sink"""
+        event_bus.unsubscribe(self._on_event)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self.lease_repo.release(self.LEASE_NAME, self.holder)
+            self.is_leader = False
+        await self.sink.close()
+
+    async def tick(self, now: datetime) -> float:
+        """
+        Run one scheduling step
+
+        Renews (or tries to take) the lease, extends the heap to cover the
+        window ending at now + window, and emits every reminder that is due.
+
+        Args:
+            now: Current UTC time
+
+        Returns:
+            Seconds until the next step is needed
+        """
+        renew_interval = timedelta(seconds=self.lease_seconds / 3)
+        if self._lease_renew_at is None or now >= self._lease_renew_at:
+            leader = await self.lease_repo.acquire(self.LEASE_NAME, self.holder, self.lease_seconds)
+            self._lease_renew_at = now + renew_interval
+            if leader != self.is_leader:
+                logger.info(
+                    "Reminder scheduler %s leadership: %s",
+                    "acquired" if leader else "lost", self.holder
+                )
+                self._reset()
+                self.is_leader = leader
+
+        if not self.is_leader:
+            return renew_interval.total_seconds()
+
+        horizon = now + self.window
+        if (
+            self._horizon is None
+            or self._last_full_scan is None
+            or now - self._last_full_scan >= self.rescan_interval
+        ):
+            # Startup, leadership change or periodic refresh: rescan the whole
+            # window, reaching back one window to catch reminders missed
+            # while no leader was running
+            self._horizon = horizon
+            self._last_full_scan = now
+            await self._scan(now - self.window, horizon, catch_up=True)
+        elif horizon > self._horizon:
+            # Only the slice that just entered the window
+            start, self._horizon = self._horizon, horizon
+            await self._scan(start, horizon)
+
+        await self._fire_due(now)
+
+        delay = min(self.scan_interval, renew_interval.total_seconds())
+        if self._heap:
+            delay = min(delay, (self._heap[0][0] - now).total_seconds())
+        return max(delay, 0.0)
+
+    async def _run(self) -> None:
+        """Scheduling loop; sleeps until the next reminder or scan is due"""
+        while True:
+            try:
+                delay = await self.tick(datetime.utcnow())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder scheduler step failed")
+                delay = self.scan_interval
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.05))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _scan(self, start: datetime, end: datetime, catch_up: bool = False) -> None:
+        """
+        Load reminders due in [start, end) into the heap
+
+        With catch_up, series whose next reminder is due before start are
+        loaded too, so one left behind while no leader ran moves on.
+        """
+        candidates = self.task_repo.find_reminder_candidates(start + self.lead, end + self.lead)
+        async for task_id, deadline in candidates:
+            self._schedule(task_id, deadline - self.lead)
+
+        series = self.task_repo.find_series_reminder_candidates(
+            None if catch_up else start + self.lead, end + self.lead
+        )
+        async for series_id, occurrence in series:
+            self._occurrences[series_id] = occurrence.date()
+            self._schedule(series_id, occurrence - self.lead)
+
+    async def _fire_due(self, now: datetime) -> None:
+        """Claim and emit every reminder due at or before now"""
+        while self._heap and self._heap[0][0] <= now:
+            remind_at, task_id = heapq.heappop(self._heap)
+            if self._scheduled.get(task_id) != remind_at:
+                continue
+            del self._scheduled[task_id]
+
+            occurrence = self._occurrences.pop(task_id, None)
+            if occurrence is not None:
+                await self._fire_occurrence(task_id, occurrence, remind_at, now)
+                continue
+
+            task = await self.task_repo.claim_reminder(ObjectId(task_id), now + self.lead, now)
+            if task is not None:
+                await self._emit(task, remind_at)
+
+    async def _fire_occurrence(self, series_id: str, occurrence: date, remind_at: datetime, now: datetime) -> None:
+        """
+        Remind of one occurrence of a series and move the series on
+
+        The occurrence is materialized and claimed before the series moves
+        on, so a crash in between never loses the reminder, and an
+        occurrence already completed or reminded is not reminded again.
+        Occurrences whose reminder is older than the scan window (missed
+        while no leader ran) are skipped.
+        """
+        series = await self.task_repo.find_series_for_reminder(ObjectId(series_id), occurrence)
+        if series is None:
+            return
+
+        earliest = (now - self.window + self.lead).date()
+        if occurrence >= earliest:
+            task = await self.task_repo.materialize_occurrence(series, occurrence)
+            claimed = await self.task_repo.claim_reminder(ObjectId(task.id), now + self.lead, now)
+            if claimed is not None:
+                await self._emit(claimed, remind_at)
+
+        following = await self.task_repo.advance_series_reminder(
+            series, occurrence, max(occurrence + timedelta(days=1), earliest)
+        )
+        if following is not None and self._horizon is not None:
+            # Already inside the scanned window, so no scan would load it
+            remind_next = datetime.combine(following, datetime.min.time()) - self.lead
+            if remind_next < self._horizon:
+                self._occurrences[series_id] = following
+                self._schedule(series_id, remind_next)
+
+    async def _emit(self, task: TaskInDB, remind_at: datetime) -> None:
+        """Send a claimed task's reminder to the sink"""
+        try:
+            await self.sink.emit(Reminder(
+                task_id=task.id,
+                owner_id=task.owner_id,
+                title=task.title,
+                deadline=task.deadline,
+                remind_at=remind_at
+            ))
+        except Exception:
+            logger.exception("Failed to emit reminder for task %s", task.id)
+
+    def _on_event(self, event: Event) -> None:
+        """Keep the heap current with task writes made on this worker"""
+        if not self.is_leader or self._horizon is None:
+            return
+
+        if event.type == 'task.deleted':
+            self._scheduled.pop(event.data['id'], None)
+            self._occurrences.pop(event.data['id'], None)
+            return
+        if event.type not in ('task.created', 'task.updated'):
+            return
+
+        task = event.data
+        if task.recurrence is not None or task.id in self._occurrences:
+            # The event does not say which occurrence a series is due to be
+            # reminded of next; rescan the window at the next step instead
+            self._scheduled.pop(task.id, None)
+            self._occurrences.pop(task.id, None)
+            self._last_full_scan = None
+            self._wakeup.set()
+            return
+        remind_at = datetime.combine(task.deadline, datetime.min.time()) - self.lead
+        if task.status == 'open' and self._horizon - 2 * self.window <= remind_at < self._horizon:
+            self._schedule(task.id, remind_at)
+        else:
+            self._scheduled.pop(task.id, None)
+
+    def _schedule(self, task_id: str, remind_at: datetime) -> None:
+        """Add or move a task's reminder (superseded heap entries go stale)"""
+        if self._scheduled.get(task_id) == remind_at:
+            return
+        self._scheduled[task_id] = remind_at
+        heapq.heappush(self._heap, (remind_at, task_id))
+
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._scheduled) + 1024:
+            self._heap = [(at, tid) for tid, at in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+        if self._heap[0] == (remind_at, task_id):
+            self._wakeup.set()
+
+    def _reset(self) -> None:
+        """Forget all in-memory state (on leadership change)"""
+        self._heap = []
+        self._scheduled = {}
+        self._occurrences = {}
+        self._horizon = None
+        self._last_full_scan = None
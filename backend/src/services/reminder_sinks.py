@@ -0,0 +1,92 @@
+"""
+Reminder sinks
+Pluggable destinations for deadline reminder events
+"""
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from ..models.reminder import Reminder
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderSink:
+    """Base class for reminder destinations"""
+
+    async def emit(self, reminder: Reminder) -> None:
+        """Deliver a single reminder"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release any resources held by the sink"""
+
+
+class LogReminderSink(ReminderSink):
+    """Writes reminders to the application log"""
+
+    async def emit(self, reminder: Reminder) -> None:
+        logger.info(
+            "Reminder: task %s (%s) for user %s is due %s",
+            reminder.task_id, reminder.title, reminder.owner_id, reminder.deadline
+        )
+
+
+class WebhookReminderSink(ReminderSink):
+    """POSTs each reminder as JSON to a webhook URL"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def emit(self, reminder: Reminder) -> None:
+        response = await self.client.post(self.url, json=reminder.model_dump(mode='json'))
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class QueueReminderSink(ReminderSink):
+    """
+    Puts reminders on a bounded asyncio queue for in-process consumers
+
+    When the queue is full the reminder is dropped (and logged) rather than
+    stalling the scheduler.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.queue: asyncio.Queue[Reminder] = asyncio.Queue(maxsize=maxsize)
+
+    async def emit(self, reminder: Reminder) -> None:
+        try:
+            self.queue.put_nowait(reminder)
+        except asyncio.QueueFull:
+            logger.warning("Reminder queue full, dropping reminder for task %s", reminder.task_id)
+
+
+def create_reminder_sink(kind: str, webhook_url: Optional[str] = None) -> ReminderSink:
+    """
+    Build a reminder sink from configuration
+
+    Args:
+        kind: "log", "webhook" or "queue"
+        webhook_url: Target URL (required for "webhook")
+
+    Returns:
+        ReminderSink instance
+
+    Raises:
+        ValueError: Unknown sink kind or missing webhook URL
+    """
+    if kind == 'log':
+        return LogReminderSink()
+    if kind == 'queue':
+        return QueueReminderSink()
+    if kind == 'webhook':
+        if not webhook_url:
+            raise ValueError("REMINDER_WEBHOOK_URL is required for the webhook reminder sink")
+        return WebhookReminderSink(webhook_url)
+    raise ValueError(f"Unknown reminder sink: {kind}")
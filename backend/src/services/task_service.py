@@ -3,10 +3,25 @@ Task service
 Business logic for task management
 """
 from bson import ObjectId
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
+from datetime import date
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 
 from ..repositories.task_repository import TaskRepository
-from ..models.task import TaskCreate, TaskUpdate, TaskResponse
+from ..models.task import (
+    TaskCreate, TaskUpdate, TaskInDB, TaskResponse, TaskSortField, SortOrder, CalendarDay
+)
+from ..core.config import settings
+from ..core.recurrence import expand_occurrences
+from ..core.response_cache import EncodedBody, task_list_cache
+from ..core.single_flight import SingleFlight
+
+# Concurrent identical list reads (several tabs, refetch-on-focus) share
+# one query and one serialized body; any task write for the owner,
+# including label removal, detaches reads already in flight
+task_list_flight = SingleFlight('tasks', invalidate_on=('task.', 'tasks.'))
+_task_list_json = TypeAdapter(List[TaskResponse])
 
 
 class TaskService:
@@ -35,19 +50,129 @@ class TaskService:
         
         return TaskResponse(**task.model_dump())
     
-    async def get_tasks_by_owner(self, owner_id: str) -> List[TaskResponse]:
+    async def get_tasks_by_owner(
+        self,
+        owner_id: str,
+        sort: TaskSortField = 'created_at',
+        order: SortOrder = 'desc'
+    ) -> List[TaskResponse]:
         """
         Get all tasks for a user
         
         Args:
             owner_id: User's ID
+            sort: Field to sort by
+            order: Sort direction (asc or desc)
             
         Returns:
-            List of TaskResponse objects (sorted newest first)
+            List of TaskResponse objects (sorted newest first by default)
         """
-        tasks = await self.task_repo.find_by_owner(ObjectId(owner_id))
+        tasks = await self.task_repo.find_by_owner(ObjectId(owner_id), sort, order)
         return [TaskResponse(**task.model_dump()) for task in tasks]
     
+    async def get_tasks_encoded(
+        self,
+        owner_id: str,
+        sort: TaskSortField = 'created_at',
+        order: SortOrder = 'desc'
+    ) -> EncodedBody:
+        """
+        Get all tasks for a user as an encoded JSON array
+        
+        Served from the response cache when enabled; otherwise concurrent
+        identical calls share one query and serialization.
+        
+        Args:
+            owner_id: User's ID
+            sort: Field to sort by
+            order: Sort direction (asc or desc)
+            
+        Returns:
+            Serialized List[TaskResponse] (gzip-compressed if cached and large)
+        """
+        key = (sort, order)
+        if not settings.RESPONSE_CACHE_ENABLED:
+            async def load() -> EncodedBody:
+                tasks = await self.task_repo.find_by_owner(ObjectId(owner_id), sort, order)
+                return EncodedBody(_task_list_json.dump_json(tasks))
+            
+            return await task_list_flight.do(owner_id, key, load)
+        
+        cached = task_list_cache.get(owner_id, key)
+        if cached is not None:
+            return cached
+        
+        async def load_and_cache() -> EncodedBody:
+            # Reserve before querying so a write during the query discards the fill
+            reservation = task_list_cache.reserve(owner_id, key)
+            try:
+                tasks = await self.task_repo.find_by_owner(ObjectId(owner_id), sort, order)
+                min_bytes = settings.RESPONSE_CACHE_COMPRESS_MIN_BYTES if settings.RESPONSE_CACHE_COMPRESS else None
+                body = EncodedBody.encode(_task_list_json.dump_json(tasks), min_bytes)
+                task_list_cache.put(reservation, body)
+                return body
+            finally:
+                task_list_cache.release(reservation)
+        
+        return await task_list_flight.do(owner_id, key, load_and_cache)
+    
+    async def get_calendar(self, owner_id: str, start: date, end: date) -> List[CalendarDay]:
+        """
+        Get a user's tasks grouped by deadline day
+        
+        Args:
+            owner_id: User's ID
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+            
+        Returns:
+            List of CalendarDay (ascending, days without tasks omitted)
+            
+        Raises:
+            HTTPException 400: Range is inverted or longer than CALENDAR_MAX_RANGE_DAYS
+        """
+        if end < start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must not be before 'from'"
+            )
+        
+        if (end - start).days + 1 > settings.CALENDAR_MAX_RANGE_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range must not exceed {settings.CALENDAR_MAX_RANGE_DAYS} days"
+            )
+        
+        days: Dict[date, CalendarDay] = {
+            day.day: day
+            for day in await self.task_repo.find_by_deadline_range(ObjectId(owner_id), start, end)
+        }
+        
+        # Expand recurring series lazily over the requested window only,
+        # leaving out occurrences that have been materialized as tasks
+        series = await self.task_repo.find_recurring_by_owner(ObjectId(owner_id), end)
+        if series:
+            materialized: Dict[str, Set[date]] = {}
+            for series_id, day in await self.task_repo.find_materialized_dates(
+                ObjectId(owner_id), [task.id for task in series], start, end
+            ):
+                materialized.setdefault(series_id, set()).add(day)
+            
+            for task in series:
+                if task.recurrence is None:
+                    continue
+                skip = materialized.get(task.id)
+                for occurrence in expand_occurrences(task.recurrence, task.deadline, start, end, skip):
+                    if occurrence not in days:
+                        days[occurrence] = CalendarDay(day=occurrence)
+                    days[occurrence].tasks.append(task.model_copy(update={
+                        'deadline': occurrence,
+                        'series_id': task.id,
+                        'occurrence_date': occurrence
+                    }))
+        
+        return [days[day] for day in sorted(days)]
+    
     async def update_task(
         self,
         task_id: str,
@@ -67,6 +192,9 @@ class TaskService:
         """
         # Convert to dict, excluding None values
         update_dict = task_data.model_dump(exclude_none=True)
+        # ...except an explicit "recurrence": null, which stops the series
+        if 'recurrence' in task_data.model_fields_set and task_data.recurrence is None:
+            update_dict['recurrence'] = None
         
         task = await self.task_repo.update_task(
             ObjectId(task_id),
@@ -76,6 +204,45 @@ class TaskService:
         
         return TaskResponse(**task.model_dump()) if task else None
     
+    async def update_occurrence(
+        self,
+        series_id: str,
+        owner_id: str,
+        occurrence: date,
+        task_data: TaskUpdate
+    ) -> Optional[TaskResponse]:
+        """
+        Update (e.g. complete) a single occurrence of a recurring task
+        
+        The occurrence is materialized as its own task on first edit; the
+        series itself is left unchanged.
+        
+        Args:
+            series_id: Recurring task ID
+            owner_id: User's ID
+            occurrence: Occurrence date
+            task_data: Fields to update on the occurrence
+            
+        Returns:
+            Updated occurrence TaskResponse, or None if the series or
+            occurrence does not exist / is not owned by the user
+        """
+        series = await self.task_repo.find_by_id(ObjectId(series_id), ObjectId(owner_id))
+        if not series or not series.recurrence:
+            return None
+        if not expand_occurrences(series.recurrence, series.deadline, occurrence, occurrence):
+            return None
+        
+        task: Optional[TaskInDB] = await self.task_repo.materialize_occurrence(series, occurrence)
+        
+        update_dict = task_data.model_dump(exclude_none=True)
+        # An occurrence cannot itself recur
+        update_dict.pop('recurrence', None)
+        if task and update_dict:
+            task = await self.task_repo.update_task(ObjectId(task.id), ObjectId(owner_id), update_dict)
+        
+        return TaskResponse(**task.model_dump()) if task else None
+    
     async def delete_task(self, task_id: str, owner_id: str) -> bool:
         """
         Delete a task
@@ -0,0 +1,141 @@
+"""
+Index management CLI
+
+Usage (from backend/):
+    python -m src.tools.indexes diff      Compare the manifest (core.indexes) with the live database
+    python -m src.tools.indexes report    Index sizes and usage; flags unused indexes
+    python -m src.tools.indexes sync      Create missing manifest indexes and run pending data migrations
+        [--rolling] [--pause SECONDS]     Build one index at a time, pausing in between
+    python -m src.tools.indexes conflicts Documents that block missing unique indexes
+
+diff exits with status 1 when the database has drifted from the manifest,
+so it can gate a deploy. conflicts (and sync, when it had to skip an
+index) exits with status 1 while duplicates remain, e.g. two accounts
+whose emails differ only by case; merge or rename them, then run sync.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from ..core.config import settings
+from ..core.database import migrate, run_data_migrations
+from ..core.indexes import INDEXES, diff_indexes, find_conflicts, index_usage
+
+
+def format_size(size: Optional[int]) -> str:
+    """Human-readable byte count"""
+    if size is None:
+        return "?"
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+async def run_diff(db: AsyncIOMotorDatabase) -> int:
+    """Print drift between the manifest and the database"""
+    drifted = False
+    for collection, diff in (await diff_indexes(db)).items():
+        if diff.clean:
+            print(f"{collection}: in sync")
+            continue
+        drifted = True
+        print(f"{collection}:")
+        for spec in diff.missing:
+            print(f"  + {spec.name}  missing ({spec.reason})")
+        for spec, info in diff.changed:
+            print(f"  ~ {spec.name}  differs: declared {dict(spec.keys)} {spec.options}, "
+                  f"live {dict(info['key'])}")
+        for info in diff.undeclared:
+            print(f"  - {info['name']}  not in manifest")
+    return 1 if drifted else 0
+
+
+async def run_report(db: AsyncIOMotorDatabase) -> int:
+    """Print index sizes and usage, flagging indexes never used"""
+    now = datetime.utcnow()
+    for collection, specs in INDEXES.items():
+        print(f"{collection}:")
+        for usage in await index_usage(db[collection], specs):
+            flags = []
+            if usage.ops == 0 and usage.name != '_id_':
+                days = (now - usage.since).days if usage.since else None
+                flags.append(f"UNUSED for {days}d" if days is not None else "UNUSED")
+            if not usage.declared:
+                flags.append("not in manifest")
+            print(f"  {usage.name:<40} {format_size(usage.size_bytes):>10} "
+                  f"{'?' if usage.ops is None else usage.ops:>10} ops  {' '.join(flags)}")
+    print("Usage counts are per node and reset when mongod restarts.")
+    return 0
+
+
+async def run_conflicts(db: AsyncIOMotorDatabase) -> int:
+    """Print documents that block building missing unique indexes"""
+    conflicts = await find_conflicts(db)
+    for collection, by_index in conflicts.items():
+        for name, groups in by_index.items():
+            print(f"{collection}.{name}: {len(groups)} conflicting value(s)")
+            for group in groups:
+                documents = ", ".join(f"{doc_id} {values}" for doc_id, values in zip(group['ids'], group['values']))
+                print(f"  {documents}")
+    if not conflicts:
+        print("no conflicts")
+    return 1 if conflicts else 0
+
+
+async def run_sync(db: AsyncIOMotorDatabase, rolling: bool = False, pause_seconds: float = 0) -> int:
+    """Create missing indexes; prints what was created"""
+    created = await migrate(db, rolling=rolling, pause_seconds=pause_seconds)
+    for name in created:
+        print(f"created {name}")
+    print(f"{len(created)} index(es) created")
+    for name, updated in await run_data_migrations(db):
+        print(f"applied data migration {name} ({updated} document(s) updated)")
+    if await find_conflicts(db):
+        print("Some unique indexes were skipped; run the conflicts command for details")
+        return 1
+    return 0
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.indexes",
+        description="Index management CLI",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("diff", help="compare the manifest with the live database")
+    commands.add_parser("report", help="index sizes and usage ($indexStats)")
+    sync = commands.add_parser("sync", help="create missing manifest indexes and run pending data migrations")
+    sync.add_argument("--rolling", action="store_true", help="build one index at a time")
+    sync.add_argument("--pause", type=float, default=0, metavar="SECONDS",
+                      help="pause between rolling builds")
+    commands.add_parser("conflicts", help="list documents that block missing unique indexes")
+    args = parser.parse_args(argv)
+
+    client: AsyncIOMotorClient = AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS
+    )
+    try:
+        db = client[settings.DATABASE_NAME]
+        if args.command == "diff":
+            return await run_diff(db)
+        if args.command == "report":
+            return await run_report(db)
+        if args.command == "conflicts":
+            return await run_conflicts(db)
+        return await run_sync(db, rolling=args.rolling, pause_seconds=args.pause)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,84 @@
+"""
+JWT key management CLI
+
+Usage (from backend/):
+    python -m src.tools.jwt_keys generate [--algorithm ES256|RS256]
+        Print a new private key, its key ID and public key as .env lines
+    python -m src.tools.jwt_keys jwks
+        Print the JWK Set for the configured keys
+
+Rotating keys:
+    1. Generate a new key.
+    2. Move the current key's public PEM into JWT_PUBLIC_KEYS under its
+       key ID.
+    3. Deploy with the new JWT_PRIVATE_KEY.
+    4. Drop the old entry once JWT_EXPIRES_IN has passed.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional, Union
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from ..core.jwt_keys import EC_CURVE_ALGORITHMS, KeyRing, get_key_ring
+
+CURVES = {algorithm: curve for curve, algorithm in EC_CURVE_ALGORITHMS.items()}
+
+
+def generate_private_key(algorithm: str) -> str:
+    """
+    New private key PEM (PKCS#8) for an ES* or RS* algorithm
+
+    Raises:
+        ValueError: Unsupported algorithm
+    """
+    key: Union[ec.EllipticCurvePrivateKey, rsa.RSAPrivateKey]
+    if algorithm in CURVES:
+        key = ec.generate_private_key(getattr(ec, CURVES[algorithm].upper())())
+    elif algorithm.startswith('RS'):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Unsupported asymmetric algorithm: {algorithm}")
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode('ascii')
+
+
+def run_generate(algorithm: str) -> int:
+    """Print .env lines for a new signing key"""
+    private_pem = generate_private_key(algorithm)
+    ring = KeyRing(algorithm, private_pem)
+    public_pem = serialization.load_pem_private_key(private_pem.encode('ascii'), None).public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('ascii')
+    print(f"JWT_ALGORITHM={algorithm}")
+    print(f"JWT_KEY_ID={ring.kid}")
+    print(f"JWT_PRIVATE_KEY=\"{private_pem.strip()}\"".replace('\n', '\\n'))
+    print(f"# Public key for JWT_PUBLIC_KEYS when this key is retired: {{\"{ring.kid}\": \"...\"}}")
+    print(f"# {public_pem.strip()}".replace('\n', '\n# '))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.jwt_keys",
+        description="JWT key management CLI",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="create a signing key")
+    generate.add_argument("--algorithm", default="ES256", choices=sorted(CURVES) + ["RS256", "RS384", "RS512"])
+    commands.add_parser("jwks", help="print the public JWK Set for the configured keys")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        return run_generate(args.algorithm)
+    print(json.dumps(get_key_ring().jwks(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
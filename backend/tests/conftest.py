@@ -1,8 +1,18 @@
 """
 Pytest configuration and fixtures
+
+Tests run against the in-memory backend by default; set
+DATABASE_BACKEND=mongodb (and MONGODB_URI) to run them against MongoDB.
 """
+import os
+
+os.environ.setdefault("DATABASE_BACKEND", "memory")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("CONCURRENCY_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "false")
+
 import pytest_asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from httpx import AsyncClient, ASGITransport
 
 from src.main import app
@@ -13,17 +23,13 @@ from src.core import database
 @pytest_asyncio.fixture
 async def test_db():
     """Provide test database instance"""
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    client = database.create_client()
     db = client[f"{settings.DATABASE_NAME}_test"]
     
-    # Create indexes for test database
-    from src.repositories.user_repository import UserRepository
-    from src.repositories.task_repository import TaskRepository
-    from src.repositories.label_repository import LabelRepository
+    # Create every manifest index for the test database
+    from src.core.indexes import sync_indexes
     
-    await UserRepository(db).ensure_indexes()
-    await TaskRepository(db).ensure_indexes()
-    await LabelRepository(db).ensure_indexes()
+    await sync_indexes(db)
     
     yield db
     
@@ -36,7 +42,7 @@ async def test_db():
 async def async_client(test_db):
     """Provide async HTTP client for API testing with database initialized"""
     # Initialize database client for testing
-    database.client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database.client = database.create_client()
     
     # Override get_database to use test database
     from src.core.database import get_database
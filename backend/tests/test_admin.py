@@ -0,0 +1,77 @@
+"""
+Registration fast path and admin provisioning tests
+"""
+import pytest
+from httpx import AsyncClient
+
+from src.core import security
+from src.core.config import settings
+from src.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "test-admin-key")
+    # Cheap hashes keep batch tests fast
+    monkeypatch.setattr(security, "_calibrated_rounds", 4)
+    return {"X-Admin-Key": "test-admin-key"}
+
+
+@pytest.mark.asyncio
+async def test_register_is_a_single_insert(async_client: AsyncClient, monkeypatch):
+    """Test registration does no email lookup and duplicates still get 409"""
+    async def fail_find_by_email(self, email):
+        raise AssertionError("register should not look up the email")
+
+    monkeypatch.setattr(UserRepository, "find_by_email", fail_find_by_email)
+    user = {"email": "single@example.com", "password": "password123"}
+
+    assert (await async_client.post("/auth/register", json=user)).status_code == 201
+    duplicate = await async_client.post("/auth/register", json=user)
+    assert duplicate.status_code == 409
+    assert duplicate.json()["detail"] == "Email already registered"
+
+
+@pytest.mark.asyncio
+async def test_batch_create_reports_conflicts(async_client: AsyncClient, admin_key):
+    """Test one insert_many creates new users and skips duplicates"""
+    await async_client.post("/auth/register", json={"email": "taken@example.com", "password": "password123"})
+    users = [
+        {"email": "new1@example.com", "password": "password123"},
+        {"email": "taken@example.com", "password": "password123"},
+        {"email": "new2@example.com", "password": "password123"},
+        {"email": "new1@example.com", "password": "password456"},
+    ]
+
+    response = await async_client.post("/admin/users", json={"users": users}, headers=admin_key)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [user["email"] for user in body["created"]] == ["new1@example.com", "new2@example.com"]
+    assert body["conflicts"] == ["taken@example.com", "new1@example.com"]
+    assert all("hashed_password" not in user for user in body["created"])
+
+    login = await async_client.post("/auth/login", json={"email": "new2@example.com", "password": "password123"})
+    assert login.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_require_key(async_client: AsyncClient, admin_key, monkeypatch):
+    """Test a wrong key is refused and no key configured hides the endpoint"""
+    payload = {"users": [{"email": "x@example.com", "password": "password123"}]}
+
+    wrong = await async_client.post("/admin/users", json=payload, headers={"X-Admin-Key": "guess"})
+    assert wrong.status_code == 403
+    assert (await async_client.post("/admin/users", json=payload)).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+    assert (await async_client.post("/admin/users", json=payload, headers=admin_key)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_bounded(async_client: AsyncClient, admin_key):
+    """Test empty and oversized batches are rejected"""
+    too_many = [{"email": f"user{number}@example.com", "password": "password123"} for number in range(101)]
+
+    assert (await async_client.post("/admin/users", json={"users": []}, headers=admin_key)).status_code == 422
+    assert (await async_client.post("/admin/users", json={"users": too_many}, headers=admin_key)).status_code == 422
@@ -50,6 +50,23 @@ async def test_register_duplicate_email(async_client: AsyncClient, test_db):
     assert response.json()["detail"] == "Email already registered"
 
 
+@pytest.mark.asyncio
+async def test_register_duplicate_email_different_case(async_client: AsyncClient, test_db):
+    """Test emails differing only by case count as the same account"""
+    await async_client.post(
+        "/auth/register",
+        json={"email": "casing@example.com", "password": "password123"}
+    )
+    
+    response = await async_client.post(
+        "/auth/register",
+        json={"email": "Casing@Example.com", "password": "different456"}
+    )
+    
+    assert response.status_code == 409
+    assert await test_db.users.count_documents({}) == 1
+
+
 @pytest.mark.asyncio
 async def test_register_invalid_email(async_client: AsyncClient):
     """Test registration with invalid email format returns 422"""
@@ -139,6 +156,17 @@ async def test_login_success(async_client: AsyncClient, test_user):
     assert data["expires_in"] == 3600
 
 
+@pytest.mark.asyncio
+async def test_login_email_ignores_case(async_client: AsyncClient, test_user):
+    """Test login finds the account whatever the email's case"""
+    response = await async_client.post(
+        "/auth/login",
+        json={"email": "TestUser@example.com", "password": "password123"}
+    )
+    
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_login_invalid_email(async_client: AsyncClient):
     """Test login with non-existent email returns 401"""
@@ -0,0 +1,210 @@
+"""
+Adaptive concurrency limit tests
+"""
+import asyncio
+import math
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.core.concurrency_limit import AdaptiveConcurrencyLimit, request_priority
+from src.middleware.concurrency_limit_middleware import ConcurrencyLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limit(clock, **kwargs):
+    options = dict(initial=10, minimum=2, maximum=20, tolerance=2.0, slack_seconds=0.01, clock=clock)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimit(**options)
+
+
+def complete(limit, clock, priority, latency, ok=True, route=None):
+    permit = limit.try_acquire(priority)
+    assert permit is not None
+    clock.now += latency
+    limit.release(permit, ok, route)
+
+
+def hold(limit, count):
+    """Occupy slots (as other in-flight requests would)"""
+    return [limit.try_acquire("read") for _ in range(count)]
+
+
+def drop(limit, permits):
+    for permit in permits:
+        limit.release(permit, None)
+
+
+def test_request_priority():
+    """Test auth routes, safe methods and writes are classified"""
+    auth = {"POST /auth/login"}
+    assert request_priority("POST", "/auth/login/", auth) == "auth"
+    assert request_priority("GET", "/tasks/", auth) == "read"
+    assert request_priority("PATCH", "/tasks/abc", auth) == "write"
+
+
+def test_latency_above_baseline_decreases_limit():
+    """Test queueing latency near the limit shrinks it, once per round trip"""
+    clock = FakeClock()
+    limit = make_limit(clock)
+    complete(limit, clock, "read", 0.05)
+    assert limit.limit == 10
+
+    # Two slow requests admitted together count as one congestion signal
+    others = hold(limit, 7)
+    first, second = limit.try_acquire("read"), limit.try_acquire("read")
+    clock.now += 0.5
+    limit.release(first, True)
+    limit.release(second, True)
+    assert limit.limit == pytest.approx(9)
+
+    complete(limit, clock, "read", 0.5)
+    assert limit.limit == pytest.approx(8.1)
+    drop(limit, others)
+
+
+def test_slow_requests_under_light_load_keep_limit():
+    """Test slow completions or 503s far below the limit are not treated as queueing"""
+    clock = FakeClock()
+    limit = make_limit(clock)
+    complete(limit, clock, "read", 0.01)
+
+    complete(limit, clock, "read", 0.5)
+    complete(limit, clock, "read", 0.01, ok=False)
+    assert limit.limit == 10
+
+
+def test_overload_status_decreases_limit_down_to_minimum():
+    """Test 503/504 completions near the limit back off and it stays above minimum"""
+    clock = FakeClock()
+    limit = make_limit(clock)
+    for _ in range(50):
+        others = hold(limit, math.ceil(limit.capacity("read") * 0.8) - 1)
+        complete(limit, clock, "read", 0.01, ok=False)
+        drop(limit, others)
+    assert limit.limit == 2
+
+
+def test_baseline_is_per_route():
+    """Test a route slower than others of its class is not mistaken for queueing"""
+    clock = FakeClock()
+    limit = make_limit(clock)
+    complete(limit, clock, "read", 0.003, route="GET /labels/")
+    complete(limit, clock, "read", 0.06, route="GET /tasks/")
+
+    others = hold(limit, 8)
+    complete(limit, clock, "read", 0.06, route="GET /tasks/")
+    assert limit.limit == pytest.approx(10.1)
+
+    complete(limit, clock, "read", 0.06, route="GET /labels/")
+    assert limit.limit == pytest.approx(10.1 * 0.9)
+    drop(limit, others)
+
+
+def test_mixed_latency_unsaturated_workload_keeps_limit():
+    """Test sequential reads of very different latency never shed under light load"""
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(
+        initial=50, minimum=5, maximum=500, tolerance=2.0, slack_seconds=0.02, clock=clock
+    )
+    for request in range(1000):
+        if request % 10 == 0:
+            complete(limit, clock, "read", 0.06, route="GET /tasks/")
+            complete(limit, clock, "read", 0.3, route="GET /tasks/")
+        else:
+            complete(limit, clock, "read", 0.003, route="GET /labels/")
+    assert limit.limit == 50
+    assert limit.capacity("auth") == 25
+
+
+def test_limit_recovers_toward_initial_under_light_load():
+    """Test fast unsaturated completions grow a shrunk limit back, but not past its initial value"""
+    clock = FakeClock()
+    limit = make_limit(clock)
+    for _ in range(5):
+        others = hold(limit, math.ceil(limit.capacity("read") * 0.8) - 1)
+        complete(limit, clock, "read", 0.01, ok=False)
+        drop(limit, others)
+    assert limit.limit < 7
+
+    for _ in range(200):
+        complete(limit, clock, "read", 0.01)
+    assert limit.limit == 10
+
+
+def test_fast_saturated_completions_increase_limit():
+    """Test the limit grows only while at least half of it is in use"""
+    clock = FakeClock()
+    limit = make_limit(clock, initial=4)
+
+    for _ in range(20):
+        complete(limit, clock, "read", 0.01)
+    assert limit.limit == 4
+
+    # The first request is admitted with 1 of 4 slots in use and does not count
+    permits = [limit.try_acquire("read") for _ in range(3)]
+    clock.now += 0.01
+    for permit in permits:
+        limit.release(permit, True)
+    assert limit.limit == pytest.approx(4.25 + 1 / 4.25)
+
+
+def test_auth_is_shed_before_reads():
+    """Test classes beyond their share are refused while reads still fit"""
+    clock = FakeClock()
+    limit = make_limit(clock, shares={"read": 1.0, "auth": 0.5})
+
+    auth = [limit.try_acquire("auth") for _ in range(5)]
+    assert all(auth) and limit.try_acquire("auth") is None
+
+    reads = [limit.try_acquire("read") for _ in range(5)]
+    assert all(reads) and limit.try_acquire("read") is None
+
+    limit.release(reads[0], None)
+    assert limit.in_flight == 9 and limit.limit == 10
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_with_503(monkeypatch):
+    """Test requests over the limit get 503 with Retry-After; probes are exempt"""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_ENABLED", True)
+
+    release = asyncio.Event()
+    inner = FastAPI()
+
+    @inner.get("/tasks/")
+    async def tasks():
+        await release.wait()
+        return []
+
+    @inner.get("/livez")
+    async def livez():
+        return {"status": "alive"}
+
+    limit = AdaptiveConcurrencyLimit(initial=2, minimum=2, maximum=2)
+    app = ConcurrencyLimitMiddleware(inner, limit)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        held = [asyncio.create_task(client.get("/tasks/")) for _ in range(2)]
+        while limit.in_flight < 2:
+            await asyncio.sleep(0)
+
+        shed = await client.get("/tasks/")
+        probe = await client.get("/livez")
+        release.set()
+        responses = await asyncio.gather(*held)
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert probe.status_code == 200
+    assert [response.status_code for response in responses] == [200, 200]
+    assert limit.in_flight == 0
@@ -0,0 +1,89 @@
+"""
+Request deadline and disconnect cancellation tests
+"""
+import asyncio
+
+import pytest
+
+from src.core.config import settings
+from src.core.deadline import parse_timeout_ms, remaining_seconds
+from src.middleware.deadline_middleware import DeadlineMiddleware
+
+
+def http_scope(headers=()):
+    return {"type": "http", "method": "GET", "path": "/tasks", "headers": list(headers)}
+
+
+def test_parse_timeout_ms():
+    """Test header budgets fall back to the default and are capped"""
+    assert parse_timeout_ms(None) == settings.REQUEST_TIMEOUT_MS
+    assert parse_timeout_ms("abc") == settings.REQUEST_TIMEOUT_MS
+    assert parse_timeout_ms("-5") == settings.REQUEST_TIMEOUT_MS
+    assert parse_timeout_ms("250") == 250
+    assert parse_timeout_ms(str(settings.REQUEST_TIMEOUT_MAX_MS * 10)) == settings.REQUEST_TIMEOUT_MAX_MS
+
+
+@pytest.mark.asyncio
+async def test_deadline_visible_to_app():
+    """Test the header budget is applied while the app runs"""
+    seen = []
+    sent = []
+
+    async def app(scope, receive, send):
+        seen.append(remaining_seconds())
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        if not sent:
+            sent.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await DeadlineMiddleware(app)(http_scope([(b"x-request-timeout", b"500")]), receive, send)
+
+    assert 0 < seen[0] <= 0.5
+    assert remaining_seconds() is None
+    assert messages[-1]["body"] == b"ok"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_request():
+    """Test a client disconnect cancels the in-flight request"""
+    cancelled = asyncio.Event()
+    incoming = asyncio.Queue()
+    incoming.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def send(message):
+        raise AssertionError("nothing should be sent")
+
+    scope = http_scope()
+    middleware = asyncio.create_task(DeadlineMiddleware(app)(scope, incoming.get, send))
+    await asyncio.sleep(0.01)
+    incoming.put_nowait({"type": "http.disconnect"})
+
+    await asyncio.wait_for(middleware, timeout=1)
+    assert cancelled.is_set()
+    assert scope["client_disconnected"] is True
+
+
+@pytest.mark.asyncio
+async def test_requests_served_through_deadline_middleware(async_client):
+    """Test normal API requests pass through the middleware"""
+    response = await async_client.get("/", headers={"X-Request-Timeout": "1000"})
+
+    assert response.status_code == 200
@@ -0,0 +1,106 @@
+"""
+Event hub and SSE stream tests
+"""
+import json
+import pytest
+from bson import ObjectId
+from datetime import date
+
+from src.api.v1.events import stream_events
+from src.core.event_hub import EventHub
+from src.core.events import Event, event_bus
+from src.repositories.label_repository import LabelRepository
+from src.repositories.task_repository import TaskRepository
+
+
+@pytest.fixture
+def hub():
+    """Provide a hub detached from the event bus after the test"""
+    hub = EventHub(buffer_size=2, max_connections=3)
+    yield hub
+    event_bus.unsubscribe(hub._on_event)
+
+
+@pytest.mark.asyncio
+async def test_hub_delivers_owner_events(test_db, hub):
+    """Test repository writes reach only the owner's subscriptions"""
+    owner_id = ObjectId()
+    mine = hub.subscribe(str(owner_id))
+    theirs = hub.subscribe(str(ObjectId()))
+    
+    task = await TaskRepository(test_db).create_task({
+        "title": "Streamed",
+        "priority": "High",
+        "deadline": date(2025, 12, 31),
+        "owner_id": owner_id
+    })
+    await LabelRepository(test_db).create_label("Work", owner_id)
+    
+    assert theirs.queue.empty()
+    message = mine.queue.get_nowait()
+    assert message.startswith("event: task.created\ndata: ")
+    assert json.loads(message.split("data: ", 1)[1])["id"] == task.id
+    assert mine.queue.get_nowait().startswith("event: label.created\n")
+
+
+@pytest.mark.asyncio
+async def test_hub_evicts_slow_consumer(hub):
+    """Test a subscription with a full buffer is evicted and closed"""
+    subscription = hub.subscribe("owner")
+    
+    for i in range(3):
+        event_bus.publish(Event("task.deleted", "owner", {"id": str(i)}))
+    
+    assert subscription.evicted is True
+    assert hub.connection_count == 0
+    assert subscription.queue.get_nowait() is None
+
+
+@pytest.mark.asyncio
+async def test_hub_connection_limit(hub):
+    """Test subscribe returns None once max_connections is reached"""
+    subscriptions = [hub.subscribe(f"owner-{i}") for i in range(3)]
+    
+    assert hub.subscribe("one-too-many") is None
+    
+    hub.unsubscribe(subscriptions[0])
+    assert hub.subscribe("one-more") is not None
+
+
+@pytest.mark.asyncio
+async def test_stream_events_yields_until_closed(hub):
+    """Test the SSE generator relays messages and ends on close"""
+    stream = stream_events("owner", hub)
+    
+    assert (await stream.__anext__()).startswith("retry: ")
+    event_bus.publish(Event("task.deleted", "owner", {"id": "abc"}))
+    assert await stream.__anext__() == 'event: task.deleted\ndata: {"id": "abc"}\n\n'
+    
+    hub.close()
+    assert [message async for message in stream] == []
+
+
+@pytest.mark.asyncio
+async def test_stream_events_subscribes_only_while_streaming(hub):
+    """Test a stream that never starts holds no subscription and a closed one releases it"""
+    never_started = stream_events("owner", hub)
+    assert hub.connection_count == 0
+    
+    stream = stream_events("owner", hub)
+    await stream.__anext__()
+    assert hub.connection_count == 1
+    
+    await stream.aclose()
+    assert hub.connection_count == 0
+    await never_started.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_events_ends_when_hub_full(hub):
+    """Test a stream that loses the race for the last slot ends after the retry hint"""
+    for i in range(3):
+        hub.subscribe(f"owner-{i}")
+    
+    messages = [message async for message in stream_events("late", hub)]
+    
+    assert len(messages) == 1 and messages[0].startswith("retry: ")
@@ -0,0 +1,102 @@
+"""
+Liveness and readiness probe tests
+"""
+import pytest
+from httpx import AsyncClient
+
+from src import main
+from src.core.health import HealthMonitor
+
+
+class FakeAdmin:
+    def __init__(self, error=None):
+        self.error = error
+        self.pings = 0
+
+    async def command(self, name):
+        self.pings += 1
+        if self.error:
+            raise self.error
+        return {"ok": 1}
+
+
+class FakeClient:
+    def __init__(self, error=None):
+        self.admin = FakeAdmin(error)
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """Replace the global health monitor with a fresh one"""
+    monitor = HealthMonitor(interval_seconds=5, timeout_seconds=1)
+    monkeypatch.setattr(main, "health_monitor", monitor)
+    return monitor
+
+
+@pytest.mark.asyncio
+async def test_livez(async_client: AsyncClient, monitor):
+    """Test liveness does not depend on the database"""
+    response = await async_client.get("/livez")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_readyz_served_from_cached_ping(async_client: AsyncClient, monitor):
+    """Test readiness reflects the last background ping without pinging"""
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+
+    client = FakeClient()
+    monitor.client = client
+    await monitor.check()
+
+    for _ in range(5):
+        response = await async_client.get("/readyz")
+        assert response.status_code == 200
+    assert response.json()["database"] == "connected"
+    assert client.admin.pings == 1
+
+
+@pytest.mark.asyncio
+async def test_readyz_reports_failure_with_503(async_client: AsyncClient, monitor):
+    """Test a failed ping yields 503 on /readyz"""
+    monitor.client = FakeClient(RuntimeError("connection refused"))
+    await monitor.check()
+
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "unavailable"
+    assert body["error"] == "connection refused"
+
+
+@pytest.mark.asyncio
+async def test_health_keeps_original_body(async_client: AsyncClient, monitor):
+    """Test /health returns its original payload, not the /readyz detail"""
+    response = await async_client.get("/health")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unhealthy", "database": "not initialized"}
+
+    monitor.client = FakeClient(RuntimeError("connection refused"))
+    await monitor.check()
+    response = await async_client.get("/health")
+    assert response.json() == {"status": "unhealthy", "database": "disconnected", "error": "connection refused"}
+
+    monitor.client = FakeClient()
+    await monitor.check()
+    response = await async_client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy", "database": "connected"}
+
+
+@pytest.mark.asyncio
+async def test_readyz_stale_result_not_ready(monitor):
+    """Test an old successful ping no longer counts as ready"""
+    monitor.client = FakeClient()
+    await monitor.check()
+    assert monitor.ready
+
+    monitor.checked_at -= 3 * monitor.interval + 1
+    assert not monitor.ready
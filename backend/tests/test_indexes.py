@@ -0,0 +1,243 @@
+"""
+Index manifest and sync tests
+"""
+import pytest
+
+from src.core.database import migrate
+from src.core.indexes import INDEXES, find_conflicts, index, missing_indexes, sync_indexes
+
+
+def test_spec_default_name_matches_mongodb():
+    """Test generated names follow MongoDB's key-pattern naming"""
+    assert index(("owner_id", 1), ("created_at", -1)).name == "owner_id_1_created_at_-1"
+    assert index(("owner_id", 1), name="custom").name == "custom"
+
+
+def test_manifest_names_unique():
+    """Test no two declared indexes on a collection share a name"""
+    for specs in INDEXES.values():
+        names = [spec.name for spec in specs]
+        assert len(names) == len(set(names))
+
+
+@pytest.mark.asyncio
+async def test_sync_creates_only_missing(test_db):
+    """Test sync is a no-op once every declared index exists"""
+    # conftest already ensured indexes through the repositories
+    for name, specs in INDEXES.items():
+        assert await missing_indexes(test_db[name], specs) == []
+    assert await sync_indexes(test_db) == {name: [] for name in INDEXES}
+
+    await test_db.labels.drop_index("owner_id_1_name_1_ci")
+    assert await sync_indexes(test_db, ["labels"]) == {"labels": ["owner_id_1_name_1_ci"]}
+    assert await missing_indexes(test_db.labels, INDEXES["labels"]) == []
+
+
+@pytest.mark.asyncio
+async def test_migrate_reports_created_indexes(test_db):
+    """Test migrate returns qualified names of created indexes"""
+    await test_db.users.drop_index("email_1_ci")
+
+    assert await migrate(test_db) == ["users.email_1_ci"]
+    assert await migrate(test_db) == []
+
+
+@pytest.mark.asyncio
+async def test_data_migrations_run_once(test_db):
+    """Test migrate leaves data alone and data migrations are recorded once applied"""
+    from datetime import datetime
+    from bson import ObjectId
+    from src.core.database import pending_data_migrations, run_data_migrations
+
+    series_start = datetime(2025, 1, 6)
+    await test_db.tasks.insert_one({"title": "Legacy", "priority": "High", "owner_id": ObjectId()})
+    await test_db.tasks.insert_one({
+        "title": "Legacy Series", "priority": "Low", "deadline": series_start,
+        "recurrence": {"freq": "weekly", "interval": 1}, "owner_id": ObjectId()
+    })
+
+    await migrate(test_db)
+    assert "priority_rank" not in await test_db.tasks.find_one({"title": "Legacy"})
+    assert await pending_data_migrations(test_db) == ["tasks.priority_rank", "tasks.reminder_occurrence"]
+
+    assert await run_data_migrations(test_db) == [("tasks.priority_rank", 2), ("tasks.reminder_occurrence", 1)]
+    assert (await test_db.tasks.find_one({"title": "Legacy"}))["priority_rank"] == 3
+    assert (await test_db.tasks.find_one({"title": "Legacy Series"}))["reminder_occurrence"] == series_start
+    assert await pending_data_migrations(test_db) == []
+    assert await run_data_migrations(test_db) == []
+
+
+@pytest.mark.asyncio
+async def test_sync_startup_applies_data_migrations(monkeypatch):
+    """Test workers in sync startup mode backfill once, like the sync command"""
+    from bson import ObjectId
+    from src.core import database
+    from src.core.config import settings
+    from src.core.memory_database import MemoryClient
+
+    memory = MemoryClient()
+    db = memory[settings.DATABASE_NAME]
+    await db.tasks.insert_one({"title": "Legacy", "priority": "Low", "owner_id": ObjectId()})
+    monkeypatch.setattr(database, "create_client", lambda *args, **kwargs: memory)
+    monkeypatch.setattr(database, "client", None)
+    monkeypatch.setattr(settings, "INDEX_STARTUP_MODE", "sync")
+
+    await database.connect_to_database()
+
+    assert (await db.tasks.find_one({"title": "Legacy"}))["priority_rank"] == 1
+    assert await database.pending_data_migrations(db) == []
+
+
+@pytest.mark.asyncio
+async def test_find_conflicts_groups_values_differing_by_case(test_db):
+    """Test conflicts are only reported for missing unique indexes, under their collation"""
+    from bson import ObjectId
+
+    owner = ObjectId()
+    await test_db.labels.drop_index("owner_id_1_name_1_ci")
+    await test_db.labels.insert_many([
+        {"owner_id": owner, "name": "Work"},
+        {"owner_id": owner, "name": "work"},
+        {"owner_id": owner, "name": "Home"},
+        {"owner_id": ObjectId(), "name": "WORK"},
+    ])
+
+    conflicts = await find_conflicts(test_db)
+
+    assert list(conflicts) == ["labels"]
+    (group,) = conflicts["labels"]["owner_id_1_name_1_ci"]
+    assert group["count"] == 2
+    assert sorted(value["name"] for value in group["values"]) == ["Work", "work"]
+
+
+@pytest.mark.asyncio
+async def test_migrate_skips_conflicting_index_and_replaces_old_one(test_db):
+    """Test migrate keeps the case-sensitive index until duplicates are resolved"""
+    await test_db.users.drop_index("email_1_ci")
+    await test_db.users.create_index("email", name="email_1", unique=True)
+    await test_db.users.insert_many([{"email": "a@example.com"}, {"email": "A@example.com"}])
+
+    assert await migrate(test_db) == []
+    live = [info["name"] async for info in test_db.users.list_indexes()]
+    assert "email_1" in live and "email_1_ci" not in live
+
+    await test_db.users.delete_one({"email": "A@example.com"})
+
+    assert await migrate(test_db) == ["users.email_1_ci"]
+    live = [info["name"] async for info in test_db.users.list_indexes()]
+    assert "email_1" not in live and "email_1_ci" in live
+
+
+@pytest.mark.asyncio
+async def test_diff_reports_missing_changed_and_undeclared(test_db):
+    """Test diff classifies drift between manifest and database"""
+    from src.core.indexes import diff_indexes
+
+    assert all(diff.clean for diff in (await diff_indexes(test_db)).values())
+
+    await test_db.users.drop_index("email_1_ci")
+    await test_db.users.create_index("email", name="email_1_ci")
+    await test_db.labels.drop_index("owner_id_1_name_1_ci")
+    await test_db.tasks.create_index("title")
+
+    diffs = await diff_indexes(test_db)
+    assert [spec.name for spec, _ in diffs["users"].changed] == ["email_1_ci"]
+    assert [spec.name for spec in diffs["labels"].missing] == ["owner_id_1_name_1_ci"]
+    assert [info["name"] for info in diffs["tasks"].undeclared] == ["title_1"]
+
+
+@pytest.mark.asyncio
+async def test_diff_detects_missing_ttl_of_zero(test_db):
+    """Test a plain index where a TTL index with expireAfterSeconds=0 is declared counts as changed"""
+    from src.core.indexes import diff_collection
+
+    await test_db.refresh_tokens.drop_index("expires_at_1")
+    await test_db.refresh_tokens.create_index("expires_at", name="expires_at_1")
+
+    diff = await diff_collection(test_db.refresh_tokens, INDEXES["refresh_tokens"])
+
+    assert [spec.name for spec, _ in diff.changed] == ["expires_at_1"]
+
+
+@pytest.mark.asyncio
+async def test_diff_cli_exit_status(test_db, capsys):
+    """Test the diff command exits non-zero on drift"""
+    from src.tools.indexes import run_diff
+
+    assert await run_diff(test_db) == 0
+
+    await test_db.labels.drop_index("owner_id_1_name_1_ci")
+    assert await run_diff(test_db) == 1
+    assert "+ owner_id_1_name_1_ci  missing" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_conflicts_cli_exit_status(test_db, capsys):
+    """Test the conflicts command lists duplicates and exits non-zero"""
+    from src.tools.indexes import run_conflicts
+
+    assert await run_conflicts(test_db) == 0
+
+    await test_db.users.drop_index("email_1_ci")
+    await test_db.users.insert_many([{"email": "b@example.com"}, {"email": "B@Example.com"}])
+
+    assert await run_conflicts(test_db) == 1
+    out = capsys.readouterr().out
+    assert "users.email_1_ci: 1 conflicting value(s)" in out
+    assert "B@Example.com" in out
+
+
+@pytest.mark.asyncio
+async def test_rolling_sync_builds_each_missing_index(test_db):
+    """Test a rolling sync creates missing indexes one at a time"""
+    await test_db.tasks.drop_indexes()
+
+    created = await sync_indexes(test_db, ["tasks"], rolling=True)
+
+    assert created["tasks"] == [spec.name for spec in INDEXES["tasks"]]
+    assert await missing_indexes(test_db.tasks, INDEXES["tasks"]) == []
+
+
+@pytest.mark.asyncio
+async def test_index_usage_combines_stats_and_sizes():
+    """Test usage merges $indexStats and $collStats across shards"""
+    from datetime import datetime
+    from src.core.indexes import index_usage
+
+    since = datetime(2025, 1, 1)
+    results = {
+        "$indexStats": [
+            {"name": "_id_", "accesses": {"ops": 10, "since": since}},
+            {"name": "email_1_ci", "accesses": {"ops": 0, "since": since}},
+            {"name": "legacy_1", "accesses": {"ops": 3, "since": since}},
+        ],
+        "$collStats": [
+            {"storageStats": {"indexSizes": {"_id_": 100, "email_1_ci": 400, "legacy_1": 50}}},
+            {"storageStats": {"indexSizes": {"email_1_ci": 400}}},
+        ],
+    }
+
+    class FakeCursor:
+        def __init__(self, docs):
+            self.docs = iter(docs)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self.docs)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    class FakeCollection:
+        def aggregate(self, pipeline):
+            return FakeCursor(results[next(iter(pipeline[0]))])
+
+    usage = await index_usage(FakeCollection(), INDEXES["users"])
+
+    assert [(u.name, u.size_bytes, u.ops, u.declared) for u in usage] == [
+        ("email_1_ci", 800, 0, True),
+        ("_id_", 100, 10, True),
+        ("legacy_1", 50, 3, False),
+    ]
@@ -0,0 +1,108 @@
+"""
+JWT key ring tests
+"""
+import base64
+import hashlib
+import hmac
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from httpx import AsyncClient
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+
+from src.core import jwt_keys
+from src.core.config import settings
+from src.core.jwt_keys import KeyRing
+from src.tools.jwt_keys import generate_private_key
+
+
+def public_pem(private_pem: str) -> str:
+    key = serialization.load_pem_private_key(private_pem.encode('ascii'), None)
+    return key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('ascii')
+
+
+@pytest.fixture(scope="module")
+def es256_key():
+    return generate_private_key("ES256")
+
+
+@pytest.fixture(scope="module")
+def rs256_key():
+    return generate_private_key("RS256")
+
+
+def test_asymmetric_tokens_carry_kid(es256_key):
+    """Test signed tokens name their key and verify with it"""
+    ring = KeyRing("ES256", es256_key)
+    token = ring.sign({"sub": "user-1"})
+
+    assert jwt.get_unverified_header(token) == {"alg": "ES256", "kid": ring.kid, "typ": "JWT"}
+    assert ring.verify(token) == {"sub": "user-1"}
+    assert KeyRing("ES256", es256_key).kid == ring.kid
+
+
+def test_rotation_keeps_retired_keys_verifiable(es256_key, rs256_key):
+    """Test tokens signed with a retired key still verify, unknown keys do not"""
+    old_ring = KeyRing("RS256", rs256_key)
+    old_token = old_ring.sign({"sub": "user-1"})
+
+    new_ring = KeyRing("ES256", es256_key, verifying_keys={old_ring.kid: public_pem(rs256_key)})
+    assert new_ring.verify(old_token) == {"sub": "user-1"}
+    assert [key["kid"] for key in new_ring.jwks()["keys"]] == [new_ring.kid, old_ring.kid]
+
+    with pytest.raises(JWTError):
+        KeyRing("ES256", es256_key).verify(old_token)
+
+
+def test_algorithm_confusion_is_rejected(es256_key):
+    """Test an HS256 token keyed with the public key is refused"""
+    ring = KeyRing("ES256", es256_key)
+
+    def encode(part: bytes) -> bytes:
+        return base64.urlsafe_b64encode(part).rstrip(b"=")
+
+    # Built by hand: jose itself refuses a PEM as an HMAC secret
+    signing_input = b".".join(
+        encode(json.dumps(part).encode()) for part in ({"alg": "HS256", "kid": ring.kid}, {"sub": "attacker"})
+    )
+    signature = hmac.new(public_pem(es256_key).encode(), signing_input, hashlib.sha256).digest()
+    forged = (signing_input + b"." + encode(signature)).decode()
+
+    with pytest.raises(JWTError):
+        ring.verify(forged)
+
+
+def test_symmetric_ring_publishes_no_keys():
+    """Test HS256 keeps working without kid and never exposes the secret"""
+    ring = KeyRing("HS256", "secret")
+    token = ring.sign({"sub": "user-1"})
+
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert ring.verify(token) == {"sub": "user-1"}
+    assert ring.jwks() == {"keys": []}
+
+
+@pytest.mark.asyncio
+async def test_login_tokens_verify_with_published_jwks(async_client: AsyncClient, es256_key, monkeypatch):
+    """Test a downstream service can verify access tokens from the JWKS alone"""
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "ES256")
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY", es256_key)
+    monkeypatch.setattr(jwt_keys, "_key_ring", None)
+
+    await async_client.post("/auth/register", json={"email": "jwks@example.com", "password": "password123"})
+    tokens = (await async_client.post(
+        "/auth/login", json={"email": "jwks@example.com", "password": "password123"}
+    )).json()
+    response = await async_client.get("/.well-known/jwks.json")
+    me = await async_client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    monkeypatch.setattr(jwt_keys, "_key_ring", None)
+
+    assert response.headers["cache-control"] == "public, max-age=300"
+    (published,) = response.json()["keys"]
+    claims = jwt.decode(tokens["access_token"], jwk.construct(published), algorithms=[published["alg"]])
+    assert claims["sub"]
+    assert me.status_code == 200
@@ -65,6 +65,27 @@ async def test_create_label_duplicate_name(async_client: AsyncClient, label_auth
     assert "already exists" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_create_label_duplicate_name_different_case(async_client: AsyncClient, label_auth_headers: dict):
+    """Test label names differing only by case conflict"""
+    await async_client.post("/labels", json={"name": "Errands"}, headers=label_auth_headers)
+    
+    response = await async_client.post("/labels", json={"name": "ERRANDS"}, headers=label_auth_headers)
+    
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_get_labels_sorted_ignoring_case(async_client: AsyncClient, label_auth_headers: dict):
+    """Test lowercase names sort among capitalized ones"""
+    for name in ("banana", "Cherry", "apple"):
+        await async_client.post("/labels", json={"name": name}, headers=label_auth_headers)
+    
+    response = await async_client.get("/labels", headers=label_auth_headers)
+    
+    assert [label["name"] for label in response.json()] == ["apple", "banana", "Cherry"]
+
+
 # GET /labels tests
 @pytest.mark.asyncio
 async def test_get_labels_sorted_alphabetically(async_client: AsyncClient, label_auth_headers: dict):
@@ -0,0 +1,164 @@
+"""
+Login throttle tests
+"""
+import pytest
+from httpx import AsyncClient
+
+from src.core.config import settings
+from src.core.login_throttle import LoginThrottle, login_throttle
+from src.repositories.user_repository import UserRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_throttle(clock, **kwargs):
+    options = dict(
+        email_free_attempts=3, ip_free_attempts=10, base_delay=1, max_delay=60,
+        email_max_delay=60, reset_seconds=600, max_keys=100, clock=clock
+    )
+    options.update(kwargs)
+    return LoginThrottle(**options)
+
+
+def test_backoff_doubles_after_free_attempts():
+    """Test each failure past the free attempts doubles the lockout"""
+    clock = FakeClock()
+    throttle = make_throttle(clock)
+
+    for _ in range(3):
+        throttle.record_failure("a@example.com", "10.0.0.1")
+    assert throttle.retry_after("a@example.com") == 0
+
+    lockouts = []
+    for _ in range(4):
+        throttle.record_failure("a@example.com")
+        lockouts.append(throttle.retry_after("A@Example.com "))
+    assert lockouts == [1, 2, 4, 8]
+
+    for _ in range(10):
+        throttle.record_failure("a@example.com")
+    assert throttle.retry_after("a@example.com") == 60
+
+    clock.now += 60
+    assert throttle.retry_after("a@example.com") == 0
+
+
+def test_email_lockout_capped_below_ip_lockout():
+    """Test failures for someone else's email lock it out only briefly"""
+    clock = FakeClock()
+    throttle = make_throttle(clock, email_max_delay=5, ip_free_attempts=3)
+
+    for _ in range(20):
+        throttle.record_failure("victim@example.com", "10.0.0.1")
+
+    assert throttle.retry_after("victim@example.com") == 5
+    assert throttle.retry_after("other@example.com", "10.0.0.1") == 60
+
+
+def test_ip_lockout_covers_every_email():
+    """Test an IP spraying many emails is locked for all of them"""
+    clock = FakeClock()
+    throttle = make_throttle(clock)
+
+    for number in range(11):
+        throttle.record_failure(f"user{number}@example.com", "10.0.0.1")
+
+    assert throttle.retry_after("fresh@example.com", "10.0.0.1") == 1
+    assert throttle.retry_after("fresh@example.com", "10.0.0.2") == 0
+
+
+def test_success_clears_email_but_not_ip():
+    """Test a valid login resets its email only"""
+    clock = FakeClock()
+    throttle = make_throttle(clock, ip_free_attempts=3)
+    for _ in range(4):
+        throttle.record_failure("a@example.com", "10.0.0.1")
+
+    throttle.record_success("a@example.com")
+
+    assert throttle.retry_after("a@example.com") == 0
+    assert throttle.retry_after("a@example.com", "10.0.0.1") == 1
+
+
+def test_counts_reset_after_idle_period_and_keys_are_bounded():
+    """Test idle counters start over and the LRU bound holds"""
+    clock = FakeClock()
+    throttle = make_throttle(clock, max_keys=3)
+    for _ in range(3):
+        throttle.record_failure("a@example.com")
+
+    clock.now += 601
+    throttle.record_failure("a@example.com")
+    assert throttle.retry_after("a@example.com") == 0
+
+    for number in range(5):
+        throttle.record_failure(f"user{number}@example.com")
+    assert len(throttle) == 3
+
+
+@pytest.mark.asyncio
+async def test_locked_login_skips_database(async_client: AsyncClient, test_db, monkeypatch):
+    """Test locked-out attempts get 429 without a user lookup"""
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_ENABLED", True)
+    monkeypatch.setattr(login_throttle, "email_free_attempts", 2)
+    login_throttle.clear()
+
+    lookups = 0
+    find_by_email = UserRepository.find_by_email
+
+    async def counting_find_by_email(self, email):
+        nonlocal lookups
+        lookups += 1
+        return await find_by_email(self, email)
+
+    monkeypatch.setattr(UserRepository, "find_by_email", counting_find_by_email)
+
+    try:
+        await async_client.post("/auth/register", json={"email": "locked@example.com", "password": "password123"})
+        wrong = {"email": "locked@example.com", "password": "wrongpassword"}
+        statuses = [(await async_client.post("/auth/login", json=wrong)).status_code for _ in range(3)]
+        lookups_before = lookups
+
+        locked = await async_client.post(
+            "/auth/login", json={"email": "LOCKED@example.com", "password": "password123"}
+        )
+    finally:
+        login_throttle.clear()
+
+    assert statuses == [401, 401, 401]
+    assert locked.status_code == 429
+    assert locked.headers["retry-after"] == "1"
+    assert lookups == lookups_before
+
+
+@pytest.mark.asyncio
+async def test_ip_key_requires_trusted_proxy_hops(async_client: AsyncClient, monkeypatch):
+    """Test the client address is only throttled when it is known to be the client's"""
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_ENABLED", True)
+    monkeypatch.setattr(login_throttle, "ip_free_attempts", 1)
+    login_throttle.clear()
+
+    async def spray(headers):
+        return [
+            (await async_client.post(
+                "/auth/login", json={"email": f"user{n}@example.com", "password": "wrongpassword"}, headers=headers
+            )).status_code
+            for n in range(3)
+        ]
+
+    try:
+        monkeypatch.setattr(settings, "RATE_LIMIT_PROXY_HOPS", 0)
+        shared = await spray({})
+        monkeypatch.setattr(settings, "RATE_LIMIT_PROXY_HOPS", 1)
+        forwarded = await spray({"X-Forwarded-For": "203.0.113.9"})
+    finally:
+        login_throttle.clear()
+
+    assert shared == [401, 401, 401]
+    assert forwarded == [401, 401, 429]
@@ -0,0 +1,147 @@
+"""
+In-memory database backend tests
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from src.core.indexes import INDEXES, sync_collection_indexes
+from src.core.memory_database import MemoryClient, matches
+
+
+@pytest.fixture
+def memory_db():
+    """Fresh in-memory database, independent of DATABASE_BACKEND"""
+    return MemoryClient()["todox_memory_test"]
+
+
+def test_query_operators():
+    """Test the query subset used by the repositories"""
+    doc = {'owner_id': 1, 'label_ids': ['a', 'b'], 'deadline': datetime(2025, 1, 10), 'recurrence': None}
+
+    assert matches(doc, {'label_ids': 'a'})
+    assert matches(doc, {'recurrence': None, 'missing': None})
+    assert matches(doc, {'deadline': {'$gte': datetime(2025, 1, 1), '$lte': datetime(2025, 1, 31)}})
+    assert not matches(doc, {'deadline': {'$gte': '2025-01-01'}})
+    assert matches(doc, {'$or': [{'owner_id': 2}, {'missing': {'$exists': False}}]})
+    assert matches(doc, {'label_ids': {'$type': 'array'}, 'owner_id': {'$in': [1, 3]}})
+    assert not matches(doc, {'recurrence': {'$type': 'object'}})
+
+
+@pytest.mark.asyncio
+async def test_unique_label_name_per_owner(memory_db):
+    """Test the manifest's (owner_id, name) index is enforced, including on update"""
+    await sync_collection_indexes(memory_db.labels, INDEXES['labels'])
+    owner, other = ObjectId(), ObjectId()
+
+    await memory_db.labels.insert_one({'owner_id': owner, 'name': 'Work'})
+    await memory_db.labels.insert_one({'owner_id': other, 'name': 'Work'})
+    with pytest.raises(DuplicateKeyError):
+        await memory_db.labels.insert_one({'owner_id': owner, 'name': 'Work'})
+
+    home = await memory_db.labels.insert_one({'owner_id': owner, 'name': 'Home'})
+    with pytest.raises(DuplicateKeyError):
+        await memory_db.labels.update_one({'_id': home.inserted_id}, {'$set': {'name': 'Work'}})
+
+    # Deleting frees the key
+    await memory_db.labels.delete_one({'owner_id': owner, 'name': 'Work'})
+    await memory_db.labels.update_one({'_id': home.inserted_id}, {'$set': {'name': 'Work'}})
+    assert await memory_db.labels.count_documents({'owner_id': owner}) == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_and_case_insensitive_unique_indexes(memory_db):
+    """Test partial filters and strength-2 collation on unique indexes"""
+    await memory_db.items.create_indexes([
+        IndexModel([('series', 1)], unique=True, partialFilterExpression={'series': {'$type': 'string'}}),
+        IndexModel([('email', 1)], unique=True, collation={'locale': 'en', 'strength': 2}),
+    ])
+
+    # Documents without a series are outside the partial index
+    await memory_db.items.insert_one({'email': 'a@example.com'})
+    await memory_db.items.insert_one({'email': 'b@example.com'})
+    with pytest.raises(DuplicateKeyError):
+        await memory_db.items.insert_one({'email': 'A@Example.com'})
+
+    await memory_db.items.insert_one({'email': 'c@example.com', 'series': 's1'})
+    with pytest.raises(DuplicateKeyError):
+        await memory_db.items.insert_one({'email': 'd@example.com', 'series': 's1'})
+
+
+@pytest.mark.asyncio
+async def test_insert_many_reports_duplicates_like_pymongo(memory_db):
+    """Test unordered insert_many keeps going and raises BulkWriteError by position"""
+    await memory_db.users.create_index('email', unique=True)
+
+    with pytest.raises(BulkWriteError) as raised:
+        await memory_db.users.insert_many(
+            [{'email': 'a@example.com'}, {'email': 'a@example.com'}, {'email': 'b@example.com'}], ordered=False
+        )
+
+    assert [error['index'] for error in raised.value.details['writeErrors']] == [1]
+    assert raised.value.details['nInserted'] == 2
+    assert await memory_db.users.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_sort_skip_limit_and_copies(memory_db):
+    """Test cursor ordering (missing values first) and isolation from stored state"""
+    now = datetime(2025, 1, 1)
+    await memory_db.tasks.insert_many([
+        {'title': 'b', 'deadline': now + timedelta(days=2), 'rank': 1},
+        {'title': 'a', 'deadline': now, 'rank': 1},
+        {'title': 'c', 'rank': 0},
+    ])
+
+    ordered = await memory_db.tasks.find({}, {'_id': 0, 'title': 1}).sort('deadline', 1).to_list(length=None)
+    assert [doc['title'] for doc in ordered] == ['c', 'a', 'b']
+
+    ordered = await memory_db.tasks.find().sort([('rank', -1), ('title', 1)]).skip(1).limit(1).to_list(None)
+    assert [doc['title'] for doc in ordered] == ['b']
+
+    ordered[0]['title'] = 'mutated'
+    assert await memory_db.tasks.find_one({'title': 'mutated'}) is None
+
+
+@pytest.mark.asyncio
+async def test_find_one_and_update_upsert_lease(memory_db):
+    """Test the lease pattern: upsert on free, DuplicateKeyError while held"""
+    now = datetime(2025, 1, 1)
+
+    async def acquire(holder, at):
+        return await memory_db.leases.find_one_and_update(
+            {'_id': 'reminders', '$or': [{'holder': holder}, {'expires_at': {'$lte': at}}]},
+            {'$set': {'holder': holder, 'expires_at': at + timedelta(seconds=30)}},
+            upsert=True,
+            return_document=True
+        )
+
+    assert (await acquire('a', now))['holder'] == 'a'
+    with pytest.raises(DuplicateKeyError):
+        await acquire('b', now)
+    assert (await acquire('b', now + timedelta(seconds=31)))['holder'] == 'b'
+
+
+@pytest.mark.asyncio
+async def test_update_operators_and_group(memory_db):
+    """Test $pull across documents and $group with $push of $$ROOT"""
+    day = datetime(2025, 1, 1)
+    await memory_db.tasks.insert_many([
+        {'owner_id': 1, 'label_ids': ['x', 'y'], 'deadline': day},
+        {'owner_id': 1, 'label_ids': ['x'], 'deadline': day},
+        {'owner_id': 1, 'label_ids': [], 'deadline': day + timedelta(days=1)},
+    ])
+
+    result = await memory_db.tasks.update_many({'owner_id': 1, 'label_ids': 'x'}, {'$pull': {'label_ids': 'x'}})
+    assert result.modified_count == 2
+    assert await memory_db.tasks.count_documents({'label_ids': 'x'}) == 0
+
+    groups = await memory_db.tasks.aggregate([
+        {'$match': {'owner_id': 1}},
+        {'$group': {'_id': '$deadline', 'tasks': {'$push': '$$ROOT'}, 'count': {'$sum': 1}}},
+        {'$sort': {'_id': 1}},
+    ]).to_list(length=None)
+    assert [(group['_id'], group['count']) for group in groups] == [(day, 2), (day + timedelta(days=1), 1)]
@@ -0,0 +1,127 @@
+"""
+Metrics registry, middleware and Mongo listener tests
+"""
+import pytest
+from httpx import AsyncClient
+
+from src.core.metrics import MetricsRegistry, HTTP_REQUESTS, HTTP_REQUEST_DURATION
+from src.core.mongo_monitoring import command_collection
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test histogram exposition has cumulative buckets, sum and count"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    
+    histogram.observe(0.05, ("/a",))
+    histogram.observe(0.5, ("/a",))
+    histogram.observe(5.0, ("/a",))
+    
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert histogram.quantile(0.5, ("/a",)) == 1.0
+
+
+def test_counter_and_label_escaping():
+    """Test counters accumulate per label set and escape label values"""
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Hits", ("path",))
+    
+    counter.inc(('say "hi"',))
+    counter.inc(('say "hi"',), 2)
+    
+    assert 'hits_total{path="say \\"hi\\""} 3' in registry.render().splitlines()
+
+
+def test_duplicate_metric_rejected():
+    """Test registering the same metric name twice fails"""
+    registry = MetricsRegistry()
+    registry.counter("dup_total", "Dup")
+    
+    with pytest.raises(ValueError):
+        registry.counter("dup_total", "Dup")
+
+
+def test_command_collection():
+    """Test the collection is extracted from command documents"""
+    assert command_collection("find", {"find": "tasks", "filter": {}}) == "tasks"
+    assert command_collection("getMore", {"getMore": 123, "collection": "labels"}) == "labels"
+    assert command_collection("ping", {"ping": 1}) == ""
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_records_route_template(async_client: AsyncClient):
+    """Test requests are labelled by route template and exposed on /metrics"""
+    labels = ("PATCH", "/tasks/{task_id}")
+    before = HTTP_REQUESTS.value(labels + ("403",)) + HTTP_REQUESTS.value(labels + ("401",))
+    
+    await async_client.patch("/tasks/507f1f77bcf86cd799439011", json={})
+    
+    after = HTTP_REQUESTS.value(labels + ("403",)) + HTTP_REQUESTS.value(labels + ("401",))
+    assert after == before + 1
+    assert HTTP_REQUEST_DURATION.quantile(0.99, labels) is not None
+    
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{method="PATCH",route="/tasks/{task_id}"' in response.text
+
+
+def test_pool_listener_tracks_checkouts():
+    """Test pool listener records connections, checkouts and wait time"""
+    from pymongo import monitoring
+    from src.core.metrics import (
+        MONGO_POOL_CHECKED_OUT, MONGO_POOL_CHECKOUT_FAILURES, MONGO_POOL_CHECKOUT_WAIT,
+        MONGO_POOL_CONNECTIONS, MONGO_POOL_WAITING
+    )
+    from src.core.mongo_monitoring import PoolMetricsListener
+    
+    listener = PoolMetricsListener()
+    address = ("localhost", 27017)
+    connections = MONGO_POOL_CONNECTIONS.value()
+    checked_out = MONGO_POOL_CHECKED_OUT.value()
+    waiting = MONGO_POOL_WAITING.value()
+    failures = MONGO_POOL_CHECKOUT_FAILURES.value(("timeout",))
+    
+    listener.connection_created(monitoring.ConnectionCreatedEvent(address, 1))
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    assert MONGO_POOL_WAITING.value() == waiting + 1
+    
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, 1, 0.003))
+    assert MONGO_POOL_WAITING.value() == waiting
+    assert MONGO_POOL_CHECKED_OUT.value() == checked_out + 1
+    assert MONGO_POOL_CHECKOUT_WAIT.quantile(1.0) is not None
+    
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    listener.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(address, "timeout", 2.0))
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+    listener.connection_closed(monitoring.ConnectionClosedEvent(address, 1, "idle"))
+    
+    assert MONGO_POOL_CHECKOUT_FAILURES.value(("timeout",)) == failures + 1
+    assert MONGO_POOL_WAITING.value() == waiting
+    assert MONGO_POOL_CHECKED_OUT.value() == checked_out
+    assert MONGO_POOL_CONNECTIONS.value() == connections
+
+
+@pytest.mark.asyncio
+async def test_prewarm_pool_runs_concurrent_pings():
+    """Test pool pre-warming issues one ping per connection"""
+    from src.core.database import prewarm_pool
+    
+    pings = []
+    
+    class FakeAdmin:
+        async def command(self, name):
+            pings.append(name)
+            return {"ok": 1}
+    
+    class FakeClient:
+        admin = FakeAdmin()
+    
+    await prewarm_pool(FakeClient(), 5)
+    
+    assert pings == ["ping"] * 5
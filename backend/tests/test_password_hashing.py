@@ -0,0 +1,100 @@
+"""
+Password hashing cost tests
+"""
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from src.core import security
+from src.core.config import settings
+from src.core.security import (
+    bcrypt_rounds, calibrate_bcrypt_rounds, configure_password_hashing, hash_password, hash_rounds,
+    password_needs_rehash, verify_password
+)
+from src.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def rounds(monkeypatch):
+    """Use a cheap cost for new hashes"""
+    monkeypatch.setattr(security, "_calibrated_rounds", 5)
+    return 5
+
+
+def test_hash_rounds_reads_cost(rounds):
+    """Test the cost is parsed from the hash and compared to the current one"""
+    assert hash_rounds(hash_password("secret", rounds=4)) == 4
+    assert hash_rounds("not-a-bcrypt-hash") is None
+    assert password_needs_rehash(hash_password("secret", rounds=4))
+    assert not password_needs_rehash(hash_password("secret"))
+
+
+@pytest.mark.asyncio
+async def test_login_keeps_higher_cost_hash(async_client: AsyncClient, test_db, rounds):
+    """Test a hash stronger than the current cost is never rewritten"""
+    assert not password_needs_rehash(hash_password("secret", rounds=rounds + 1))
+
+    user_repo = UserRepository(test_db)
+    stronger = hash_password("password123", rounds=rounds + 1)
+    user = await user_repo.create_user("stronger@example.com", stronger)
+
+    response = await async_client.post(
+        "/auth/login", json={"email": "stronger@example.com", "password": "password123"}
+    )
+
+    assert response.status_code == 200
+    assert (await user_repo.find_by_id(ObjectId(user.id))).hashed_password == stronger
+
+
+def test_calibration_is_clamped():
+    """Test calibration stays within the configured bounds"""
+    assert calibrate_bcrypt_rounds(0.001, minimum=6, maximum=8, probe_rounds=4) == 6
+    assert calibrate_bcrypt_rounds(10 ** 9, minimum=6, maximum=8, probe_rounds=4) == 8
+
+
+def test_calibration_never_goes_below_default_cost(monkeypatch):
+    """Test a host too slow for the target still hashes at the old fixed cost"""
+    monkeypatch.setattr(security, "_calibrated_rounds", None)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", None)
+    monkeypatch.setattr(settings, "BCRYPT_TARGET_MS", 0.001)
+
+    assert configure_password_hashing() == security.DEFAULT_BCRYPT_ROUNDS
+
+
+def test_configured_rounds_skip_calibration(monkeypatch):
+    """Test BCRYPT_ROUNDS pins the cost"""
+    monkeypatch.setattr(security, "_calibrated_rounds", None)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 7)
+
+    assert configure_password_hashing() == 7
+    assert bcrypt_rounds() == 7
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_hash_in_background(async_client: AsyncClient, test_db, rounds):
+    """Test a login with an outdated cost stores a rehash that still verifies"""
+    user_repo = UserRepository(test_db)
+    user = await user_repo.create_user("upgrade@example.com", hash_password("password123", rounds=4))
+
+    response = await async_client.post(
+        "/auth/login", json={"email": "upgrade@example.com", "password": "password123"}
+    )
+
+    assert response.status_code == 200
+    stored = await user_repo.find_by_id(ObjectId(user.id))
+    assert hash_rounds(stored.hashed_password) == rounds
+    assert verify_password("password123", stored.hashed_password)
+    assert stored.updated_at == user.updated_at
+
+
+@pytest.mark.asyncio
+async def test_rehash_never_overwrites_password_change(test_db):
+    """Test a rehash derived from an old hash is dropped after a password change"""
+    user_repo = UserRepository(test_db)
+    old_hash = hash_password("password123", rounds=4)
+    user = await user_repo.create_user("changed@example.com", old_hash)
+    await user_repo.update_password(user.id, hash_password("newpassword", rounds=4))
+
+    assert not await user_repo.replace_password_hash(user.id, old_hash, hash_password("password123", rounds=5))
+    stored = await user_repo.find_by_id(ObjectId(user.id))
+    assert verify_password("newpassword", stored.hashed_password)
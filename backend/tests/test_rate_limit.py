@@ -0,0 +1,168 @@
+"""
+Rate limiting tests
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.core.rate_limit import (
+    MemoryRateLimitStore, MongoRateLimitStore, RateLimit, RateLimiter, compile_route_rule, gcra, parse_rate
+)
+from src.core.security import create_access_token
+from src.middleware.rate_limit_middleware import RateLimitMiddleware, client_identity
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate():
+    """Test rate strings in named and explicit periods"""
+    assert parse_rate("100/minute") == RateLimit(100, 60)
+    assert parse_rate("5/second") == RateLimit(5, 1)
+    assert parse_rate("20/10s") == RateLimit(20, 10)
+    for bad in ("100", "0/minute", "5/fortnight"):
+        with pytest.raises(ValueError):
+            parse_rate(bad)
+
+
+def test_gcra_burst_then_steady_refill():
+    """Test a full bucket allows a burst, then one request per interval"""
+    limit = RateLimit(3, 60)
+    tat = None
+    for remaining in (2, 1, 0):
+        tat, result = gcra(tat, 0.0, limit)
+        assert result.allowed and result.remaining == remaining
+
+    unchanged, refused = gcra(tat, 0.0, limit)
+    assert unchanged is None and not refused.allowed
+    assert refused.retry_after == pytest.approx(20)
+
+    # Continuous refill: one token after one interval, not a whole new window
+    tat, result = gcra(tat, 20.0, limit)
+    assert result.allowed and result.remaining == 0
+    assert not gcra(tat, 20.0, limit)[1].allowed
+
+
+@pytest.mark.asyncio
+async def test_memory_store_is_lru_bounded():
+    """Test the store never holds more than max_keys buckets"""
+    clock = FakeClock()
+    store = MemoryRateLimitStore(max_keys=2, clock=clock)
+    limit = RateLimit(1, 60)
+
+    assert (await store.hit("a", limit)).allowed
+    assert (await store.hit("b", limit)).allowed
+    assert not (await store.hit("a", limit)).allowed
+    assert (await store.hit("c", limit)).allowed  # evicts b, the least recent
+
+    assert len(store) == 2
+    assert (await store.hit("b", limit)).allowed
+
+
+def test_route_rule_matches_templates():
+    """Test path templates match concrete paths with or without a trailing slash"""
+    rule = compile_route_rule("patch /tasks/{task_id}", "5/minute")
+
+    assert rule.method == "PATCH"
+    assert rule.pattern.match("/tasks/abc123")
+    assert rule.pattern.match("/tasks/abc123/")
+    assert not rule.pattern.match("/tasks/abc123/extra")
+    assert compile_route_rule("GET /tasks/", "1/second").pattern.match("/tasks")
+
+
+@pytest.mark.asyncio
+async def test_route_limit_checked_before_default():
+    """Test a refused route request does not consume the default bucket"""
+    store = MemoryRateLimitStore(clock=FakeClock())
+    limiter = RateLimiter(store, default="3/minute", routes={"POST /auth/login": "1/minute"})
+
+    assert (await limiter.check("POST", "/auth/login", "ip:1"))[1].allowed
+    rule, result = await limiter.check("POST", "/auth/login", "ip:1")
+    assert (rule, result.allowed) == ("POST /auth/login", False)
+
+    # Default bucket had one token taken, two remain
+    assert (await limiter.check("GET", "/tasks/", "ip:1"))[1].remaining == 1
+
+
+@pytest.mark.asyncio
+async def test_mongo_store_is_shared(test_db):
+    """Test two workers' stores draw from the same bucket"""
+    worker_a, worker_b = MongoRateLimitStore(test_db), MongoRateLimitStore(test_db)
+    limit = RateLimit(2, 60)
+
+    assert (await worker_a.hit("ip:1", limit)).allowed
+    assert (await worker_b.hit("ip:1", limit)).allowed
+    assert not (await worker_a.hit("ip:1", limit)).allowed
+    assert (await worker_b.hit("ip:2", limit)).allowed
+    assert await test_db.rate_limits.count_documents({}) == 2
+
+
+def test_identity_prefers_valid_token_over_ip():
+    """Test signed tokens key by user and forged ones fall back to the IP"""
+    token = create_access_token("user-1")
+    scope = {'client': ('10.0.0.1', 5000), 'headers': [(b'authorization', f"Bearer {token}".encode())]}
+    assert client_identity(scope, 0) == "user:user-1"
+    assert scope['state']['access_token_claims'][0] == token
+
+    scope['headers'] = [(b'authorization', b"Bearer forged.token.value")]
+    assert client_identity(scope, 0) == "ip:10.0.0.1"
+
+    scope['headers'] = [(b'x-forwarded-for', b"1.1.1.1, 203.0.113.7")]
+    assert client_identity(scope, 0) == "ip:10.0.0.1"
+    assert client_identity(scope, 1) == "ip:203.0.113.7"
+
+
+def test_token_verified_once_per_request(monkeypatch):
+    """Test claims verified for the rate limit key are reused by later checks"""
+    from src.core import security
+    from src.core.security import verify_request_token
+
+    token = create_access_token("user-1")
+    scope = {'client': ('10.0.0.1', 5000), 'headers': [(b'authorization', f"Bearer {token}".encode())]}
+    calls = []
+    decode = security.decode_access_token
+    monkeypatch.setattr(security, "decode_access_token", lambda value: calls.append(value) or decode(value))
+
+    assert client_identity(scope, 0) == "user:user-1"
+    assert verify_request_token(scope, token)["sub"] == "user-1"
+    assert len(calls) == 1
+
+    other = create_access_token("user-2")
+    assert verify_request_token(scope, other)["sub"] == "user-2"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_429_with_headers(monkeypatch):
+    """Test refused requests get 429, Retry-After and RateLimit headers"""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+
+    inner = FastAPI()
+
+    @inner.post("/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @inner.get("/livez")
+    async def livez():
+        return {"status": "alive"}
+
+    limiter = RateLimiter(MemoryRateLimitStore(), default="100/minute", routes={"POST /auth/login": "2/minute"})
+    app = RateLimitMiddleware(inner, limiter)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [(await client.post("/auth/login")).status_code for _ in range(3)]
+        refused = await client.post("/auth/login")
+        probes = [(await client.get("/livez")).status_code for _ in range(150)]
+
+    assert statuses == [200, 200, 429]
+    assert refused.json() == {"detail": "Too many requests"}
+    assert refused.headers["retry-after"] == "30"
+    assert refused.headers["ratelimit-limit"] == "2"
+    assert set(probes) == {200}
@@ -0,0 +1,55 @@
+"""
+Recurrence expansion tests
+"""
+from datetime import date
+
+from src.models.task import RecurrenceRule
+from src.core.recurrence import expand_occurrences
+
+
+def test_daily_interval_jumps_into_window():
+    """Test daily rules start at the first occurrence inside the window"""
+    rule = RecurrenceRule(freq="daily", interval=3)
+    
+    occurrences = expand_occurrences(rule, date(2025, 1, 1), date(2025, 1, 5), date(2025, 1, 12))
+    
+    assert list(occurrences) == [date(2025, 1, 7), date(2025, 1, 10)]
+
+
+def test_weekly_by_weekday_with_count():
+    """Test COUNT includes occurrences before the window"""
+    rule = RecurrenceRule(freq="weekly", by_weekday=[0, 2], count=3)
+    
+    # 2025-01-01 is a Wednesday: occurrences are Jan 1, Jan 6, Jan 8
+    occurrences = expand_occurrences(rule, date(2025, 1, 1), date(2025, 1, 2), date(2025, 2, 28))
+    
+    assert list(occurrences) == [date(2025, 1, 6), date(2025, 1, 8)]
+
+
+def test_monthly_skips_short_months():
+    """Test monthly rules skip months without the start day"""
+    rule = RecurrenceRule(freq="monthly")
+    
+    occurrences = expand_occurrences(rule, date(2025, 1, 31), date(2025, 1, 1), date(2025, 5, 31))
+    
+    assert list(occurrences) == [
+        date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)
+    ]
+
+
+def test_until_and_skip():
+    """Test UNTIL bounds the series and skip removes given dates"""
+    rule = RecurrenceRule(freq="daily", until=date(2025, 1, 4))
+    
+    occurrences = expand_occurrences(
+        rule, date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 31), skip={date(2025, 1, 2)}
+    )
+    
+    assert list(occurrences) == [date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 4)]
+
+
+def test_window_before_start_is_empty():
+    """Test a window entirely before the series start has no occurrences"""
+    rule = RecurrenceRule(freq="weekly")
+    
+    assert list(expand_occurrences(rule, date(2025, 6, 1), date(2025, 1, 1), date(2025, 5, 31))) == []
@@ -0,0 +1,124 @@
+"""
+Refresh token and access token revocation tests
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from src.core import security
+from src.core.bloom import BloomFilter
+from src.core.token_revocation import TokenRevocationList
+from src.repositories.token_repository import TokenRevocationRepository
+
+
+class PastDatetime(datetime):
+    """datetime whose utcnow() is a few seconds ago, for issuing older tokens"""
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() - timedelta(seconds=5)
+
+
+async def register_and_login(client: AsyncClient, email: str) -> dict:
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    response = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test every added item is found and false positives stay near the target rate"""
+    bloom = BloomFilter.build((f"user-{number}" for number in range(1000)), capacity=1000, error_rate=0.01)
+
+    assert all(f"user-{number}" in bloom for number in range(1000))
+    false_positives = sum(f"other-{number}" in bloom for number in range(10000))
+    assert false_positives < 300
+    assert bloom.size_bytes < 2000
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(async_client: AsyncClient):
+    """Test a refresh token yields a new working pair and works only once"""
+    tokens = await register_and_login(async_client, "refresh@example.com")
+    assert tokens["refresh_token"] and tokens["refresh_expires_in"] > 0
+
+    response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    me = await async_client.get("/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert me.status_code == 200
+
+    unknown = await async_client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+    assert unknown.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_reused_refresh_token_revokes_session(async_client: AsyncClient):
+    """Test replaying a rotated refresh token invalidates its successor too"""
+    tokens = await register_and_login(async_client, "reuse@example.com")
+    other_session = (await async_client.post(
+        "/auth/login", json={"email": "reuse@example.com", "password": "password123"}
+    )).json()
+    successor = (await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).json()
+
+    replay = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    revoked = await async_client.post("/auth/refresh", json={"refresh_token": successor["refresh_token"]})
+    assert revoked.status_code == 401
+    untouched = await async_client.post("/auth/refresh", json={"refresh_token": other_session["refresh_token"]})
+    assert untouched.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_password_change_revokes_existing_tokens(async_client: AsyncClient, monkeypatch):
+    """Test access and refresh tokens issued before a password change stop working"""
+    tokens = await register_and_login(async_client, "revoke@example.com")
+    me = (await async_client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )).json()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(security, "datetime", PastDatetime)
+        old_access_token = security.create_access_token(me["id"])
+    old_headers = {"Authorization": f"Bearer {old_access_token}"}
+    assert (await async_client.get("/auth/me", headers=old_headers)).status_code == 200
+
+    response = await async_client.patch(
+        "/auth/update-password",
+        json={"current_password": "password123", "new_password": "newpassword123"},
+        headers=old_headers
+    )
+    assert response.status_code == 200
+
+    assert (await async_client.get("/auth/me", headers=old_headers)).status_code == 401
+    refresh = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refresh.status_code == 401
+
+    # A new login right away is not caught by the revocation
+    fresh = (await async_client.post(
+        "/auth/login", json={"email": "revoke@example.com", "password": "newpassword123"}
+    )).json()
+    me_again = await async_client.get("/auth/me", headers={"Authorization": f"Bearer {fresh['access_token']}"})
+    assert me_again.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_other_workers_revocations(test_db):
+    """Test revocations written elsewhere apply after the filter is rebuilt"""
+    repository = TokenRevocationRepository(test_db)
+    revocations = TokenRevocationList(capacity=100, error_rate=0.01, refresh_seconds=30)
+    now = datetime.utcnow().replace(microsecond=0)
+    issued_at = now - timedelta(seconds=10)
+
+    # Written by another worker: unseen until the next rebuild
+    await repository.revoke_user("user-1", now, now + timedelta(hours=1))
+    assert not await revocations.is_revoked(repository, "user-1", issued_at)
+
+    await revocations.refresh(repository)
+    assert await revocations.is_revoked(repository, "user-1", issued_at)
+    assert not await revocations.is_revoked(repository, "user-1", now)
+    assert not await revocations.is_revoked(repository, "user-2", issued_at)
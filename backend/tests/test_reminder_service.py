@@ -0,0 +1,182 @@
+"""
+Reminder scheduler and lease tests
+"""
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from datetime import date, datetime, timedelta
+
+from src.repositories.lease_repository import LeaseRepository
+from src.repositories.task_repository import TaskRepository
+from src.repositories.user_repository import UserRepository
+from src.services.reminder_service import ReminderScheduler
+from src.services.reminder_sinks import QueueReminderSink, create_reminder_sink
+from src.core.events import event_bus
+from src.core.security import hash_password
+
+
+LEAD = timedelta(days=1)
+DEADLINE = date(2025, 12, 31)
+REMIND_AT = datetime.combine(DEADLINE, datetime.min.time()) - LEAD
+
+
+@pytest_asyncio.fixture
+async def test_user(test_db):
+    """Create a test user for task ownership"""
+    user_repo = UserRepository(test_db)
+    return await user_repo.create_user(
+        email="reminders@example.com",
+        hashed_password=hash_password("password123")
+    )
+
+
+def make_scheduler(test_db):
+    """Build a scheduler with a queue sink and a one-day lead"""
+    return ReminderScheduler(
+        test_db,
+        QueueReminderSink(),
+        lead_seconds=int(LEAD.total_seconds()),
+        window_seconds=3600,
+        lease_seconds=30
+    )
+
+
+@pytest.mark.asyncio
+async def test_lease_is_exclusive(test_db):
+    """Test only one holder can hold a live lease, and renewal works"""
+    repo = LeaseRepository(test_db)
+
+    assert await repo.acquire("job", "worker-a", 30) is True
+    assert await repo.acquire("job", "worker-b", 30) is False
+    assert await repo.acquire("job", "worker-a", 30) is True
+
+    await repo.release("job", "worker-a")
+
+    assert await repo.acquire("job", "worker-b", 30) is True
+
+
+@pytest.mark.asyncio
+async def test_scheduler_emits_due_reminder_once(test_db, test_user):
+    """Test a due reminder is emitted exactly once"""
+    task = await TaskRepository(test_db).create_task({
+        "title": "Due Soon",
+        "priority": "High",
+        "deadline": DEADLINE,
+        "owner_id": ObjectId(test_user.id)
+    })
+    scheduler = make_scheduler(test_db)
+
+    await scheduler.tick(REMIND_AT + timedelta(minutes=1))
+    await scheduler.tick(REMIND_AT + timedelta(minutes=2))
+
+    assert scheduler.is_leader is True
+    assert scheduler.sink.queue.qsize() == 1
+    reminder = scheduler.sink.queue.get_nowait()
+    assert reminder.task_id == task.id
+    assert reminder.deadline == DEADLINE
+
+
+@pytest.mark.asyncio
+async def test_scheduler_picks_up_task_writes(test_db, test_user):
+    """Test tasks created after a scan are scheduled from write events"""
+    scheduler = make_scheduler(test_db)
+    event_bus.subscribe(scheduler._on_event)
+    try:
+        await scheduler.tick(REMIND_AT - timedelta(minutes=30))
+
+        repo = TaskRepository(test_db)
+        task = await repo.create_task({
+            "title": "Created Later",
+            "priority": "Low",
+            "deadline": DEADLINE,
+            "owner_id": ObjectId(test_user.id)
+        })
+        done = await repo.create_task({
+            "title": "Completed",
+            "priority": "Low",
+            "deadline": DEADLINE,
+            "owner_id": ObjectId(test_user.id)
+        })
+        await repo.update_task(ObjectId(done.id), ObjectId(test_user.id), {"status": "done"})
+
+        await scheduler.tick(REMIND_AT + timedelta(minutes=1))
+    finally:
+        event_bus.unsubscribe(scheduler._on_event)
+
+    assert scheduler.sink.queue.qsize() == 1
+    assert scheduler.sink.queue.get_nowait().task_id == task.id
+
+
+@pytest.mark.asyncio
+async def test_recurring_task_is_reminded_once_per_occurrence(test_db, test_user):
+    """Test each occurrence of a series gets its own reminder, once"""
+    repo = TaskRepository(test_db)
+    series = await repo.create_task({
+        "title": "Daily Standup",
+        "priority": "Medium",
+        "deadline": DEADLINE,
+        "recurrence": {"freq": "daily", "interval": 1, "count": 2},
+        "owner_id": ObjectId(test_user.id)
+    })
+    scheduler = make_scheduler(test_db)
+
+    for day in range(3):
+        await scheduler.tick(REMIND_AT + timedelta(days=day, minutes=1))
+        await scheduler.tick(REMIND_AT + timedelta(days=day, minutes=2))
+
+    reminders = [scheduler.sink.queue.get_nowait() for _ in range(scheduler.sink.queue.qsize())]
+    assert [reminder.deadline for reminder in reminders] == [DEADLINE, DEADLINE + timedelta(days=1)]
+    # Each reminder is for a materialized occurrence, not the series itself
+    assert series.id not in {reminder.task_id for reminder in reminders}
+    doc = await test_db.tasks.find_one({"_id": ObjectId(series.id)})
+    assert "reminder_occurrence" not in doc
+    assert "reminder_sent_at" not in doc
+
+
+@pytest.mark.asyncio
+async def test_completed_occurrence_is_not_reminded(test_db, test_user):
+    """Test an occurrence completed ahead of time is skipped, not the series"""
+    repo = TaskRepository(test_db)
+    series = await repo.create_task({
+        "title": "Weekly Review",
+        "priority": "Low",
+        "deadline": DEADLINE,
+        "recurrence": {"freq": "weekly", "interval": 1},
+        "owner_id": ObjectId(test_user.id)
+    })
+    first = await repo.materialize_occurrence(series, DEADLINE)
+    await repo.update_task(ObjectId(first.id), ObjectId(test_user.id), {"status": "done"})
+    scheduler = make_scheduler(test_db)
+
+    await scheduler.tick(REMIND_AT + timedelta(minutes=1))
+    await scheduler.tick(REMIND_AT + timedelta(days=7, minutes=1))
+
+    assert scheduler.sink.queue.qsize() == 1
+    assert scheduler.sink.queue.get_nowait().deadline == DEADLINE + timedelta(days=7)
+
+
+@pytest.mark.asyncio
+async def test_only_leader_emits(test_db, test_user):
+    """Test a second scheduler does not emit while the first holds the lease"""
+    await TaskRepository(test_db).create_task({
+        "title": "Due Soon",
+        "priority": "High",
+        "deadline": DEADLINE,
+        "owner_id": ObjectId(test_user.id)
+    })
+    leader = make_scheduler(test_db)
+    follower = make_scheduler(test_db)
+
+    await leader.tick(REMIND_AT - timedelta(minutes=30))
+    await follower.tick(REMIND_AT + timedelta(minutes=1))
+
+    assert follower.is_leader is False
+    assert follower.sink.queue.qsize() == 0
+
+
+def test_create_reminder_sink_validates_config():
+    """Test webhook sink requires a URL and unknown sinks are rejected"""
+    with pytest.raises(ValueError):
+        create_reminder_sink("webhook")
+    with pytest.raises(ValueError):
+        create_reminder_sink("carrier-pigeon")
@@ -0,0 +1,186 @@
+"""
+Encoded response cache tests
+"""
+import gzip
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.config import settings
+from src.core.response_cache import (
+    ENTRY_OVERHEAD_BYTES, EncodedBody, LocalCacheBroker, ResponseCache, task_list_cache
+)
+from src.repositories.task_repository import TaskRepository
+
+
+@pytest.fixture
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    yield
+    task_list_cache.clear()
+
+
+@pytest.fixture
+def make_cache():
+    caches = []
+
+    def make(**kwargs):
+        cache = ResponseCache(**kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def fill(cache, owner_id, key, content):
+    return cache.put(cache.reserve(owner_id, key), EncodedBody(content))
+
+
+def test_lru_eviction_stays_within_budget(make_cache):
+    """Test least recently used entries are evicted to fit max_bytes"""
+    entry_size = 100 + ENTRY_OVERHEAD_BYTES
+    cache = make_cache(max_bytes=entry_size * 2)
+
+    fill(cache, "a", "k", b"x" * 100)
+    fill(cache, "b", "k", b"y" * 100)
+    assert cache.get("a", "k") is not None  # a is now most recent
+    fill(cache, "c", "k", b"z" * 100)
+
+    assert cache.get("b", "k") is None
+    assert cache.get("a", "k").content == b"x" * 100
+    assert cache.size_bytes == entry_size * 2
+    assert not fill(cache, "d", "k", b"too big" * 100)
+
+
+def test_ttl_expires_entries(make_cache, monkeypatch):
+    """Test entries older than the TTL are misses"""
+    import src.core.response_cache as module
+
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    cache = make_cache(ttl_seconds=10)
+    fill(cache, "owner", "k", b"[]")
+
+    now[0] += 9
+    assert cache.get("owner", "k") is not None
+    now[0] += 2
+    assert cache.get("owner", "k") is None
+    assert cache.size_bytes == 0
+
+
+def test_invalidation_during_fill_discards_result(make_cache):
+    """Test a read that raced a write is not stored"""
+    cache = make_cache()
+    reservation = cache.reserve("owner", "k")
+    other = cache.reserve("someone-else", "k")
+
+    cache.invalidate("owner")
+
+    assert not cache.put(reservation, EncodedBody(b"[stale]"))
+    assert cache.put(other, EncodedBody(b"[]"))
+    assert cache.get("owner", "k") is None
+
+
+def test_broker_invalidates_other_workers(make_cache):
+    """Test caches sharing a broker drop each other's entries"""
+    broker = LocalCacheBroker()
+    worker_a = make_cache(broker=broker)
+    worker_b = make_cache(broker=broker)
+    fill(worker_a, "owner", "k", b"[1]")
+    fill(worker_b, "owner", "k", b"[1]")
+    fill(worker_b, "other", "k", b"[2]")
+
+    worker_a.invalidate("owner")
+
+    assert worker_b.get("owner", "k") is None
+    assert worker_b.get("other", "k") is not None
+
+
+def test_encoded_body_negotiates_gzip():
+    """Test compressed bodies are sent compressed only to gzip clients"""
+    data = b'[{"title": "x"}]' * 100
+    body = EncodedBody.encode(data, compress_min_bytes=1024)
+    assert body.gzipped and len(body.content) < len(data)
+    assert not EncodedBody.encode(b"[]", compress_min_bytes=1024).gzipped
+
+    compressed = body.to_response("gzip, deflate")
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == data
+
+    plain = body.to_response("")
+    assert "content-encoding" not in plain.headers
+    assert plain.body == data
+
+
+async def auth_headers(client: AsyncClient, email: str) -> dict:
+    await client.post("/auth/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_repeat_reads_skip_the_database(async_client: AsyncClient, cache_enabled, monkeypatch):
+    """Test cached task lists are served without a query until a write"""
+    headers = await auth_headers(async_client, "cached@example.com")
+    task = {"title": "First", "priority": "High", "deadline": "2025-12-31"}
+    await async_client.post("/tasks/", json=task, headers=headers)
+
+    queries = 0
+    find_by_owner = TaskRepository.find_by_owner
+
+    async def counting_find_by_owner(self, *args):
+        nonlocal queries
+        queries += 1
+        return await find_by_owner(self, *args)
+
+    monkeypatch.setattr(TaskRepository, "find_by_owner", counting_find_by_owner)
+
+    first = await async_client.get("/tasks/", headers=headers)
+    second = await async_client.get("/tasks/", headers=headers)
+    assert queries == 1
+    assert first.content == second.content
+
+    # A different sort is a separate entry
+    await async_client.get("/tasks/?sort=deadline", headers=headers)
+    assert queries == 2
+
+    await async_client.post("/tasks/", json={**task, "title": "Second"}, headers=headers)
+    after_write = await async_client.get("/tasks/", headers=headers)
+    assert queries == 3
+    assert sorted(t["title"] for t in after_write.json()) == ["First", "Second"]
+
+
+@pytest.mark.asyncio
+async def test_label_removal_invalidates_task_lists(async_client: AsyncClient, cache_enabled):
+    """Test deleting a label drops cached task lists that referenced it"""
+    headers = await auth_headers(async_client, "labelcache@example.com")
+    label = (await async_client.post("/labels/", json={"name": "Work"}, headers=headers)).json()
+    await async_client.post(
+        "/tasks/",
+        json={"title": "Tagged", "priority": "Low", "deadline": "2025-12-31", "label_ids": [label["id"]]},
+        headers=headers
+    )
+    assert (await async_client.get("/tasks/", headers=headers)).json()[0]["label_ids"] == [label["id"]]
+
+    await async_client.delete(f"/labels/{label['id']}", headers=headers)
+
+    assert (await async_client.get("/tasks/", headers=headers)).json()[0]["label_ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_large_lists_are_served_gzipped(async_client: AsyncClient, cache_enabled, monkeypatch):
+    """Test lists above the compression threshold use Content-Encoding: gzip"""
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_COMPRESS_MIN_BYTES", 200)
+    headers = await auth_headers(async_client, "gzip@example.com")
+    for number in range(5):
+        await async_client.post(
+            "/tasks/", json={"title": f"Task {number}", "priority": "Medium", "deadline": "2025-12-31"},
+            headers=headers
+        )
+
+    response = await async_client.get("/tasks/", headers={**headers, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 5
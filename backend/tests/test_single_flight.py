@@ -0,0 +1,132 @@
+"""
+Single-flight request coalescing tests
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.events import Event, event_bus
+from src.core.metrics import SINGLE_FLIGHT_CALLS
+from src.core.single_flight import SingleFlight
+from src.repositories.task_repository import TaskRepository
+
+
+class SlowCall:
+    """Counts invocations and blocks until released"""
+
+    def __init__(self, result="result"):
+        self.calls = 0
+        self.result = result
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        number = self.calls
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return f"{self.result}-{number}"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """Test identical concurrent calls run once and count as shared"""
+    flight = SingleFlight("test-share")
+    call = SlowCall()
+
+    waiters = [asyncio.create_task(flight.do("owner", "key", call)) for _ in range(5)]
+    other = asyncio.create_task(flight.do("owner", "other-key", call))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*waiters) == ["result-1"] * 5
+    assert await other == "result-2"
+    assert SINGLE_FLIGHT_CALLS.value(("test-share", "leader")) == 2
+    assert SINGLE_FLIGHT_CALLS.value(("test-share", "shared")) == 4
+    assert flight.in_flight("owner") == 0
+
+    # Finished calls are not reused
+    assert await flight.do("owner", "key", call) == "result-3"
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared():
+    """Test every waiter sees the shared call's exception"""
+    flight = SingleFlight("test-error")
+    call = SlowCall(result=RuntimeError("boom"))
+
+    waiters = [asyncio.create_task(flight.do("owner", "key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert call.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test a disconnecting leader leaves the shared call running"""
+    flight = SingleFlight("test-cancel")
+    call = SlowCall()
+
+    leader = asyncio.create_task(flight.do("owner", "key", call))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("owner", "key", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    call.release.set()
+
+    assert await follower == "result-1"
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_write_event_detaches_in_flight_reads():
+    """Test a read starting after a write does not join an older query"""
+    flight = SingleFlight("test-invalidate", invalidate_on=("task.",))
+    call = SlowCall()
+
+    before = asyncio.create_task(flight.do("owner", "key", call))
+    await asyncio.sleep(0)
+    event_bus.publish(Event("label.created", "owner"))
+    assert flight.in_flight("owner") == 1
+    event_bus.publish(Event("task.created", "owner"))
+    assert flight.in_flight("owner") == 0
+
+    after = asyncio.create_task(flight.do("owner", "key", call))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert (await before, await after) == ("result-1", "result-2")
+    event_bus.unsubscribe(flight._on_event)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_task_lists_run_one_query(async_client: AsyncClient, monkeypatch):
+    """Test concurrent GET /tasks/ for one user share a query and body"""
+    await async_client.post("/auth/register", json={"email": "tabs@example.com", "password": "password123"})
+    login = await async_client.post("/auth/login", json={"email": "tabs@example.com", "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    await async_client.post(
+        "/tasks/", json={"title": "Shared", "priority": "High", "deadline": "2025-12-31"}, headers=headers
+    )
+
+    queries = 0
+    find_by_owner = TaskRepository.find_by_owner
+
+    async def counting_find_by_owner(self, *args):
+        nonlocal queries
+        queries += 1
+        await asyncio.sleep(0.05)
+        return await find_by_owner(self, *args)
+
+    monkeypatch.setattr(TaskRepository, "find_by_owner", counting_find_by_owner)
+
+    responses = await asyncio.gather(*(async_client.get("/tasks/", headers=headers) for _ in range(4)))
+
+    assert queries == 1
+    assert {response.content for response in responses} == {responses[0].content}
+    assert responses[0].headers["content-type"] == "application/json"
+    assert [task["title"] for task in responses[0].json()] == ["Shared"]
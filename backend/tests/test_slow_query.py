@@ -0,0 +1,90 @@
+"""
+Slow query log tests
+"""
+import logging
+import threading
+
+from src.core.slow_query import SlowQueryListener, command_shape, documents_returned, redact, summarize_plan
+
+
+def test_redact_keeps_structure_and_hides_values():
+    """Test filter values are redacted but fields and operators kept"""
+    query = {
+        "owner_id": "abc123",
+        "deadline": {"$gte": "2025-01-01", "$lte": "2025-02-01"},
+        "labels": {"$in": ["a", "b", "c"]},
+        "$or": [{"status": "open"}, {"priority": "High"}],
+    }
+
+    assert redact(query) == {
+        "owner_id": "?",
+        "deadline": {"$gte": "?", "$lte": "?"},
+        "labels": {"$in": ["?"]},
+        "$or": [{"status": "?"}, {"priority": "?"}],
+    }
+
+
+def test_command_shape_for_writes_and_aggregations():
+    """Test shapes are extracted from update and aggregate commands"""
+    update = {"update": "tasks", "updates": [{"q": {"_id": 1, "owner_id": "x"}, "u": {"$set": {"a": 1}}}]}
+    aggregate = {"aggregate": "tasks", "pipeline": [{"$match": {"owner_id": "x"}}, {"$sort": {"deadline": 1}}]}
+
+    assert command_shape("update", update) == {"filter": [{"_id": "?", "owner_id": "?"}]}
+    assert command_shape("aggregate", aggregate)["pipeline"][0] == {"$match": {"owner_id": "?"}}
+
+
+def test_documents_returned():
+    """Test returned document counts are read from replies"""
+    assert documents_returned("find", {"cursor": {"firstBatch": [{}, {}]}}) == 2
+    assert documents_returned("delete", {"n": 3}) == 3
+    assert documents_returned("findAndModify", {"value": None}) == 0
+    assert documents_returned("ping", {"ok": 1}) is None
+
+
+def test_summarize_plan():
+    """Test explain output is reduced to plan stages and examined counts"""
+    explain = {
+        "queryPlanner": {"winningPlan": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "IXSCAN", "indexName": "owner_id_1"},
+        }},
+        "executionStats": {"totalDocsExamined": 50, "totalKeysExamined": 50, "nReturned": 5},
+    }
+
+    assert summarize_plan(explain) == {
+        "plan": "FETCH <- IXSCAN owner_id_1",
+        "docs_examined": 50,
+        "keys_examined": 50,
+        "returned": 5,
+    }
+
+
+def test_record_logs_and_explains_once_per_shape(caplog):
+    """Test slow commands are logged and explained once per shape"""
+    explained = []
+    done = threading.Event()
+
+    class FakeDatabase:
+        def command(self, command):
+            explained.append(command)
+            done.set()
+            return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+                    "executionStats": {"totalDocsExamined": 1000, "nReturned": 1}}
+
+    listener = SlowQueryListener(threshold_ms=10, explain=True, explain_interval_seconds=60)
+    listener.client = {"todox": FakeDatabase()}
+    command = {"find": "tasks", "filter": {"owner_id": "secret"}, "lsid": {"id": 1}, "$db": "todox"}
+
+    with caplog.at_level(logging.WARNING, logger="src.core.slow_query"):
+        listener.record("find", "todox", command, {"cursor": {"firstBatch": [{}]}}, 42.0)
+        listener.record("find", "todox", command, {"cursor": {"firstBatch": [{}]}}, 43.0)
+        assert done.wait(5)
+        listener.close()
+
+    assert "secret" not in caplog.text
+    assert "todox.tasks find took 42.0ms, returned=1" in caplog.text
+    assert len(explained) == 1
+    assert explained[0] == {
+        "explain": {"find": "tasks", "filter": {"owner_id": "secret"}},
+        "verbosity": "executionStats",
+    }
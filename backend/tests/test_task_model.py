@@ -5,7 +5,7 @@ import pytest
 from pydantic import ValidationError
 from datetime import date, datetime
 
-from src.models.task import TaskBase, TaskCreate, TaskUpdate, TaskInDB
+from src.models.task import TaskBase, TaskCreate, TaskUpdate, TaskInDB, RecurrenceRule
 
 
 def test_task_base_valid_data():
@@ -122,3 +122,33 @@ def test_task_update_all_optional():
     task_update2 = TaskUpdate(status="done")
     assert task_update2.status == "done"
     assert task_update2.title is None
+
+
+def test_recurrence_rule_accepts_rrule_string():
+    """Test TaskCreate parses an RRULE string into a RecurrenceRule"""
+    task = TaskCreate(
+        title="Standup",
+        priority="Medium",
+        deadline=date(2025, 12, 1),
+        recurrence="RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10"
+    )
+    
+    assert task.recurrence == RecurrenceRule(
+        freq="weekly", interval=2, by_weekday=[0, 2], count=10
+    )
+
+
+def test_recurrence_rule_rejects_invalid_rules():
+    """Test unsupported or contradictory recurrence rules are rejected"""
+    invalid_rules = [
+        "FREQ=YEARLY",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=DAILY;COUNT=3;UNTIL=20251231",
+        "INTERVAL=2",
+        {"freq": "weekly", "by_weekday": [7]},
+        {"freq": "daily", "interval": 0},
+    ]
+    
+    for rule in invalid_rules:
+        with pytest.raises(ValidationError):
+            RecurrenceRule.model_validate(rule)
@@ -115,6 +115,55 @@ async def test_find_by_owner_sorted_descending(test_db, test_user):
     assert tasks[1].id == task1.id
 
 
+@pytest.mark.asyncio
+async def test_priority_rank_kept_in_sync(test_db, test_user, test_task):
+    """Test priority_rank is stored on create and updated with priority"""
+    repo = TaskRepository(test_db)
+    
+    doc = await test_db.tasks.find_one({'_id': ObjectId(test_task.id)})
+    assert doc['priority_rank'] == 3
+    
+    await repo.update_task(ObjectId(test_task.id), ObjectId(test_user.id), {"priority": "Low"})
+    
+    doc = await test_db.tasks.find_one({'_id': ObjectId(test_task.id)})
+    assert doc['priority_rank'] == 1
+
+
+@pytest.mark.asyncio
+async def test_find_by_owner_sorted_by_priority(test_db, test_user):
+    """Test find_by_owner sorts by numeric priority rank"""
+    repo = TaskRepository(test_db)
+    
+    for priority in ["Low", "High", "Medium"]:
+        await repo.create_task({
+            "title": f"{priority} Task",
+            "priority": priority,
+            "deadline": date(2025, 12, 31),
+            "owner_id": ObjectId(test_user.id)
+        })
+    
+    tasks = await repo.find_by_owner(ObjectId(test_user.id), sort='priority', order='desc')
+    
+    assert [task.priority for task in tasks] == ["High", "Medium", "Low"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_priority_rank(test_db, test_user):
+    """Test backfill_priority_rank sets rank on legacy tasks only"""
+    repo = TaskRepository(test_db)
+    await test_db.tasks.insert_one({
+        "title": "Legacy Task",
+        "priority": "Medium",
+        "owner_id": ObjectId(test_user.id)
+    })
+    
+    assert await repo.backfill_priority_rank() == 1
+    assert await repo.backfill_priority_rank() == 0
+    
+    doc = await test_db.tasks.find_one({"title": "Legacy Task"})
+    assert doc['priority_rank'] == 2
+
+
 @pytest.mark.asyncio
 async def test_find_by_id_returns_task_if_owner_matches(test_db, test_user, test_task):
     """Test find_by_id returns task if owner matches"""
@@ -288,6 +288,254 @@ async def test_get_tasks_sorted_newest_first(async_client: AsyncClient, auth_hea
     assert task2_index < task1_index
 
 
+@pytest.mark.asyncio
+async def test_get_tasks_sorted_by_priority(async_client: AsyncClient, auth_headers: dict):
+    """Test sort=priority orders High > Medium > Low (desc) and reverse (asc)"""
+    for priority in ["Medium", "Low", "High"]:
+        await async_client.post(
+            "/tasks",
+            json={"title": f"{priority} Task", "priority": priority, "deadline": "2025-12-31"},
+            headers=auth_headers
+        )
+    
+    response = await async_client.get("/tasks?sort=priority&order=desc", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["priority"] for t in response.json()] == ["High", "Medium", "Low"]
+    
+    response = await async_client.get("/tasks?sort=priority&order=asc", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["priority"] for t in response.json()] == ["Low", "Medium", "High"]
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_sorted_by_deadline(async_client: AsyncClient, auth_headers: dict):
+    """Test sort=deadline&order=asc returns earliest deadline first"""
+    for deadline in ["2025-12-31", "2025-10-01", "2025-11-15"]:
+        await async_client.post(
+            "/tasks",
+            json={"title": "Task", "priority": "Low", "deadline": deadline},
+            headers=auth_headers
+        )
+    
+    response = await async_client.get("/tasks?sort=deadline&order=asc", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert [t["deadline"] for t in response.json()] == ["2025-10-01", "2025-11-15", "2025-12-31"]
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_invalid_sort(async_client: AsyncClient, auth_headers: dict):
+    """Test unknown sort field or order returns 422"""
+    response = await async_client.get("/tasks?sort=title", headers=auth_headers)
+    assert response.status_code == 422
+    
+    response = await async_client.get("/tasks?order=sideways", headers=auth_headers)
+    assert response.status_code == 422
+
+
+# GET /tasks/calendar tests
+@pytest.mark.asyncio
+async def test_get_calendar_groups_by_day(async_client: AsyncClient, auth_headers: dict):
+    """Test calendar returns tasks in range grouped by deadline day"""
+    for title, deadline in [("A", "2025-11-02"), ("B", "2025-11-01"), ("C", "2025-11-02"), ("D", "2025-12-01")]:
+        await async_client.post(
+            "/tasks",
+            json={"title": title, "priority": "Medium", "deadline": deadline},
+            headers=auth_headers
+        )
+    
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-01&to=2025-11-30",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    days = response.json()
+    assert [day["day"] for day in days] == ["2025-11-01", "2025-11-02"]
+    assert [t["title"] for t in days[0]["tasks"]] == ["B"]
+    assert [t["title"] for t in days[1]["tasks"]] == ["A", "C"]
+
+
+@pytest.mark.asyncio
+async def test_get_calendar_rejects_invalid_range(async_client: AsyncClient, auth_headers: dict):
+    """Test calendar rejects inverted and oversized ranges with 400"""
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-30&to=2025-11-01",
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-01-01&to=2025-12-31",
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_calendar_requires_range(async_client: AsyncClient, auth_headers: dict):
+    """Test calendar without from/to returns 422"""
+    response = await async_client.get("/tasks/calendar", headers=auth_headers)
+    
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_calendar_expands_recurring_tasks(async_client: AsyncClient, auth_headers: dict):
+    """Test recurring tasks appear once per occurrence in the calendar"""
+    response = await async_client.post(
+        "/tasks",
+        json={
+            "title": "Water plants",
+            "priority": "Low",
+            "deadline": "2025-11-01",
+            "recurrence": "FREQ=WEEKLY"
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    series_id = response.json()["id"]
+    
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-01&to=2025-11-30",
+        headers=auth_headers
+    )
+    
+    days = response.json()
+    assert [day["day"] for day in days] == [
+        "2025-11-01", "2025-11-08", "2025-11-15", "2025-11-22", "2025-11-29"
+    ]
+    occurrence = days[1]["tasks"][0]
+    assert occurrence["series_id"] == series_id
+    assert occurrence["occurrence_date"] == "2025-11-08"
+    assert occurrence["deadline"] == "2025-11-08"
+
+
+@pytest.mark.asyncio
+async def test_complete_occurrence_materializes_it(async_client: AsyncClient, auth_headers: dict):
+    """Test completing an occurrence stores it once and leaves the series open"""
+    response = await async_client.post(
+        "/tasks",
+        json={
+            "title": "Daily review",
+            "priority": "Medium",
+            "deadline": "2025-11-01",
+            "recurrence": {"freq": "daily"}
+        },
+        headers=auth_headers
+    )
+    series_id = response.json()["id"]
+    
+    for _ in range(2):
+        response = await async_client.patch(
+            f"/tasks/{series_id}/occurrences/2025-11-02",
+            json={"status": "done"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+    done = response.json()
+    assert done["status"] == "done"
+    assert done["series_id"] == series_id
+    assert done["id"] != series_id
+    
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-01&to=2025-11-03",
+        headers=auth_headers
+    )
+    days = response.json()
+    assert [len(day["tasks"]) for day in days] == [1, 1, 1]
+    assert days[1]["tasks"][0]["id"] == done["id"]
+    assert days[1]["tasks"][0]["status"] == "done"
+    assert days[2]["tasks"][0]["status"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_update_occurrence_not_in_series(async_client: AsyncClient, auth_headers: dict):
+    """Test editing a date that is not an occurrence returns 404"""
+    response = await async_client.post(
+        "/tasks",
+        json={
+            "title": "Weekly sync",
+            "priority": "High",
+            "deadline": "2025-11-03",
+            "recurrence": {"freq": "weekly"}
+        },
+        headers=auth_headers
+    )
+    series_id = response.json()["id"]
+    
+    response = await async_client.patch(
+        f"/tasks/{series_id}/occurrences/2025-11-04",
+        json={"status": "done"},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_task_clears_recurrence(async_client: AsyncClient, auth_headers: dict):
+    """Test an explicit null recurrence turns a series back into a single task"""
+    response = await async_client.post(
+        "/tasks",
+        json={
+            "title": "Stand-up",
+            "priority": "Low",
+            "deadline": "2025-11-03",
+            "recurrence": {"freq": "daily"}
+        },
+        headers=auth_headers
+    )
+    series_id = response.json()["id"]
+    
+    response = await async_client.patch(
+        f"/tasks/{series_id}",
+        json={"recurrence": None},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["recurrence"] is None
+    
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-01&to=2025-11-07",
+        headers=auth_headers
+    )
+    assert [day["day"] for day in response.json()] == ["2025-11-03"]
+
+
+@pytest.mark.asyncio
+async def test_delete_series_deletes_materialized_occurrences(async_client: AsyncClient, auth_headers: dict):
+    """Test deleting a recurring task also deletes its edited occurrences"""
+    response = await async_client.post(
+        "/tasks",
+        json={
+            "title": "Gym",
+            "priority": "Medium",
+            "deadline": "2025-11-01",
+            "recurrence": {"freq": "daily"}
+        },
+        headers=auth_headers
+    )
+    series_id = response.json()["id"]
+    response = await async_client.patch(
+        f"/tasks/{series_id}/occurrences/2025-11-02",
+        json={"status": "done"},
+        headers=auth_headers
+    )
+    occurrence_id = response.json()["id"]
+    
+    response = await async_client.delete(f"/tasks/{series_id}", headers=auth_headers)
+    assert response.status_code == 204
+    
+    response = await async_client.get("/tasks", headers=auth_headers)
+    assert occurrence_id not in [task["id"] for task in response.json()]
+    response = await async_client.get(
+        "/tasks/calendar?from=2025-11-01&to=2025-11-03",
+        headers=auth_headers
+    )
+    assert response.json() == []
+
+
 # PATCH /tasks/{id} tests
 @pytest.mark.asyncio
 async def test_update_task_partial_update(async_client: AsyncClient, auth_headers: dict):